@@ -0,0 +1,138 @@
+import math
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+LOTE_MINIMO_VETORIAL = 32  # lotes menores usam o laço escalar (custo fixo do NumPy não compensa)
+
+
+class JanelaMovel:
+    """Janela deslizante com somas correntes: média e desvio em O(1) por amostra.
+
+    adicionar_lote devolve a média da janela após cada amostra do lote, usando só
+    as amostras que entram e as que saem (nunca a janela inteira). As somas são
+    recalculadas com math.fsum a cada `tamanho` amostras para não acumular erro
+    de arredondamento.
+    """
+
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+        self.valores = deque(maxlen=tamanho)
+        self._soma = 0.0
+        self._soma_quadrados = 0.0
+        self._desde_recalculo = 0
+
+    def __len__(self):
+        return len(self.valores)
+
+    @property
+    def media(self):
+        n = len(self.valores)
+        return self._soma / n if n else 0.0
+
+    @property
+    def desvio(self):
+        n = len(self.valores)
+        if n < 2:
+            return 0.0
+        variancia = (self._soma_quadrados - self._soma * self._soma / n) / (n - 1)
+        return math.sqrt(variancia) if variancia > 0 else 0.0
+
+    def adicionar_lote(self, valores):
+        """Acrescenta um lote e devolve o array das médias móveis após cada amostra"""
+        valores = np.asarray(valores, dtype=np.float64)
+        b = len(valores)
+        if not b:
+            return np.empty(0)
+        if b < LOTE_MINIMO_VETORIAL:
+            return self._adicionar_escalar(valores.tolist())
+        n_antes = len(self.valores)
+        # Amostras antigas que saem da janela durante este lote (no máximo b)
+        saindo = min(n_antes, max(0, n_antes + b - self.tamanho))
+        removidos = np.fromiter(islice(self.valores, saindo), dtype=np.float64, count=saindo)
+
+        somas = self._somas_janela(valores, removidos, self._soma, n_antes)
+        somas_q = self._somas_janela(valores * valores, removidos * removidos, self._soma_quadrados, n_antes)
+        contagem = np.minimum(np.arange(n_antes + 1, n_antes + b + 1), self.tamanho)
+
+        self.valores.extend(valores.tolist())
+        self._soma = float(somas[-1])
+        self._soma_quadrados = float(somas_q[-1])
+        self._recalcular_se_preciso(b)
+        return somas / contagem
+
+    def _adicionar_escalar(self, valores):
+        janela = self.valores
+        soma = self._soma
+        soma_q = self._soma_quadrados
+        medias = []
+        for v in valores:
+            if len(janela) == self.tamanho:
+                saindo = janela[0]
+                soma -= saindo
+                soma_q -= saindo * saindo
+            janela.append(v)
+            soma += v
+            soma_q += v * v
+            medias.append(soma / len(janela))
+        self._soma = soma
+        self._soma_quadrados = soma_q
+        self._recalcular_se_preciso(len(valores))
+        return np.array(medias, dtype=np.float64)
+
+    def _recalcular_se_preciso(self, novas):
+        self._desde_recalculo += novas
+        if self._desde_recalculo >= self.tamanho:
+            self._soma = math.fsum(self.valores)
+            self._soma_quadrados = math.fsum(v * v for v in self.valores)
+            self._desde_recalculo = 0
+
+    def _somas_janela(self, valores, removidos, soma_antes, n_antes):
+        """Soma da janela após cada amostra via somas prefixas locais ao lote"""
+        b = len(valores)
+        acumulado = np.cumsum(valores)
+        # Índice (na sequência janela_antiga + lote) do primeiro elemento de cada janela
+        inicio = np.maximum(np.arange(b) + n_antes - self.tamanho + 1, 0)
+        prefixo_antigo = np.concatenate(([0.0], np.cumsum(removidos)))
+        dentro_antiga = inicio <= n_antes
+        descartado = np.where(
+            dentro_antiga,
+            prefixo_antigo[np.minimum(inicio, len(removidos))],
+            soma_antes + acumulado[np.maximum(inicio - n_antes - 1, 0)],
+        )
+        return soma_antes + acumulado - descartado
+
+    def limpar(self):
+        self.valores.clear()
+        self._soma = 0.0
+        self._soma_quadrados = 0.0
+        self._desde_recalculo = 0
+
+
+class RegraHisterese:
+    """Dispara quando o valor atinge o limite e só rearma abaixo de limite - histerese"""
+
+    def __init__(self):
+        self.disparada = False
+
+    def avaliar(self, valores, limite, histerese):
+        """Devolve os índices do lote em que o alerta disparou (NaN nunca dispara nem rearma)"""
+        valores = np.asarray(valores, dtype=np.float64)
+        histerese = max(0.0, histerese)
+        # Só as transições importam: percorre eventos, não amostras
+        acima = np.flatnonzero(valores >= limite)
+        abaixo = np.flatnonzero(valores < limite - histerese)
+        disparos = []
+        posicao = 0
+        while True:
+            eventos = abaixo if self.disparada else acima
+            i = np.searchsorted(eventos, posicao)
+            if i == len(eventos):
+                break
+            indice = int(eventos[i])
+            if not self.disparada:
+                disparos.append(indice)
+            self.disparada = not self.disparada
+            posicao = indice + 1
+        return disparos
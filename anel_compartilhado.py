@@ -0,0 +1,126 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# === CONFIGURAÇÕES PADRÃO ===
+CAPACIDADE_ANEL = 1 << 17  # ~5 MB; 1,3 s de folga a 100 mil amostras/s com a interface travada
+SLOTS_NOMES = 64  # mesmo limite de Dispositivos
+TAMANHO_NOME = 64  # bytes UTF-8 por identificador de dispositivo
+
+# Uma amostra processada por registro; 'dispositivo' é o índice na tabela de nomes
+REGISTRO_ANEL = np.dtype([
+    ('dispositivo', np.uint16),
+    ('tempo', np.float64),
+    ('ax', np.float32),
+    ('ay', np.float32),
+    ('az', np.float32),
+    ('tilt', np.float64),
+    ('vib', np.float64),
+])
+
+_CABECALHO = 32  # [0] amostras publicadas desde o início, [1] capacidade, [2] amostras com escrita iniciada
+
+
+class AnelAmostras:
+    """Anel de amostras em memória compartilhada: um processo escreve, outro lê.
+
+    Como num seqlock, o escritor anuncia o lote (contador de iniciadas) antes de gravar
+    os registros e só depois avança o contador de publicadas, então o leitor nunca vê
+    uma amostra pela metade. O leitor guarda o próprio cursor; depois de copiar, tudo
+    o que um lote iniciado pode ter sobrescrito (mesmo ainda não publicado) é contado
+    como perdido em vez de lido corrompido. Uma tabela ao lado guarda o identificador
+    de cada dispositivo, gravada antes da primeira amostra dele.
+    """
+
+    def __init__(self, nome=None, capacidade=CAPACIDADE_ANEL, somente_leitura=False):
+        # nome=None cria o segmento; o criador é quem o remove em fechar()
+        criar = nome is None
+        tamanho = _CABECALHO + SLOTS_NOMES * TAMANHO_NOME + capacidade * REGISTRO_ANEL.itemsize
+        self._shm = shared_memory.SharedMemory(name=nome, create=criar, size=tamanho if criar else 0)
+        self.criador = criar
+        buf = self._shm.buf
+        self._cabecalho = np.ndarray(4, np.uint64, buf, 0)
+        if criar:
+            self._cabecalho[:] = (0, capacidade, 0, 0)
+        self.capacidade = int(self._cabecalho[1])
+        self._nomes = np.ndarray((SLOTS_NOMES, TAMANHO_NOME), np.uint8, buf, _CABECALHO)
+        self._registros = np.ndarray(self.capacidade, REGISTRO_ANEL, buf, _CABECALHO + SLOTS_NOMES * TAMANHO_NOME)
+        self.cursor = 0
+        self.perdidas = 0
+        if somente_leitura:
+            for visao in (self._cabecalho, self._nomes, self._registros):
+                visao.flags.writeable = False
+
+    @property
+    def nome(self):
+        return self._shm.name
+
+    @property
+    def escritas(self):
+        return int(self._cabecalho[0])
+
+    @property
+    def iniciadas(self):
+        return int(self._cabecalho[2])
+
+    def registrar_nome(self, indice, identificador):
+        """Grava o identificador do dispositivo na tabela (antes das amostras dele)"""
+        dados = identificador.encode('utf-8')[:TAMANHO_NOME]
+        self._nomes[indice] = 0
+        self._nomes[indice, :len(dados)] = np.frombuffer(dados, np.uint8)
+
+    def nome_dispositivo(self, indice):
+        return bytes(self._nomes[indice]).rstrip(b'\0').decode('utf-8', 'replace')
+
+    def escrever(self, indice, colunas):
+        """Acrescenta um lote de um dispositivo (arrays de mesmo comprimento por coluna)"""
+        quantidade = len(colunas['tempo'])
+        fim_lote = self.escritas + quantidade
+        if quantidade > self.capacidade:
+            # Só a última volta cabe no anel; o restante seria sobrescrito de qualquer forma
+            colunas = {campo: valores[-self.capacidade:] for campo, valores in colunas.items()}
+            quantidade = self.capacidade
+        # Anuncia o lote antes de tocar nos registros: o leitor descarta o que ele pode sobrescrever
+        self._cabecalho[2] = fim_lote
+        inicio = (fim_lote - quantidade) % self.capacidade
+        primeira = min(quantidade, self.capacidade - inicio)
+        for trecho, origem in ((slice(inicio, inicio + primeira), slice(0, primeira)),
+                               (slice(0, quantidade - primeira), slice(primeira, quantidade))):
+            destino = self._registros[trecho]
+            if not len(destino):
+                continue
+            destino['dispositivo'] = indice
+            for campo, valores in colunas.items():
+                destino[campo] = valores[origem]
+        # Publica o lote só depois de todos os registros estarem escritos
+        self._cabecalho[0] = fim_lote
+
+    def ler(self):
+        """Copia as amostras novas desde a última leitura (array estruturado REGISTRO_ANEL)"""
+        escritas = self.escritas
+        if escritas - self.cursor > self.capacidade:
+            self.perdidas += escritas - self.capacidade - self.cursor
+            self.cursor = escritas - self.capacidade
+        inicio = self.cursor % self.capacidade
+        quantidade = escritas - self.cursor
+        fim = inicio + quantidade
+        if fim <= self.capacidade:
+            lidos = self._registros[inicio:fim].copy()
+        else:
+            lidos = np.concatenate((self._registros[inicio:], self._registros[:fim - self.capacidade]))
+
+        # O escritor pode ter dado a volta durante a cópia (com o lote publicado ou ainda
+        # em escrita): descarta tudo o que os lotes iniciados podem ter sobrescrito
+        sobrescritos = self.iniciadas - self.capacidade - self.cursor
+        if sobrescritos > 0:
+            lidos = lidos[sobrescritos:]
+            self.perdidas += min(sobrescritos, quantidade)
+        self.cursor = escritas
+        return lidos
+
+    def fechar(self):
+        """Desfaz o mapeamento; o criador também remove o segmento do sistema"""
+        self._cabecalho = self._nomes = self._registros = None
+        self._shm.close()
+        if self.criador:
+            self._shm.unlink()
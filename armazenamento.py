@@ -0,0 +1,234 @@
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+# === CONFIGURAÇÕES PADRÃO ===
+CAPACIDADE_INICIAL = 4096  # ~80 s a 50 Hz antes do primeiro crescimento
+FATOR_CRESCIMENTO = 2
+BLOCO_AMOSTRAS = 1 << 16  # sessão em disco: os arquivos crescem 65536 linhas por vez (~22 min a 50 Hz)
+INTERVALO_FSYNC = 1.0  # s entre sincronizações com o disco
+METADADOS = 'sessao.json'
+VERSAO_SESSAO = 1
+
+# Colunas da sessão: eixos brutos em float32 (precisão nativa do sensor Android),
+# tempo e grandezas derivadas em float64
+COLUNAS_SESSAO = (
+    ('tempo', np.float64),  # instante de chegada (epoch, segundos)
+    ('ax', np.float32),
+    ('ay', np.float32),
+    ('az', np.float32),
+    ('tilt', np.float64),   # graus
+    ('vib', np.float64),    # g
+)
+
+
+class SessaoColunar:
+    """Histórico de uma sessão em colunas NumPy tipadas.
+
+    Cada coluna é um único buffer contíguo que dobra de tamanho quando enche:
+    append é O(1) amortizado e as leituras devolvem visões sem cópia. Todas as
+    colunas compartilham o mesmo contador de linhas, então um leitor em outra
+    thread nunca vê colunas com comprimentos diferentes.
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_INICIAL, colunas=COLUNAS_SESSAO):
+        self._dtypes = dict(colunas)
+        self._capacidade = capacidade
+        self._dados = {nome: np.empty(capacidade, dtype) for nome, dtype in colunas}
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def nbytes(self):
+        return sum(coluna.nbytes for coluna in self._dados.values())
+
+    def _garantir_capacidade(self, necessaria):
+        if necessaria <= self._capacidade:
+            return
+        nova = self._capacidade
+        while nova < necessaria:
+            nova *= FATOR_CRESCIMENTO
+        for nome, antiga in self._dados.items():
+            dados = np.empty(nova, self._dtypes[nome])
+            dados[:self._n] = antiga[:self._n]
+            self._dados[nome] = dados
+        self._capacidade = nova
+
+    def adicionar(self, tempo, ax, ay, az, tilt, vib):
+        """Acrescenta uma amostra"""
+        i = self._n
+        self._garantir_capacidade(i + 1)
+        dados = self._dados
+        dados['tempo'][i] = tempo
+        dados['ax'][i] = ax
+        dados['ay'][i] = ay
+        dados['az'][i] = az
+        dados['tilt'][i] = tilt
+        dados['vib'][i] = vib
+        # Publica a linha só depois de todas as colunas estarem escritas
+        self._n = i + 1
+
+    def adicionar_lote(self, **colunas):
+        """Acrescenta várias amostras de uma vez (arrays de mesmo comprimento por coluna)"""
+        quantidade = len(colunas['tempo'])
+        i = self._n
+        self._garantir_capacidade(i + quantidade)
+        for nome, dados in self._dados.items():
+            dados[i:i + quantidade] = colunas[nome]
+        self._n = i + quantidade
+
+    def sincronizar(self):
+        """Sessão em memória: nada a persistir"""
+
+    def sincronizar_se_devido(self):
+        """Sessão em memória: nada a persistir"""
+
+    def fechar(self):
+        """Sessão em memória: nada a liberar"""
+
+    def coluna(self, nome):
+        """Visão somente leitura (sem cópia) das amostras já publicadas"""
+        n = self._n
+        visao = self._dados[nome][:n]
+        visao.flags.writeable = False
+        return visao
+
+    @property
+    def tempo(self):
+        return self.coluna('tempo')
+
+    @property
+    def tilts(self):
+        return self.coluna('tilt')
+
+    @property
+    def vibracoes(self):
+        return self.coluna('vib')
+
+    @property
+    def eixos(self):
+        return self.coluna('ax'), self.coluna('ay'), self.coluna('az')
+
+
+class SessaoEmDisco(SessaoColunar):
+    """Sessão colunar persistida: cada coluna é um arquivo mapeado em memória.
+
+    Os arquivos crescem em blocos de BLOCO_AMOSTRAS linhas e as leituras continuam
+    sendo visões sem cópia do mapeamento. As páginas pertencem ao arquivo, então o
+    SO pode devolvê-las a qualquer momento e a RAM fica constante em campanhas
+    longas. A cada INTERVALO_FSYNC os dados vão para o disco e só então o número
+    de amostras é gravado em METADADOS: após uma queda, a sessão reaberta nunca
+    declara amostras que não chegaram ao disco. Abrir um diretório existente
+    continua a sessão a partir da última sincronização.
+    """
+
+    def __init__(self, diretorio, colunas=COLUNAS_SESSAO, bloco=BLOCO_AMOSTRAS, intervalo_fsync=INTERVALO_FSYNC):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self._dtypes = {nome: np.dtype(dtype) for nome, dtype in colunas}
+        self._bloco = bloco
+        self._intervalo_fsync = intervalo_fsync
+        self._lock_sincronizacao = threading.Lock()
+        self._n = 0
+        metadados = ler_metadados_sessao(diretorio)
+        if metadados is not None:
+            salvas = {nome: np.dtype(dtype) for nome, dtype in metadados['colunas']}
+            if salvas != self._dtypes:
+                raise ValueError(f"{diretorio}: colunas gravadas diferem das esperadas")
+            self._n = metadados['amostras']
+        self._arquivos = {}
+        for nome in self._dtypes:
+            caminho = os.path.join(diretorio, f"{nome}.bin")
+            self._arquivos[nome] = open(caminho, 'r+b' if os.path.exists(caminho) else 'w+b')
+        self._mapas = {}
+        self._dados = {}
+        self._capacidade = 0
+        self._mapear(max(self._n, 1))
+        self._ultima_sincronizacao = time.monotonic()
+
+    def _mapear(self, necessaria):
+        """Estende os arquivos até o próximo múltiplo do bloco e remapeia as colunas.
+
+        Visões já entregues continuam válidas: cada uma mantém vivo o mapeamento
+        de onde saiu.
+        """
+        capacidade = -(-necessaria // self._bloco) * self._bloco
+        for nome, arquivo in self._arquivos.items():
+            dtype = self._dtypes[nome]
+            if os.fstat(arquivo.fileno()).st_size < capacidade * dtype.itemsize:
+                arquivo.truncate(capacidade * dtype.itemsize)
+            mapa = np.memmap(arquivo, dtype, 'r+', shape=(capacidade,))
+            self._mapas[nome] = mapa
+            # ndarray comum: reduções e fatias não carregam a subclasse memmap adiante
+            self._dados[nome] = mapa.view(np.ndarray)
+        self._capacidade = capacidade
+
+    def _garantir_capacidade(self, necessaria):
+        if necessaria > self._capacidade:
+            self._mapear(necessaria)
+
+    def adicionar(self, tempo, ax, ay, az, tilt, vib):
+        super().adicionar(tempo, ax, ay, az, tilt, vib)
+        self.sincronizar_se_devido()
+
+    def adicionar_lote(self, **colunas):
+        super().adicionar_lote(**colunas)
+        self.sincronizar_se_devido()
+
+    def sincronizar_se_devido(self):
+        """Sincroniza se já passou INTERVALO_FSYNC; a recepção chama também quando fica ociosa,
+        senão as últimas amostras antes de um dispositivo parar não iriam ao disco"""
+        if self._arquivos and time.monotonic() - self._ultima_sincronizacao >= self._intervalo_fsync:
+            self.sincronizar()
+
+    def sincronizar(self):
+        """Grava os dados no disco (msync + fsync) e depois o número de amostras"""
+        with self._lock_sincronizacao:
+            n = self._n
+            for mapa in self._mapas.values():
+                mapa.flush()
+            for arquivo in self._arquivos.values():
+                os.fsync(arquivo.fileno())
+            metadados = {
+                'versao': VERSAO_SESSAO,
+                'colunas': [[nome, dtype.str] for nome, dtype in self._dtypes.items()],
+                'amostras': n,
+            }
+            temporario = os.path.join(self.diretorio, METADADOS + '.tmp')
+            with open(temporario, 'w') as arquivo:
+                json.dump(metadados, arquivo)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(temporario, os.path.join(self.diretorio, METADADOS))
+            self._ultima_sincronizacao = time.monotonic()
+
+    def fechar(self):
+        """Sincroniza e fecha os arquivos; as visões entregues continuam legíveis (fechar de novo é no-op)"""
+        if not self._arquivos:
+            return
+        self.sincronizar()
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+        # Cada mapeamento é desfeito quando a última visão entregue dele deixa de existir
+        self._arquivos = {}
+        self._mapas = {}
+
+
+def ler_metadados_sessao(diretorio):
+    """Metadados de uma sessão em disco, ou None se o diretório não tem sessão sincronizada"""
+    try:
+        with open(os.path.join(diretorio, METADADOS)) as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return None
+
+
+def nome_diretorio(identificador):
+    """Identificador de dispositivo (IP ou IP:porta) como nome de diretório válido em qualquer SO"""
+    return re.sub(r'[^\w.-]', '_', identificador)
@@ -0,0 +1,78 @@
+import os
+import queue
+import threading
+import time
+
+# === CONFIGURAÇÕES PADRÃO ===
+INTERVALO_MINIMO = 2.0  # segundos entre duas reproduções do mesmo alerta
+TAMANHO_FILA = 8
+
+
+class AlertasSonoros:
+    """Toca os alertas numa thread própria, com os sons decodificados uma única vez.
+
+    tocar() nunca bloqueia: só coloca o nome na fila. Pedidos repetidos de um som
+    que já está na fila são descartados, e cada som respeita um intervalo mínimo
+    entre reproduções, então rajadas de alertas não acumulam áudio atrasado.
+    """
+
+    def __init__(self, arquivos, intervalo_minimo=INTERVALO_MINIMO, tamanho_fila=TAMANHO_FILA):
+        self._arquivos = list(arquivos)
+        self._intervalo_minimo = intervalo_minimo
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._pendentes = set()
+        self._lock = threading.Lock()
+        self._sons = {}
+        self._ultima_reproducao = {}
+        self._thread = None
+
+    def iniciar(self):
+        """Inicializa o mixer, decodifica os arquivos e sobe a thread de reprodução"""
+        if self._thread is not None:
+            return
+        try:
+            import pygame
+            pygame.mixer.init()
+        except Exception as e:
+            # Sem dispositivo de áudio (ou sem pygame): os alertas continuam só visuais
+            print(f"⚠️ Áudio indisponível: {e}")
+            return
+
+        for nome in self._arquivos:
+            if not os.path.isfile(nome):
+                print(f"⚠️ Arquivo de alerta não encontrado: {nome}")
+                continue
+            try:
+                self._sons[nome] = pygame.mixer.Sound(nome)
+            except Exception as e:
+                print(f"Erro ao carregar alerta {nome}: {e}")
+
+        self._thread = threading.Thread(target=self._reproduzir, daemon=True)
+        self._thread.start()
+
+    def tocar(self, nome):
+        """Pede a reprodução de um alerta sem bloquear quem chamou"""
+        if nome not in self._sons:
+            return
+        with self._lock:
+            if nome in self._pendentes:
+                return
+            try:
+                self._fila.put_nowait(nome)
+            except queue.Full:
+                return
+            self._pendentes.add(nome)
+
+    def _reproduzir(self):
+        while True:
+            nome = self._fila.get()
+            with self._lock:
+                self._pendentes.discard(nome)
+            agora = time.monotonic()
+            if agora - self._ultima_reproducao.get(nome, float('-inf')) < self._intervalo_minimo:
+                continue
+            self._ultima_reproducao[nome] = agora
+            try:
+                self._sons[nome].play()
+            except Exception as e:
+                print(f"Erro ao tocar alerta {nome}: {e}")
@@ -0,0 +1,68 @@
+"""Sessão em memória (SessaoColunar) x persistida em disco (SessaoEmDisco).
+
+Acrescenta lotes como os do pipeline de ingestão e mede o custo por amostra,
+o tempo da sincronização com o disco e a leitura das colunas. Por fim reabre a
+sessão em disco e confere que tudo o que foi sincronizado voltou intacto.
+
+Uso: python benchmarks/bench_armazenamento.py [amostras] [lote]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import COLUNAS_SESSAO, SessaoColunar, SessaoEmDisco  # noqa: E402
+
+
+def gerar_lotes(n, tamanho):
+    rng = np.random.default_rng(42)
+    colunas = {nome: rng.normal(size=n).astype(dtype) for nome, dtype in COLUNAS_SESSAO}
+    for inicio in range(0, n, tamanho):
+        yield {nome: dados[inicio:inicio + tamanho] for nome, dados in colunas.items()}
+
+
+def medir(sessao, n, tamanho):
+    lotes = list(gerar_lotes(n, tamanho))
+    inicio = time.perf_counter()
+    for lote in lotes:
+        sessao.adicionar_lote(**lote)
+    ns_amostra = (time.perf_counter() - inicio) / n * 1e9
+    inicio = time.perf_counter()
+    sessao.sincronizar()
+    ms_sincronizar = (time.perf_counter() - inicio) * 1e3
+    inicio = time.perf_counter()
+    total = float(np.sum(sessao.tilts)) + float(np.sum(sessao.vibracoes))
+    ms_leitura = (time.perf_counter() - inicio) * 1e3
+    return ns_amostra, ms_sincronizar, ms_leitura, total
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    tamanho = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    print(f"{n} amostras em lotes de {tamanho}\n")
+    print(f"{'sessão':<10}{'ns/amostra':>12}{'sincronizar (ms)':>18}{'leitura (ms)':>14}")
+
+    resultado = medir(SessaoColunar(), n, tamanho)
+    print(f"{'memória':<10}{resultado[0]:>12.0f}{'-':>18}{resultado[2]:>14.1f}")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        sessao = SessaoEmDisco(diretorio)
+        resultado_disco = medir(sessao, n, tamanho)
+        print(f"{'disco':<10}{resultado_disco[0]:>12.0f}{resultado_disco[1]:>18.1f}{resultado_disco[2]:>14.1f}")
+        sessao.fechar()
+
+        inicio = time.perf_counter()
+        reaberta = SessaoEmDisco(diretorio)
+        ms_reabrir = (time.perf_counter() - inicio) * 1e3
+        intacta = len(reaberta) == n and float(np.sum(reaberta.tilts)) + float(np.sum(reaberta.vibracoes)) == resultado_disco[3]
+        print(f"\nreaberta em {ms_reabrir:.1f} ms: {len(reaberta)} amostras, {'intacta' if intacta else 'DIVERGENTE'}")
+        reaberta.fechar()
+        del sessao, reaberta
+
+
+if __name__ == '__main__':
+    main()
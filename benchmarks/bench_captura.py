@@ -0,0 +1,84 @@
+"""Captura de quadros do vídeo: caminho original x reaproveitando o buffer do gráfico ao vivo.
+
+O original desenha o canvas de novo a cada quadro capturado (canvas.draw +
+flush_events), converte RGB->BGR e redimensiona duas vezes, tudo na thread do
+Tk. O novo só copia o buffer RGBA que o blitting acabou de desenhar; redução e
+conversão rodam na thread de captura. Mede o custo por quadro na thread que
+desenha (o que tira da taxa do gráfico ao vivo) e, à parte, o custo por quadro
+na thread de captura (que precisa caber no intervalo de 1/15 s da gravação).
+
+Uso: python benchmarks/bench_captura.py [quadros]
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import SessaoColunar  # noqa: E402
+from captura_video import CapturaQuadros  # noqa: E402
+from grafico_ao_vivo import GraficoAoVivo  # noqa: E402
+
+JANELA = 20
+
+
+def capturar_original(canvas, quadros):
+    buf = np.asarray(canvas.buffer_rgba())
+    frame = cv2.cvtColor(buf[:, :, :3], cv2.COLOR_RGB2BGR)
+    frame = cv2.resize(frame, (640, 480))
+    frame = cv2.resize(frame, (640, 480), interpolation=cv2.INTER_LINEAR)
+    quadros.append(frame.copy())
+
+
+def medir(quadros, novo):
+    fig = Figure(figsize=(7, 5))
+    canvas = FigureCanvasAgg(fig)
+    axs = fig.subplots(2, 1)
+    grafico = GraficoAoVivo(fig, axs, canvas, JANELA, '#FF8800', '#FFFFFF', '#232323')
+    sessao = SessaoColunar()
+    rng = np.random.default_rng(0)
+    guardados = []
+    captura = CapturaQuadros(lambda quadro, instante: guardados.append(quadro.copy())) if novo else None
+
+    desenho = tk = thread_captura = 0.0
+    for i in range(quadros):
+        sessao.adicionar(i / 50, 0.0, 0.0, 9.81, rng.uniform(0, 50), rng.uniform(0, 2))
+        t0 = time.perf_counter()
+        grafico.desenhar(True, True, 'g', sessao)
+        t1 = time.perf_counter()
+        if novo:
+            captura.capturar(np.asarray(canvas.buffer_rgba()))
+            t2 = time.perf_counter()
+            captura.esperar()  # isola o custo da thread de captura (na gravação ela tem 1/15 s)
+            thread_captura += time.perf_counter() - t2
+        else:
+            canvas.draw()
+            canvas.flush_events()
+            capturar_original(canvas, guardados)
+            t2 = time.perf_counter()
+        desenho += t1 - t0
+        tk += t2 - t1
+    return desenho / quadros * 1e3, tk / quadros * 1e3, thread_captura / quadros * 1e3, guardados
+
+
+def main():
+    quadros = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{quadros} quadros ao vivo, todos capturados\n")
+    print(f"{'caminho':<10}{'gráfico (ms)':>14}{'captura, thread do Tk (ms)':>28}{'thread de captura (ms)':>24}")
+    resultados = {}
+    for nome, novo in (('original', False), ('buffer', True)):
+        desenho, tk, thread_captura, guardados = resultados[nome] = medir(quadros, novo)
+        print(f"{nome:<10}{desenho:>14.2f}{tk:>28.2f}{thread_captura:>24.2f}")
+    original, novo = resultados['original'][3], resultados['buffer'][3]
+    diferenca = max(cv2.absdiff(a, b).max() for a, b in zip(original, novo))
+    print(f"\n{len(novo)} quadros {novo[0].shape[1]}x{novo[0].shape[0]}; maior diferença de pixel "
+          f"entre os caminhos: {diferenca} (INTER_AREA x INTER_LINEAR na redução)")
+
+
+if __name__ == '__main__':
+    main()
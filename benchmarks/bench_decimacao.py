@@ -0,0 +1,60 @@
+"""Gráfico do histórico inteiro: série completa x reduzida à largura do eixo.
+
+Desenha a série num Figure com canvas Agg (o mesmo caminho dos gráficos dos
+relatórios, 8x4 polegadas a 150 dpi) com todos os pontos e com a decimação
+mín/máx e LTTB, e confere que o pico da série sobrevive à redução.
+
+Uso: python benchmarks/bench_decimacao.py [amostras,...]
+"""
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processamento import reduzir_serie  # noqa: E402
+
+DPI = 150
+
+
+def gerar_serie(n, semente=42):
+    """Inclinação lenta com ruído e um pico isolado, como um alerta numa sessão longa"""
+    rng = np.random.default_rng(semente)
+    y = 2 + np.sin(np.arange(n) / 5000) + rng.normal(0, 0.2, n)
+    y[int(n * 0.61)] = 9.5
+    return y
+
+
+def desenhar(y, metodo):
+    fig = Figure(figsize=(8, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    inicio = time.perf_counter()
+    if metodo is None:
+        x, valores = np.arange(len(y)), y
+    else:
+        x, valores = reduzir_serie(y, ax.bbox.width * DPI / fig.dpi, metodo)
+    reducao = time.perf_counter() - inicio
+    ax.plot(x, valores, linewidth=2)
+    fig.savefig(io.BytesIO(), format='png', dpi=DPI)
+    return reducao, time.perf_counter() - inicio, len(valores), float(np.max(valores))
+
+
+def main():
+    tamanhos = [int(n) for n in sys.argv[1].split(',')] if len(sys.argv) > 1 else [180_000, 1_000_000, 5_000_000]
+    print(f"{'amostras':>10}{'método':>9}{'pontos':>9}{'redução (ms)':>14}{'total (ms)':>12}  pico")
+    for n in tamanhos:
+        y = gerar_serie(n)
+        for metodo in (None, 'minmax', 'lttb'):
+            reducao, total, pontos, pico = desenhar(y, metodo)
+            print(f"{n:>10}{metodo or 'todos':>9}{pontos:>9}{reducao * 1e3:>14.1f}{total * 1e3:>12.0f}"
+                  f"  {'mantido' if pico == y.max() else f'perdido ({pico:.2f})'}")
+
+
+if __name__ == '__main__':
+    main()
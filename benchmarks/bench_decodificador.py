@@ -0,0 +1,50 @@
+"""Microbenchmark do decodificador SensaGram contra o caminho original (json.loads + dict).
+
+Uso: python benchmarks/bench_decodificador.py [repeticoes]
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensagram import BACKEND_JSON, _extrair_rapido, decodificar_acelerometro  # noqa: E402
+
+PACOTES = {
+    'acelerômetro': b'{"type": "android.sensor.accelerometer", "timestamp": 3925657519043709, '
+                    b'"values": [0.31892395, -0.97802734, 10.049896]}',
+    'giroscópio': b'{"type": "android.sensor.gyroscope", "timestamp": 3925657519043709, '
+                  b'"values": [0.0012, -0.0034, 0.0001]}',
+    'magnetômetro': b'{"type": "android.sensor.magnetic_field", "timestamp": 3925657519043709, '
+                    b'"values": [-12.5, 30.25, -40.0]}',
+}
+
+
+def caminho_original(data):
+    obj = json.loads(data.decode())
+    if 'accelerometer' not in obj.get('type', ''):
+        return None
+    ax, ay, az = obj.get('values')[:3]
+    return ax, ay, az
+
+
+def medir_ns(funcao, data, repeticoes):
+    return min(timeit.repeat(lambda: funcao(data), number=repeticoes, repeat=3)) / repeticoes * 1e9
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"Backend JSON: {BACKEND_JSON} | {repeticoes} pacotes por medição\n")
+    print(f"{'pacote':<14}{'original (ns)':>16}{'decodificador (ns)':>20}{'ganho':>8}{'recorte bytes (ns)':>20}")
+    for nome, data in PACOTES.items():
+        assert caminho_original(data) == decodificar_acelerometro(data)
+        ns_original = medir_ns(caminho_original, data, repeticoes)
+        ns_rapido = medir_ns(decodificar_acelerometro, data, repeticoes)
+        # Caminho usado quando o orjson não está instalado
+        ns_recorte = medir_ns(_extrair_rapido, data, repeticoes)
+        print(f"{nome:<14}{ns_original:>16.0f}{ns_rapido:>20.0f}{ns_original / ns_rapido:>7.1f}x{ns_recorte:>20.0f}")
+
+
+if __name__ == '__main__':
+    main()
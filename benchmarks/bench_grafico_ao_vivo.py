@@ -0,0 +1,102 @@
+"""Quadro do gráfico ao vivo: redesenho completo (ax.clear + tight_layout + draw) x blitting.
+
+Reproduz os dois caminhos com os dois gráficos visíveis, numa figura 7x5 com
+canvas Agg (o TkAgg desenha com o mesmo Agg e só copia a imagem para a tela).
+A cada quadro chega uma amostra nova na janela móvel e na sessão. Mostra o custo por quadro
+e a fração de um núcleo que cada caminho ocuparia a 30 e 60 quadros/s.
+
+Uso: python benchmarks/bench_grafico_ao_vivo.py [quadros]
+"""
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import SessaoColunar  # noqa: E402
+from grafico_ao_vivo import GraficoAoVivo  # noqa: E402
+from processamento import suavizar_fft  # noqa: E402
+
+JANELA = 20
+COR_LARANJA = '#FF8800'
+COR_TEXTO = '#FFFFFF'
+COR_CINZA = '#232323'
+
+
+def criar_figura():
+    fig = Figure(figsize=(7, 5))
+    canvas = FigureCanvasAgg(fig)
+    axs = fig.subplots(2, 1)
+    fig.patch.set_facecolor(COR_CINZA)
+    return fig, axs, canvas
+
+
+def quadro_completo(fig, axs, canvas, tilts, vibracoes):
+    """O corpo ao vivo original de update_graph (tilt e vibração, unidade g)"""
+    for ax in axs:
+        ax.clear()
+        ax.set_visible(False)
+    axs[0].set_visible(True)
+    axs[1].set_visible(True)
+    suave = suavizar_fft(list(tilts))
+    axs[0].plot(list(range(len(suave))), suave, color=COR_LARANJA, linewidth=2)
+    axs[0].set_ylim(0, 100)
+    axs[0].set_title('Inclinação (°)', color=COR_LARANJA, fontsize=12, fontweight='bold')
+    axs[0].set_ylabel('Grau', color=COR_TEXTO)
+    axs[0].set_facecolor(COR_CINZA)
+    suave = suavizar_fft(list(vibracoes))
+    axs[1].plot(list(range(len(suave))), suave, color='#FFB266', linewidth=2)
+    axs[1].set_ylim(0, 5)
+    axs[1].set_title('Vibração (g)', color=COR_LARANJA, fontsize=12, fontweight='bold')
+    axs[1].set_ylabel('g', color=COR_TEXTO)
+    axs[1].set_facecolor(COR_CINZA)
+    fig.tight_layout(pad=3.0)
+    canvas.draw()
+
+
+def chegar(rng, tilts, vibracoes, sessao):
+    tilt, vib = rng.uniform(0, 50), rng.uniform(0, 2)
+    tilts.append(tilt)
+    vibracoes.append(vib)
+    sessao.adicionar(len(sessao) / 50, 0.0, 0.0, 9.81, tilt, vib)
+
+
+def medir(quadros, desenhar):
+    rng = np.random.default_rng(0)
+    tilts = deque(maxlen=JANELA)
+    vibracoes = deque(maxlen=JANELA)
+    sessao = SessaoColunar()
+    for _ in range(JANELA):
+        chegar(rng, tilts, vibracoes, sessao)
+    desenhar(tilts, vibracoes, sessao)  # montagem / primeiro desenho fora da medição
+    inicio = time.perf_counter()
+    for _ in range(quadros):
+        chegar(rng, tilts, vibracoes, sessao)
+        desenhar(tilts, vibracoes, sessao)
+    return (time.perf_counter() - inicio) / quadros
+
+
+def main():
+    quadros = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    fig, axs, canvas = criar_figura()
+    completo = medir(quadros, lambda t, v, s: quadro_completo(fig, axs, canvas, t, v))
+
+    fig, axs, canvas = criar_figura()
+    grafico = GraficoAoVivo(fig, axs, canvas, JANELA, COR_LARANJA, COR_TEXTO, COR_CINZA)
+    blit = medir(quadros, lambda t, v, s: grafico.desenhar(True, True, 'g', s))
+
+    print(f"{quadros} quadros, inclinação + vibração\n")
+    print(f"{'caminho':<12}{'ms/quadro':>11}{'CPU a 30/s':>12}{'CPU a 60/s':>12}")
+    for nome, custo in (('completo', completo), ('blitting', blit)):
+        print(f"{nome:<12}{custo * 1e3:>11.2f}{min(1, custo * 30):>12.0%}{min(1, custo * 60):>12.0%}")
+    print(f"\nblitting: {completo / blit:.0f}x mais barato por quadro")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Gravação do vídeo: frames_buffer em memória + codificação no fim x codificador em fluxo.
+
+Simula uma gravação de N quadros 640x480 a 15 FPS (instantes sintéticos, sem
+esperar o relógio). O caminho original guarda cópias em frames_buffer (no máximo
+1000) e só codifica ao parar; o novo entrega cada quadro ao CodificadorVideo,
+que grava enquanto a "sessão" continua. Mede o pico de memória dos quadros
+(tracemalloc), o tempo de parada (o que o usuário espera ao clicar em parar) e
+a duração do vídeo resultante.
+
+Uso: python benchmarks/bench_gravacao.py [quadros]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from captura_video import CodificadorVideo  # noqa: E402
+
+FPS = 15
+LIMITE_ORIGINAL = 1000
+
+
+def quadros_sinteticos(n):
+    quadro = np.zeros((480, 640, 3), dtype=np.uint8)
+    for i in range(n):
+        quadro[:] = i % 256
+        cv2.putText(quadro, str(i), (40, 240), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 4)
+        yield quadro, i / FPS
+
+
+def original(arquivo, n):
+    frames_buffer = []
+    for quadro, _ in quadros_sinteticos(n):
+        frames_buffer.append(quadro.copy())
+        if len(frames_buffer) > LIMITE_ORIGINAL:
+            frames_buffer.pop(0)
+    inicio = time.perf_counter()
+    writer = cv2.VideoWriter(arquivo, cv2.VideoWriter_fourcc(*'mp4v'), FPS, (640, 480))
+    for frame in frames_buffer:
+        writer.write(frame)
+    writer.release()
+    return time.perf_counter() - inicio
+
+
+def fluxo(arquivo, n):
+    codificador = CodificadorVideo(arquivo, FPS)
+    for quadro, instante in quadros_sinteticos(n):
+        codificador.escrever(quadro, instante)
+    inicio = time.perf_counter()
+    codificador.encerrar()
+    return time.perf_counter() - inicio
+
+
+def duracao_video(arquivo):
+    video = cv2.VideoCapture(arquivo)
+    quadros = video.get(cv2.CAP_PROP_FRAME_COUNT)
+    fps = video.get(cv2.CAP_PROP_FPS)
+    video.release()
+    return quadros / fps if fps else 0.0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{n} quadros 640x480 a {FPS} FPS ({n / FPS:.0f} s de gravação)\n")
+    print(f"{'caminho':<10}{'pico (MB)':>11}{'parada (s)':>12}{'vídeo (s)':>11}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, gravar in (('original', original), ('fluxo', fluxo)):
+            arquivo = os.path.join(pasta, f"{nome}.mp4")
+            tracemalloc.start()
+            parada = gravar(arquivo, n)
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{nome:<10}{pico / 2**20:>11.1f}{parada:>12.2f}{duracao_video(arquivo):>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
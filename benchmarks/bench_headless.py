@@ -0,0 +1,66 @@
+"""Partida e memória do modo headless x pilha de bibliotecas da interface.
+
+Cada medição roda num processo novo: o modo headless sobe até estar pronto para
+receber (módulos importados, diário aberto, socket ligado); o lado da interface
+importa a mesma pilha que main.py (customtkinter, matplotlib com TkAgg, pygame,
+OpenCV, PyMuPDF, ebooklib, jinja2). A janela em si não é criada (exigiria um
+display), então os números da interface são um limite inferior.
+
+Uso: python benchmarks/bench_headless.py [repeticoes]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEDIR = """
+import resource, sys, time
+inicio = time.perf_counter()
+{codigo}
+pronto = time.perf_counter() - inicio
+pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(pronto, pico * (1 if sys.platform == 'darwin' else 1024))
+"""
+
+HEADLESS = """
+import servico
+s = servico.Servico(servico.ler_argumentos(['--formatos', '', '--sessoes', {sessoes!r}]))
+s.iniciar_persistencia()
+from receptor_udp import ReceptorUDP
+s.receptor = ReceptorUDP(0)
+"""
+
+INTERFACE = """
+import customtkinter, matplotlib.pyplot, pygame, cv2, fitz, ebooklib.epub, jinja2
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import ingestao, dispositivos, diario, armazenamento, receptor_udp, receptor_asyncio, ingestao_processo
+"""
+
+
+def medir(codigo, repeticoes):
+    tempos, picos = [], []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', MEDIR.format(codigo=codigo)], cwd=RAIZ,
+                               capture_output=True, text=True, check=True).stdout.split()
+        tempos.append(float(saida[-2]))
+        picos.append(int(saida[-1]))
+    return statistics.median(tempos), max(picos)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as sessoes:
+        headless = medir(HEADLESS.format(sessoes=sessoes), repeticoes)
+    interface = medir(INTERFACE, repeticoes)
+    print(f"{repeticoes} partidas de cada (mediana do tempo, maior pico de memória)\n")
+    print(f"{'modo':<22}{'partida (ms)':>14}{'memória (MB)':>14}")
+    print(f"{'headless':<22}{headless[0] * 1e3:>14.0f}{headless[1] / 2**20:>14.1f}")
+    print(f"{'bibliotecas da GUI':<22}{interface[0] * 1e3:>14.0f}{interface[1] / 2**20:>14.1f}")
+    print(f"\nheadless: {headless[0] / interface[0]:.0%} do tempo e {headless[1] / interface[1]:.0%} da memória")
+
+
+if __name__ == '__main__':
+    main()
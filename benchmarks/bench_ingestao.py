@@ -0,0 +1,137 @@
+"""Compara os backends de ingestão (thread + seletor vs asyncio): pacotes/s e latência por pacote.
+
+Um processo separado envia pacotes SensaGram para localhost com o instante de envio
+(perf_counter_ns) no campo timestamp. Cada backend recebe, demultiplexa e decodifica.
+
+Uso: python benchmarks/bench_ingestao.py [--pacotes N] [--taxa-latencia HZ] [--porta P]
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dispositivos import Dispositivos  # noqa: E402
+from receptor_asyncio import ReceptorAsyncio  # noqa: E402
+from receptor_udp import ReceptorUDP  # noqa: E402
+from sensagram import decodificar_acelerometro  # noqa: E402
+
+OCIOSIDADE_MAXIMA = 1.0  # s sem pacotes após o primeiro encerra a medição
+ESPERA_PRIMEIRO = 10.0
+CHAVE_TIMESTAMP = b'"timestamp": '
+
+
+def enviar(porta, total, taxa):
+    """Processo emissor: taxa=0 envia o mais rápido possível"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    destino = ('127.0.0.1', porta)
+    intervalo = 1.0 / taxa if taxa else 0.0
+    proximo = time.perf_counter()
+    for _ in range(total):
+        payload = (b'{"type": "android.sensor.accelerometer", "timestamp": %d, '
+                   b'"values": [0.1, -0.2, 9.8]}' % time.perf_counter_ns())
+        sock.sendto(payload, destino)
+        if intervalo:
+            proximo += intervalo
+            while time.perf_counter() < proximo:
+                pass
+    sock.close()
+
+
+class Coletor:
+    """Processamento de referência: demultiplexa, decodifica e mede a latência"""
+
+    def __init__(self, total):
+        self.total = total
+        self.dispositivos = Dispositivos(20, 20, 0)
+        self.latencias_ns = []
+        self.recebidos = 0
+        self.primeiro = None
+        self.ultimo = None
+        self.criado = time.perf_counter()
+
+    def __call__(self, data, endereco):
+        agora = time.perf_counter_ns()
+        self.dispositivos.obter(endereco)
+        decodificar_acelerometro(data)
+        inicio = data.index(CHAVE_TIMESTAMP) + len(CHAVE_TIMESTAMP)
+        self.latencias_ns.append(agora - int(data[inicio:data.index(b',', inicio)]))
+        self.recebidos += 1
+        self.ultimo = time.perf_counter()
+        if self.primeiro is None:
+            self.primeiro = self.ultimo
+
+    def continuar(self):
+        if self.recebidos >= self.total:
+            return False
+        agora = time.perf_counter()
+        if self.ultimo is None:
+            return agora - self.criado < ESPERA_PRIMEIRO
+        return agora - self.ultimo < OCIOSIDADE_MAXIMA
+
+
+def rodar_thread(porta, coletor):
+    with ReceptorUDP(porta) as receptor:
+        while coletor.continuar():
+            for data, endereco in receptor.receber_lote(0.1):
+                coletor(data, endereco)
+
+
+def rodar_asyncio(porta, coletor):
+    receptor = ReceptorAsyncio([porta], coletor, coletor.continuar, espera_maxima=0.1)
+    receptor.executar()
+
+
+def medir(backend, porta, total, taxa):
+    coletor = Coletor(total)
+    alvo = rodar_asyncio if backend == 'asyncio' else rodar_thread
+    receptor = threading.Thread(target=alvo, args=(porta, coletor))
+    receptor.start()
+    time.sleep(0.3)  # garante o bind antes do primeiro envio
+    emissor = multiprocessing.Process(target=enviar, args=(porta, total, taxa))
+    emissor.start()
+    emissor.join()
+    receptor.join()
+
+    duracao = (coletor.ultimo - coletor.primeiro) if coletor.recebidos > 1 else 0
+    latencias_us = sorted(v / 1000 for v in coletor.latencias_ns)
+
+    def percentil(p):
+        return latencias_us[min(len(latencias_us) - 1, int(p / 100 * len(latencias_us)))] if latencias_us else 0
+
+    return {
+        'recebidos': coletor.recebidos,
+        'perdidos': total - coletor.recebidos,
+        'pacotes_s': coletor.recebidos / duracao if duracao else 0,
+        'p50': percentil(50),
+        'p99': percentil(99),
+        'media': statistics.fmean(latencias_us) if latencias_us else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pacotes', type=int, default=100_000, help='pacotes na medição de vazão')
+    parser.add_argument('--taxa-latencia', type=int, default=1000, help='Hz na medição de latência')
+    parser.add_argument('--duracao-latencia', type=float, default=3.0, help='segundos na medição de latência')
+    parser.add_argument('--porta', type=int, default=5099)
+    args = parser.parse_args()
+
+    total_latencia = int(args.taxa_latencia * args.duracao_latencia)
+    print(f"{'backend':<10}{'fase':<12}{'pacotes/s':>12}{'perdidos':>10}"
+          f"{'lat. média (µs)':>17}{'p50 (µs)':>10}{'p99 (µs)':>10}")
+    for backend in ('thread', 'asyncio'):
+        for fase, total, taxa in (('vazão', args.pacotes, 0),
+                                  (f'{args.taxa_latencia} Hz', total_latencia, args.taxa_latencia)):
+            r = medir(backend, args.porta, total, taxa)
+            print(f"{backend:<10}{fase:<12}{r['pacotes_s']:>12.0f}{r['perdidos']:>10}"
+                  f"{r['media']:>17.1f}{r['p50']:>10.1f}{r['p99']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Vazão de ponta a ponta: gerador SensaGram sintético -> recepção -> pipeline completo.
+
+Um processo separado roda o gerador_sensagram (acelerômetro + giroscópio, vários
+dispositivos) e a ingestão processa tudo: demultiplexação, decodificação, filtro de
+gravidade, inclinação, vibração e alertas. Para cada taxa são medidos pacotes/s
+sustentados, perda (enviados x processados, com os descartes do kernel quando o SO
+informa), latência envio -> fim do lote processado e uso de CPU do processo receptor.
+
+Uso: python benchmarks/bench_ponta_a_ponta.py [--taxas 50,1000,10000] [--dispositivos N] [--duracao S]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dispositivos import Dispositivos  # noqa: E402
+from gerador_sensagram import gerar_carga  # noqa: E402
+from ingestao import PipelineIngestao  # noqa: E402
+from receptor_asyncio import ReceptorAsyncio  # noqa: E402
+from receptor_udp import ReceptorUDP  # noqa: E402
+from sensagram import extrair_timestamp  # noqa: E402
+
+OCIOSIDADE_MAXIMA = 1.0  # s sem pacotes após o fim do envio encerra a medição
+
+
+def processo_gerador(porta, taxa, dispositivos, duracao, resultado):
+    resultado.put(gerar_carga(('127.0.0.1', porta), taxa, dispositivos, duracao))
+
+
+class Medidor:
+    """Envolve o pipeline: registra o timestamp de envio de cada pacote e a latência ao fim do lote"""
+
+    def __init__(self):
+        # chave='endereco': cada socket do gerador é um dispositivo mesmo sem IPs distintos
+        self.pipeline = PipelineIngestao(Dispositivos(20, 20, 20, chave='endereco'),
+                                         {'monitorar_tilt': True, 'monitorar_vib': True})
+        self.latencias_ns = []
+        self._pendentes = []
+        self.ultimo = None
+        self.primeiro = None
+        self.receptor = None
+        self.descartes_kernel = None
+
+    def ao_receber(self, data, endereco):
+        self.pipeline.processar_datagrama(data, endereco)
+        timestamp = extrair_timestamp(data)
+        if timestamp is not None:
+            self._pendentes.append(timestamp)
+
+    def fim_do_lote(self):
+        self.pipeline.processar_pendentes()
+        agora = time.perf_counter_ns()
+        self.latencias_ns.extend(agora - t for t in self._pendentes)
+        if self._pendentes:
+            self.ultimo = time.perf_counter()
+            if self.primeiro is None:
+                self.primeiro = self.ultimo
+        self._pendentes = []
+
+
+def rodar_thread(porta, medidor, continuar):
+    with ReceptorUDP(porta) as receptor:
+        medidor.receptor = receptor
+        while continuar():
+            for data, endereco in receptor.receber_lote(0.1):
+                medidor.ao_receber(data, endereco)
+            medidor.fim_do_lote()
+
+
+def rodar_asyncio(porta, medidor, continuar):
+    receptor = ReceptorAsyncio([porta], medidor.ao_receber, continuar, espera_maxima=0.1,
+                               ao_fim_do_lote=medidor.fim_do_lote)
+    medidor.receptor = receptor
+    receptor.executar()
+
+
+def medir(backend, porta, taxa, dispositivos, duracao):
+    medidor = Medidor()
+    envio_terminado = threading.Event()
+
+    def continuar():
+        if not envio_terminado.is_set():
+            return True
+        if medidor.ultimo is not None and time.perf_counter() - medidor.ultimo < OCIOSIDADE_MAXIMA:
+            return True
+        # Último momento com o socket aberto: lê o contador de descartes do kernel
+        medidor.descartes_kernel = medidor.receptor.descartes_kernel()
+        return False
+
+    alvo = rodar_asyncio if backend == 'asyncio' else rodar_thread
+    receptor = threading.Thread(target=alvo, args=(porta, medidor, continuar))
+    receptor.start()
+    time.sleep(0.3)  # garante o bind antes do primeiro envio
+
+    resultado = multiprocessing.Queue()
+    gerador = multiprocessing.Process(target=processo_gerador, args=(porta, taxa, dispositivos, duracao, resultado))
+    cpu_inicio = time.process_time()
+    parede_inicio = time.perf_counter()
+    gerador.start()
+    enviados_acc, enviados_gyro = resultado.get()
+    gerador.join()
+    envio_terminado.set()
+    receptor.join()
+    cpu = time.process_time() - cpu_inicio
+    parede = time.perf_counter() - parede_inicio
+
+    saude = medidor.pipeline.saude
+    enviados = enviados_acc + enviados_gyro
+    duracao_medida = (medidor.ultimo - medidor.primeiro) if medidor.primeiro and medidor.ultimo > medidor.primeiro else 0
+    latencias_us = sorted(v / 1000 for v in medidor.latencias_ns)
+
+    def percentil(p):
+        return latencias_us[min(len(latencias_us) - 1, int(p / 100 * len(latencias_us)))] if latencias_us else 0
+
+    return {
+        'enviados': enviados,
+        'recebidos': saude.recebidos,
+        'pacotes_s': saude.recebidos / duracao_medida if duracao_medida else 0,
+        'perda': 1 - saude.recebidos / enviados if enviados else 0,
+        'kernel': medidor.descartes_kernel,
+        'p50': percentil(50),
+        'p99': percentil(99),
+        'max': latencias_us[-1] if latencias_us else 0,
+        'cpu': 100 * cpu / parede if parede else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--taxas', default='50,1000,5000,20000', help='Hz por dispositivo, separados por vírgula')
+    parser.add_argument('--dispositivos', type=int, default=2)
+    parser.add_argument('--duracao', type=float, default=3.0, help='segundos de envio por medição')
+    parser.add_argument('--backends', default='thread,asyncio')
+    parser.add_argument('--porta', type=int, default=5098)
+    args = parser.parse_args()
+
+    print(f"{args.dispositivos} dispositivo(s), acelerômetro + giroscópio, {args.duracao:g} s por medição\n")
+    print(f"{'backend':<9}{'Hz/disp.':>9}{'enviados':>10}{'pacotes/s':>11}{'perda':>8}{'kernel':>8}"
+          f"{'p50 (µs)':>10}{'p99 (µs)':>10}{'máx (µs)':>10}{'CPU':>7}")
+    for backend in args.backends.split(','):
+        for taxa in (float(t) for t in args.taxas.split(',')):
+            r = medir(backend, args.porta, taxa, args.dispositivos, args.duracao)
+            kernel = 'n/d' if r['kernel'] is None else r['kernel']
+            print(f"{backend:<9}{taxa:>9g}{r['enviados']:>10}{r['pacotes_s']:>11.0f}{r['perda']:>8.1%}{kernel:>8}"
+                  f"{r['p50']:>10.0f}{r['p99']:>10.0f}{r['max']:>10.0f}{r['cpu']:>6.0f}%")
+
+
+if __name__ == '__main__':
+    main()
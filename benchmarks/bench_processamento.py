@@ -0,0 +1,121 @@
+"""Compara o processamento por amostra (caminho original) com o lote vetorizado.
+
+Confere que inclinação, vibração e estado do filtro são idênticos bit a bit
+e mede o custo por amostra para vários tamanhos de lote e para a sessão inteira
+numa chamada (processar_sessao, a API da reanálise offline), mais a suavização
+dos gráficos: FFT complexa original x FFT real x cache por versão no histórico,
+e o passa-baixa incremental do gráfico ao vivo.
+
+Uso: python benchmarks/bench_processamento.py [amostras]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processamento import (LP_ALPHA, CacheSuavizacao, PassaBaixaStreaming, processar_lote,  # noqa: E402
+                           processar_sessao, suavizar_fft)
+
+
+def processar_escalar(ax, ay, az, gravity):
+    """Cópia do cálculo por amostra original de processar_dados_thread"""
+    gravity[0] = LP_ALPHA*gravity[0] + (1-LP_ALPHA)*ax
+    gravity[1] = LP_ALPHA*gravity[1] + (1-LP_ALPHA)*ay
+    gravity[2] = LP_ALPHA*gravity[2] + (1-LP_ALPHA)*az
+    gx, gy, gz = gravity
+    mag = math.sqrt(gx*gx + gy*gy + gz*gz)
+    cos_t = gz/mag if mag else 1
+    cos_t = max(-1.0, min(1.0, cos_t))
+    tilt_angle = math.degrees(math.acos(cos_t))
+    total_acc = math.sqrt(ax*ax + ay*ay + az*az)
+    vib = abs(total_acc - 9.81)
+    return tilt_angle, vib
+
+
+def suavizar_fft_original(data, freq_corte=10, fs=50):
+    """A suavização original: FFT complexa da série inteira, a partir de lista"""
+    n = len(data)
+    freqs = np.fft.fftfreq(n, d=1 / fs)
+    fft_vals = np.fft.fft(data)
+    fft_vals[np.abs(freqs) > freq_corte] = 0
+    return np.real(np.fft.ifft(fft_vals)).tolist()
+
+
+def gerar_sinal(n, semente=42):
+    rng = np.random.default_rng(semente)
+    t = np.arange(n) / 200.0
+    ax = 0.3 * np.sin(0.1 * t) + rng.normal(0, 0.05, n)
+    ay = -0.2 + rng.normal(0, 0.05, n)
+    az = 9.81 + 0.5 * np.sin(2 * np.pi * 12 * t) + rng.normal(0, 0.1, n)
+    return ax, ay, az
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    ax, ay, az = gerar_sinal(n)
+    listas = list(zip(ax.tolist(), ay.tolist(), az.tolist()))
+
+    gravity_escalar = [0.0, 0.0, 9.81]
+    inicio = time.perf_counter()
+    resultado = [processar_escalar(x, y, z, gravity_escalar) for x, y, z in listas]
+    ns_escalar = (time.perf_counter() - inicio) / n * 1e9
+    tilt_ref = np.array([r[0] for r in resultado])
+    vib_ref = np.array([r[1] for r in resultado])
+
+    print(f"{n} amostras | escalar: {ns_escalar:.0f} ns/amostra\n")
+    print(f"{'lote':>6}{'ns/amostra':>12}{'ganho':>8}  idêntico")
+    for tamanho in (1, 16, 64, 256, 1024):
+        gravity = [0.0, 0.0, 9.81]
+        tilts, vibs = [], []
+        inicio = time.perf_counter()
+        for i in range(0, n, tamanho):
+            tilt, vib = processar_lote(ax[i:i + tamanho], ay[i:i + tamanho], az[i:i + tamanho], gravity)
+            tilts.append(tilt)
+            vibs.append(vib)
+        ns_lote = (time.perf_counter() - inicio) / n * 1e9
+        identico = (np.array_equal(np.concatenate(tilts), tilt_ref)
+                    and np.array_equal(np.concatenate(vibs), vib_ref)
+                    and gravity == gravity_escalar)
+        print(f"{tamanho:>6}{ns_lote:>12.0f}{ns_escalar / ns_lote:>7.1f}x  {'sim' if identico else 'NÃO'}")
+
+    inicio = time.perf_counter()
+    tilts, vibs, gravity = processar_sessao(ax.astype(np.float32), ay.astype(np.float32), az.astype(np.float32))
+    ns_sessao = (time.perf_counter() - inicio) / n * 1e9
+    # Colunas float32 como as das sessões em disco: a referência parte dos mesmos valores
+    gravity_ref = [0.0, 0.0, 9.81]
+    ref = [processar_escalar(x, y, z, gravity_ref) for x, y, z in zip(
+        ax.astype(np.float32).tolist(), ay.astype(np.float32).tolist(), az.astype(np.float32).tolist())]
+    identico = (np.array_equal(tilts, [r[0] for r in ref]) and np.array_equal(vibs, [r[1] for r in ref])
+                and gravity == gravity_ref)
+    print(f"{'sessão':>6}{ns_sessao:>12.0f}{ns_escalar / ns_sessao:>7.1f}x  {'sim' if identico else 'NÃO'}")
+
+    print(f"\n{'suavização (sessão inteira)':<32}{'ms':>8}  idêntico")
+    inicio = time.perf_counter()
+    original = suavizar_fft_original(tilts.tolist())
+    ms_original = (time.perf_counter() - inicio) * 1e3
+    print(f"{'FFT complexa + listas':<32}{ms_original:>8.2f}")
+    inicio = time.perf_counter()
+    real = suavizar_fft(tilts)
+    ms_real = (time.perf_counter() - inicio) * 1e3
+    print(f"{'FFT real':<32}{ms_real:>8.2f}  {'sim' if np.allclose(real, original) else 'NÃO'}")
+    cache = CacheSuavizacao()
+    cache.suavizar('tilts', n, tilts)
+    inicio = time.perf_counter()
+    cache.suavizar('tilts', n, tilts)
+    print(f"{'cache, sessão sem amostras novas':<32}{(time.perf_counter() - inicio) * 1e3:>8.3f}")
+
+    # Gráfico ao vivo: cada quadro filtra só as amostras que chegaram (≈2 a 50 Hz e 30 quadros/s)
+    filtro = PassaBaixaStreaming()
+    inicio = time.perf_counter()
+    for i in range(0, n, 2):
+        filtro.filtrar(tilts[i:i + 2])
+    us_quadro = (time.perf_counter() - inicio) / (n / 2) * 1e6
+    print(f"\npassa-baixa incremental: {us_quadro:.1f} µs/quadro, constante com o tamanho da sessão")
+
+
+if __name__ == '__main__':
+    main()
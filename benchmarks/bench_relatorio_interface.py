@@ -0,0 +1,78 @@
+"""Relatórios e a janela: geração na thread do Tk x trabalho em segundo plano.
+
+Gera o PDF e o EPUB de uma sessão sintética de N segundos a 50 Hz. No caminho
+original a chamada roda no laço da interface, que fica parado até o fim; no novo
+o relatório vai para a FilaTrabalhos e o "laço" (um tique a cada 20 ms, como o
+after() do Tk) segue rodando. Mostra o tempo total e o maior intervalo entre dois
+tiques, isto é, o maior congelamento que o usuário veria.
+
+Uso: python benchmarks/bench_relatorio_interface.py [segundos]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import relatorio  # noqa: E402
+from armazenamento import SessaoColunar  # noqa: E402
+from trabalhos import FilaTrabalhos  # noqa: E402
+
+FS = 50
+TIQUE = 0.02
+
+
+def gerar_contexto(segundos, semente=0):
+    rng = np.random.default_rng(semente)
+    n = segundos * FS
+    sessao = SessaoColunar()
+    zeros = np.zeros(n)
+    sessao.adicionar_lote(tempo=1.7e9 + np.arange(n) / FS, ax=zeros, ay=zeros, az=zeros + 1,
+                          tilt=20 + 10 * np.sin(np.arange(n) / 200) + rng.normal(0, 2, n),
+                          vib=np.abs(rng.normal(0.5, 0.3, n)))
+    return relatorio.contexto_relatorio(sessao, [], 'Edifício', 30, 5, 'm/s²', True, True, duracao=segundos)
+
+
+def na_interface(gerar, arquivo, contexto):
+    """O laço não roda enquanto a chamada não volta: o congelamento é a geração inteira"""
+    inicio = time.perf_counter()
+    gerar(arquivo, contexto)
+    total = time.perf_counter() - inicio
+    return total, total
+
+
+def em_segundo_plano(fila, gerar, arquivo, contexto):
+    inicio = time.perf_counter()
+    trabalho = fila.enviar('relatorio', lambda progresso: gerar(arquivo, contexto, progresso))
+    maior, anterior = 0.0, time.perf_counter()
+    while not trabalho.terminado:
+        time.sleep(TIQUE)
+        agora = time.perf_counter()
+        maior, anterior = max(maior, agora - anterior), agora
+    fila.terminados()
+    if trabalho.erro:
+        raise trabalho.erro
+    return time.perf_counter() - inicio, maior
+
+
+def main():
+    segundos = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    contexto = gerar_contexto(segundos)
+    fila = FilaTrabalhos()
+    print(f"sessão de {segundos} s a {FS} Hz; tique da interface a cada {TIQUE * 1e3:.0f} ms\n")
+    print(f"{'relatório':<11}{'caminho':<16}{'total (s)':>11}{'maior parada (ms)':>19}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for formato, gerar in (('PDF', relatorio.gerar_relatorio_pdf), ('EPUB', relatorio.gerar_relatorio_epub)):
+            arquivo = os.path.join(pasta, f"relatorio.{formato.lower()}")
+            gerar(arquivo, contexto)  # aquecimento: fontes e caches do matplotlib
+            for caminho, medir in (('na interface', lambda: na_interface(gerar, arquivo, contexto)),
+                                   ('segundo plano', lambda: em_segundo_plano(fila, gerar, arquivo, contexto))):
+                total, parada = medir()
+                print(f"{formato:<11}{caminho:<16}{total:>11.2f}{parada * 1e3:>19.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Modelo do relatório: números recalculados por formato x modelo único + PDF e EPUB juntos.
+
+Gera uma sessão sintética de N segundos a 50 Hz. Antes, o PDF e o EPUB filtravam
+NaN e calculavam estatísticas, conversão, conformidade e avaliação cada um por
+conta própria; agora relatorio.modelo_relatorio() calcula uma vez por versão da
+sessão e os dois leem o mesmo. Mede o custo do modelo (calculado x em cache) e o
+tempo para ter os dois arquivos: um depois do outro x em paralelo na FilaTrabalhos.
+
+Uso: python benchmarks/bench_relatorio_modelo.py [segundos]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import relatorio  # noqa: E402
+from armazenamento import SessaoColunar  # noqa: E402
+from trabalhos import FilaTrabalhos  # noqa: E402
+
+FS = 50
+REPETICOES = 20
+
+
+def gerar_contexto(segundos, semente=0):
+    rng = np.random.default_rng(semente)
+    n = segundos * FS
+    sessao = SessaoColunar()
+    zeros = np.zeros(n)
+    sessao.adicionar_lote(tempo=1.7e9 + np.arange(n) / FS, ax=zeros, ay=zeros, az=zeros + 1,
+                          tilt=20 + 10 * np.sin(np.arange(n) / 200) + rng.normal(0, 2, n),
+                          vib=np.abs(rng.normal(0.5, 0.3, n)))
+    return relatorio.contexto_relatorio(sessao, [], 'Edifício', 30, 5, 'm/s²', True, True, duracao=segundos)
+
+
+def medir(funcao, repeticoes=REPETICOES):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def em_sequencia(pasta, contexto):
+    relatorio.gerar_relatorio_pdf(os.path.join(pasta, 'seq.pdf'), contexto)
+    relatorio.gerar_relatorio_epub(os.path.join(pasta, 'seq.epub'), contexto)
+
+
+def em_paralelo(fila, pasta, contexto):
+    trabalhos = [fila.enviar('pdf', lambda p: relatorio.gerar_relatorio_pdf(os.path.join(pasta, 'par.pdf'), contexto, p)),
+                 fila.enviar('epub', lambda p: relatorio.gerar_relatorio_epub(os.path.join(pasta, 'par.epub'), contexto, p))]
+    while not all(t.terminado for t in trabalhos):
+        time.sleep(0.005)
+    fila.terminados()
+    for t in trabalhos:
+        if t.erro:
+            raise t.erro
+
+
+def main():
+    segundos = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    contexto = gerar_contexto(segundos)
+    print(f"sessão de {segundos} s a {FS} Hz ({len(contexto['sessao'])} amostras, {os.cpu_count()} núcleos)\n")
+
+    calculo = medir(lambda: relatorio._calcular_modelo(contexto))
+    relatorio.modelo_relatorio(contexto)
+    cache = medir(lambda: relatorio.modelo_relatorio(contexto))
+    print(f"{'modelo':<36}{'ms':>10}")
+    print(f"{'original (um cálculo por formato)':<36}{2 * calculo * 1e3:>10.2f}")
+    print(f"{'calculado uma vez':<36}{calculo * 1e3:>10.2f}")
+    print(f"{'em cache':<36}{cache * 1e3:>10.4f}\n")
+
+    fila = FilaTrabalhos(trabalhadores=2)
+    with tempfile.TemporaryDirectory() as pasta:
+        em_sequencia(pasta, contexto)  # aquecimento: fontes e caches do matplotlib
+        sequencia = medir(lambda: em_sequencia(pasta, contexto), 3)
+        paralelo = medir(lambda: em_paralelo(fila, pasta, contexto), 3)
+    print(f"{'PDF + EPUB':<36}{'s':>10}")
+    print(f"{'um depois do outro':<36}{sequencia:>10.2f}")
+    print(f"{'juntos (2 trabalhadores)':<36}{paralelo:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
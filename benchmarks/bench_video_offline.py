@@ -0,0 +1,85 @@
+"""Vídeo renderizado das amostras depois da sessão: onde vai o tempo de cada quadro.
+
+Gera uma sessão sintética de N segundos a 50 Hz e mede, por quadro (1280x720 a
+30 FPS), o desenho com blitting, a codificação e o que custaria passar o quadro a
+outro processo (pickle), que é o que um pool de processos pagaria a mais. Depois
+renderiza o vídeo inteiro neste processo e no processo filho que a interface usa
+(inclui subir o processo) e mostra quantas vezes mais rápido que o tempo real cada
+um anda. Durante a recepção o custo do modo offline é zero; o modo ao vivo está em
+bench_captura.py.
+
+Uso: python benchmarks/bench_video_offline.py [segundos]
+"""
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from captura_video import abrir_gravador  # noqa: E402
+from video_offline import (CORES_PADRAO, FPS_VIDEO, TAMANHO_VIDEO, _Renderizador,  # noqa: E402
+                           fim_dos_quadros, renderizar_em_segundo_plano, renderizar_video)
+
+FS = 50
+
+
+def gerar_sessao(segundos, semente=0):
+    rng = np.random.default_rng(semente)
+    n = segundos * FS
+    tempo = 1.7e9 + np.arange(n) / FS
+    tilts = 20 + 10 * np.sin(np.arange(n) / 200) + rng.normal(0, 2, n)
+    vibracoes = np.abs(rng.normal(0.5, 0.3, n))
+    return tempo, tilts, vibracoes
+
+
+def custo_por_quadro(pasta, tempo, tilts, vibracoes):
+    """ms por quadro de desenho, codificação e pickle (ida e volta) do quadro"""
+    fins = fim_dos_quadros(tempo, FPS_VIDEO)
+    opcoes = {'mostrar_tilt': True, 'mostrar_vib': True, 'unidade_vib': 'g', 'janela': 20, 'fps': FPS_VIDEO,
+              'tamanho': TAMANHO_VIDEO, 'cores': CORES_PADRAO}
+    desenho = codificacao = transferencia = 0.0
+    writer, _ = abrir_gravador(os.path.join(pasta, 'custo.mp4'), FPS_VIDEO, TAMANHO_VIDEO)
+    quadros = _Renderizador(opcoes).quadros((tempo, tilts, vibracoes), fins)
+    try:
+        while True:
+            inicio = time.perf_counter()
+            quadro = next(quadros, None)
+            if quadro is None:
+                break
+            meio = time.perf_counter()
+            writer.write(quadro)
+            fim = time.perf_counter()
+            pickle.loads(pickle.dumps(quadro, protocol=pickle.HIGHEST_PROTOCOL))
+            desenho += meio - inicio
+            codificacao += fim - meio
+            transferencia += time.perf_counter() - fim
+    finally:
+        writer.release()
+    return desenho / len(fins) * 1e3, codificacao / len(fins) * 1e3, transferencia / len(fins) * 1e3
+
+
+def main():
+    segundos = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    tempo, tilts, vibracoes = gerar_sessao(segundos)
+    print(f"sessão de {segundos} s a {FS} Hz -> vídeo {TAMANHO_VIDEO[0]}x{TAMANHO_VIDEO[1]} a {FPS_VIDEO} FPS\n")
+    with tempfile.TemporaryDirectory() as pasta:
+        desenho, codificacao, transferencia = custo_por_quadro(pasta, tempo, tilts, vibracoes)
+        print(f"{'ms/quadro':<28}{'ms':>8}")
+        print(f"{'desenho (blitting)':<28}{desenho:>8.2f}")
+        print(f"{'codificação':<28}{codificacao:>8.2f}")
+        print(f"{'pickle (só com um pool)':<28}{transferencia:>8.2f}\n")
+        print(f"{'renderização':<16}{'quadros':>9}{'total (s)':>11}{'ms/quadro':>11}{'x tempo real':>14}")
+        for nome, renderizar in (('neste processo', renderizar_video),
+                                 ('processo filho', lambda *args: renderizar_em_segundo_plano(*args).result())):
+            inicio = time.perf_counter()
+            quadros = renderizar(os.path.join(pasta, 'video.mp4'), tempo, tilts, vibracoes)
+            total = time.perf_counter() - inicio
+            print(f"{nome:<16}{quadros:>9}{total:>11.1f}{total / quadros * 1e3:>11.2f}{segundos / total:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
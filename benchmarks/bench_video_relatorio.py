@@ -0,0 +1,84 @@
+"""Vídeo no relatório EPUB: conversão a cada clique x gravação já no codec final + cache.
+
+O caminho original decodifica a gravação inteira (mp4v) e recodifica em avc1
+num arquivo temporário a cada relatório. O novo grava direto no primeiro codec
+da cadeia avc1 -> H264 -> X264 -> mp4v; no relatório, video_compativel() só lê
+o cabeçalho (ou converte uma única vez uma gravação antiga) e guarda o resultado.
+Mostra também os codecs que este OpenCV consegue gravar.
+
+Uso: python benchmarks/bench_video_relatorio.py [quadros]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import relatorio  # noqa: E402
+from captura_video import CODECS_VIDEO, CodificadorVideo, _codecs_indisponiveis  # noqa: E402
+
+FPS = 15
+RELATORIOS = 3
+
+
+def converter_original(entrada, saida):
+    """O converter_video_para_h264 original: decodifica tudo e recodifica em avc1"""
+    cap = cv2.VideoCapture(entrada)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    largura = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    altura = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    out = cv2.VideoWriter(saida, cv2.VideoWriter_fourcc(*'avc1'), fps, (largura, altura))
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        out.write(frame)
+    cap.release()
+    out.release()
+
+
+def gravar(arquivo, quadros):
+    codificador = CodificadorVideo(arquivo, FPS)
+    rng = np.random.default_rng(0)
+    quadro = np.zeros((480, 640, 3), dtype=np.uint8)
+    for i in range(quadros):
+        quadro[100:380, :] = rng.integers(0, 255, 3, dtype=np.uint8)
+        codificador.escrever(quadro, i / FPS)
+    codificador.encerrar()
+    return codificador.codec
+
+
+def main():
+    quadros = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    with tempfile.TemporaryDirectory() as pasta:
+        video = os.path.join(pasta, 'gravacao.mp4')
+        codec = gravar(video, quadros)
+        disponiveis = [c for c in CODECS_VIDEO if c not in _codecs_indisponiveis]
+        print(f"{quadros} quadros gravados em {codec} (codecs disponíveis: {', '.join(disponiveis)})\n")
+
+        inicio = time.perf_counter()
+        for i in range(RELATORIOS):
+            saida = os.path.join(pasta, f"video_h264_{i}.mp4")
+            converter_original(video, saida)
+            if os.path.exists(saida):
+                os.remove(saida)
+        original = (time.perf_counter() - inicio) / RELATORIOS
+
+        tempos = []
+        for _ in range(RELATORIOS):
+            inicio = time.perf_counter()
+            relatorio.video_compativel(video)
+            tempos.append(time.perf_counter() - inicio)
+
+    print(f"{'caminho':<28}{'ms por relatório':>18}")
+    print(f"{'conversão a cada relatório':<28}{original * 1e3:>18.1f}")
+    print(f"{'cache: primeiro relatório':<28}{tempos[0] * 1e3:>18.1f}")
+    print(f"{'cache: seguintes':<28}{np.mean(tempos[1:]) * 1e3:>18.3f}")
+
+
+if __name__ == '__main__':
+    main()
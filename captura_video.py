@@ -0,0 +1,177 @@
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Captura dos quadros do vídeo a partir do buffer que o canvas acabou de desenhar.
+# Quem desenha (a thread do Tk) só copia o RGBA para um buffer livre; redução para o
+# tamanho do vídeo e conversão de cor rodam numa thread própria, em quadros pré-alocados.
+# O codificador grava cada quadro no arquivo assim que chega, por uma fila limitada:
+# a memória não cresce com a duração da gravação.
+
+# === CONFIGURAÇÕES PADRÃO ===
+TAMANHO_VIDEO = (640, 480)  # largura, altura
+BUFFERS = 3  # cópias RGBA em trânsito; sem buffer livre o quadro é descartado
+FILA_CODIFICADOR = 32  # quadros BGR aguardando gravação (~29 MB a 640x480)
+# Preferência de codec: H.264 toca em navegadores e leitores de EPUB; mp4v é o último recurso
+CODECS_VIDEO = ('avc1', 'H264', 'X264', 'mp4v')
+CODECS_H264 = {'avc1', 'h264', 'x264'}
+
+_codecs_indisponiveis = set()  # codecs que este OpenCV não conseguiu abrir (não tenta de novo)
+
+
+def abrir_gravador(arquivo, fps, tamanho, codecs=CODECS_VIDEO):
+    """Abre um cv2.VideoWriter com o primeiro codec disponível; devolve (writer, codec)"""
+    for codec in codecs:
+        if codec in _codecs_indisponiveis:
+            continue
+        writer = cv2.VideoWriter(arquivo, cv2.VideoWriter_fourcc(*codec), fps, tamanho)
+        if writer.isOpened():
+            return writer, codec
+        writer.release()
+        _codecs_indisponiveis.add(codec)
+    raise RuntimeError(f"Não foi possível abrir {arquivo} para gravação ({', '.join(codecs)})")
+
+
+def codec_do_video(arquivo):
+    """FourCC do vídeo gravado em `arquivo` (ex.: 'avc1', 'FMP4'); só lê o cabeçalho"""
+    cap = cv2.VideoCapture(arquivo)
+    try:
+        codigo = int(cap.get(cv2.CAP_PROP_FOURCC)) & 0xFFFFFFFF
+    finally:
+        cap.release()
+    return codigo.to_bytes(4, 'little').decode('ascii', 'replace')
+
+
+def eh_h264(codec):
+    return codec.lower() in CODECS_H264
+
+
+class CapturaQuadros:
+    """Converte cópias do buffer RGBA do canvas em quadros BGR e os entrega a `destino`.
+
+    destino(quadro, instante) roda na thread de captura e recebe sempre o mesmo
+    array pré-alocado: deve copiá-lo (ou gravá-lo) antes de retornar.
+    """
+
+    def __init__(self, destino, tamanho=TAMANHO_VIDEO, buffers=BUFFERS):
+        self.destino = destino
+        self.tamanho = tamanho
+        self.descartados = 0
+        largura, altura = tamanho
+        self._reduzido = np.empty((altura, largura, 4), dtype=np.uint8)
+        self._quadro = np.empty((altura, largura, 3), dtype=np.uint8)
+        self._livres = queue.Queue()
+        for _ in range(buffers):
+            self._livres.put(None)  # alocados no primeiro quadro, com o tamanho do canvas
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._executar, name='riggy-captura', daemon=True)
+        self._thread.start()
+
+    def capturar(self, rgba, instante=None):
+        """Copia o buffer (altura x largura x 4) e agenda a conversão; False se descartado.
+
+        instante: momento do quadro (time.time()), repassado ao destino.
+        """
+        try:
+            buf = self._livres.get_nowait()
+        except queue.Empty:
+            self.descartados += 1
+            return False
+        if buf is None or buf.shape != rgba.shape:
+            buf = np.empty_like(rgba)  # primeiro quadro ou janela redimensionada
+        np.copyto(buf, rgba)
+        self._fila.put((buf, time.time() if instante is None else instante))
+        return True
+
+    def esperar(self):
+        """Bloqueia até todos os quadros capturados terem sido entregues"""
+        self._fila.join()
+
+    def _executar(self):
+        while True:
+            buf, instante = self._fila.get()
+            try:
+                # Reduz primeiro (menos pixels para converter), tudo nos arrays pré-alocados
+                cv2.resize(buf, self.tamanho, dst=self._reduzido, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(self._reduzido, cv2.COLOR_RGBA2BGR, dst=self._quadro)
+                self.destino(self._quadro, instante)
+            except Exception as e:
+                print(f"Erro ao capturar frame: {e}")
+            finally:
+                self._livres.put(buf)
+                self._fila.task_done()
+
+
+class CodificadorVideo:
+    """Grava os quadros num arquivo de vídeo numa thread própria, conforme chegam.
+
+    A velocidade do vídeo acompanha o relógio: cada quadro ocupa no arquivo o
+    tempo até o próximo (quadros repetidos quando a captura atrasa, descartados
+    quando adianta), então `fps` é só a taxa nominal do arquivo. A fila é
+    limitada: se a gravação não acompanha, escrever() bloqueia quem captura.
+    """
+
+    def __init__(self, arquivo, fps, tamanho=TAMANHO_VIDEO, codecs=CODECS_VIDEO, tamanho_fila=FILA_CODIFICADOR):
+        self.arquivo = arquivo
+        self.fps = fps
+        self.tamanho = tamanho
+        self.quadros = 0  # quadros escritos no arquivo (com as repetições)
+        self.recebidos = 0
+        self.inicio = None
+        self._ultimo = None
+        # Já no codec final: o relatório usa o arquivo como está, sem converter
+        self._writer, self.codec = abrir_gravador(arquivo, fps, tamanho, codecs)
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._thread = threading.Thread(target=self._executar, name='riggy-codificador', daemon=True)
+        self._thread.start()
+
+    def escrever(self, quadro, instante):
+        """Enfileira uma cópia do quadro BGR (altura x largura x 3) capturado em `instante` (s)"""
+        self._fila.put((quadro.copy(), instante))
+
+    def encerrar(self, fim=None):
+        """Grava o que ainda está na fila, fecha o arquivo e devolve a duração do vídeo (s).
+
+        fim: instante do fim da gravação; o último quadro é estendido até ele.
+        """
+        self._fila.put(None)
+        self._thread.join()
+        try:
+            if fim is not None and self._ultimo is not None:
+                self._repetir_ate(self._ultimo, int((fim - self.inicio) * self.fps) + 1)
+        finally:
+            self._writer.release()
+        return self.quadros / self.fps
+
+    def _executar(self):
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            quadro, instante = item
+            self.recebidos += 1
+            if self.inicio is None:
+                self.inicio = instante
+            try:
+                self._escrever(quadro, instante)
+            except Exception as e:
+                print(f"Erro ao gravar quadro do vídeo: {e}")
+            self._ultimo = quadro
+
+    def _escrever(self, quadro, instante):
+        # Posição do quadro no vídeo para andar junto com o relógio; até ela, o anterior continua na tela
+        posicao = int((instante - self.inicio) * self.fps)
+        if self._ultimo is not None:
+            self._repetir_ate(self._ultimo, posicao)
+        # Captura adiantada: a posição já foi ocupada e o quadro é descartado
+        if self.quadros == posicao:
+            self._writer.write(quadro)
+            self.quadros += 1
+
+    def _repetir_ate(self, quadro, alvo):
+        while self.quadros < alvo:
+            self._writer.write(quadro)
+            self.quadros += 1
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from alertas import JanelaMovel
+from ingestao import ALERTA_TILT, ALERTA_VIB
+from processamento import GRAVIDADE, LP_ALPHA, processar_lote
+
+# === CONFIGURAÇÕES PADRÃO ===
+ARQUIVO_DIARIO = 'diario.jsonl'
+AMOSTRAS_FILTRO = 1024  # amostras finais que reconstroem o filtro de gravidade (0.9^1024 ≈ 0)
+TOLERANCIA_INSTANTE = 1e-6  # s; o instante do alerta passa por datetime (resolução de 1 µs)
+
+
+class DiarioSessao:
+    """Diário append-only de uma recepção: configuração, dispositivos, alertas e encerramento.
+
+    Uma linha JSON por evento, com fsync a cada escrita (os eventos são raros: a
+    cada mudança de configuração, dispositivo novo ou alerta). As amostras ficam
+    nas sessões em disco de cada dispositivo, no mesmo diretório. Sem a entrada
+    'fim' a recepção foi interrompida e pode ser retomada.
+    """
+
+    def __init__(self, diretorio):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self._lock = threading.Lock()
+        self._arquivo = open(os.path.join(diretorio, ARQUIVO_DIARIO), 'a', encoding='utf-8')
+
+    def registrar(self, tipo, **dados):
+        linha = json.dumps({'tipo': tipo, **dados}, ensure_ascii=False)
+        # Chamado da thread de ingestão (alertas, dispositivos) e do Tk (configuração)
+        with self._lock:
+            if self._arquivo.closed:
+                return
+            self._arquivo.write(linha + '\n')
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+
+    def fechar(self, **dados):
+        """Marca a recepção como encerrada normalmente"""
+        self.registrar('fim', **dados)
+        with self._lock:
+            self._arquivo.close()
+
+
+def ler_diario(diretorio):
+    """Entradas do diário em ordem; uma última linha cortada pela queda é ignorada"""
+    entradas = []
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_DIARIO), encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                try:
+                    entradas.append(json.loads(linha))
+                except ValueError:
+                    break
+    except FileNotFoundError:
+        pass
+    return entradas
+
+
+def sessao_interrompida(base):
+    """Diretório da recepção mais recente se ela não foi encerrada normalmente, senão None"""
+    try:
+        nomes = sorted(os.listdir(base))
+    except FileNotFoundError:
+        return None
+    for nome in reversed(nomes):
+        diretorio = os.path.join(base, nome)
+        if not os.path.isdir(diretorio):
+            continue
+        entradas = ler_diario(diretorio)
+        if entradas:
+            return diretorio if entradas[-1]['tipo'] != 'fim' else None
+    return None
+
+
+def resumir_diario(entradas):
+    """Estado da recepção segundo o diário: início, última configuração, dispositivos e alertas"""
+    resumo = {'inicio': None, 'estrutura': None, 'configuracao': {}, 'dispositivos': [], 'alertas': {}}
+    for entrada in entradas:
+        tipo = entrada['tipo']
+        if tipo == 'inicio':
+            resumo['inicio'] = entrada
+        if tipo in ('inicio', 'configuracao'):
+            resumo['estrutura'] = entrada['estrutura']
+            resumo['configuracao'] = entrada['configuracao']
+        elif tipo == 'dispositivo' and entrada['id'] not in resumo['dispositivos']:
+            resumo['dispositivos'].append(entrada['id'])
+        elif tipo == 'alerta':
+            resumo['alertas'].setdefault(entrada['id'], []).append(
+                (entrada['alerta'], entrada['instante'], entrada['valor']))
+    return resumo
+
+
+def reconstruir_estado(sessao, alertas, configuracao, janela_tilt, janela_vib, alpha=LP_ALPHA):
+    """Estado de um dispositivo ao fim da sessão em disco, sem reprocessar a sessão inteira.
+
+    O filtro de gravidade esquece o estado inicial em progressão geométrica, então
+    as AMOSTRAS_FILTRO finais bastam para reconstruí-lo. As janelas móveis são as
+    últimas amostras; cada regra de histerese continua disparada se a média não
+    voltou abaixo de limite - histerese depois do último alerta do seu tipo.
+    Serializável: segue para o processo de ingestão no modo processo.
+    """
+    n = len(sessao)
+    gravity = [0.0, 0.0, 9.81]
+    ax, ay, az = (coluna[max(0, n - AMOSTRAS_FILTRO):] for coluna in sessao.eixos)
+    if n:
+        processar_lote(ax.astype(np.float64), ay.astype(np.float64), az.astype(np.float64), gravity, alpha)
+
+    tempo, tilts, vibs = sessao.tempo, sessao.tilts, sessao.vibracoes
+    fator_vib = GRAVIDADE if configuracao.get('unidade_vib') == 'm/s²' else 1.0
+    return {
+        'gravity': [float(g) for g in gravity],
+        'tilts': tilts[max(0, n - janela_tilt):].tolist(),
+        'vibs': vibs[max(0, n - janela_vib):].tolist(),
+        'disparada_tilt': _continua_disparada(
+            tempo, tilts, janela_tilt, [a for a in alertas if a[0] == ALERTA_TILT],
+            configuracao.get('tilt', 0.0), configuracao.get('histerese_tilt', 0.0)),
+        'disparada_vib': _continua_disparada(
+            tempo, vibs, janela_vib, [a for a in alertas if a[0] == ALERTA_VIB],
+            configuracao.get('vib', 0.0), configuracao.get('histerese_vib', 0.0), fator_vib),
+        'alertas': list(alertas),
+    }
+
+
+def _continua_disparada(tempo, valores, janela, alertas, limite, histerese, fator=1.0):
+    if not alertas:
+        return False
+    # Amostra que disparou o último alerta (ou o fim da sessão, se ela não chegou ao disco)
+    i = int(np.searchsorted(tempo, alertas[-1][1] - TOLERANCIA_INSTANTE))
+    inicio = max(0, i - janela + 1)
+    # Mesma comparação da ingestão: média da vibração convertida para a unidade do limite
+    medias = JanelaMovel(janela).adicionar_lote(valores[inicio:])[i - inicio + 1:] * fator
+    return not np.any(medias < limite - max(0.0, histerese))
+
+
+def aplicar_estado(disp, estado):
+    """Restaura um dispositivo recém-criado a partir de reconstruir_estado()"""
+    disp.gravity[:] = estado['gravity']
+    disp.calibracao_restante = 0
+    disp.media_tilt.limpar()
+    disp.media_tilt.adicionar_lote(estado['tilts'])
+    disp.media_vib.limpar()
+    disp.media_vib.adicionar_lote(estado['vibs'])
+    disp.regra_tilt.disparada = estado['disparada_tilt']
+    disp.regra_vib.disparada = estado['disparada_vib']
+    disp.alerts[:] = [(tipo, datetime.fromtimestamp(instante), valor) for tipo, instante, valor in estado['alertas']]
@@ -0,0 +1,119 @@
+import threading
+
+from alertas import JanelaMovel, RegraHisterese
+from armazenamento import SessaoColunar
+from saude import FluxoDispositivo
+
+# === CONFIGURAÇÕES PADRÃO ===
+LIMITE_DISPOSITIVOS = 64  # pacotes de origens além do limite são ignorados
+
+
+class Dispositivo:
+    """Estado independente de um sensor: filtro de gravidade, janelas, alertas e histórico"""
+
+    def __init__(self, identificador, janela_tilt, janela_vib, calibracao, indice=0, sessao=None):
+        self.id = identificador
+        self.indice = indice  # ordem de chegada; identifica o dispositivo no anel compartilhado
+        self.gravity = [0.0, 0.0, 9.81]
+        self.calibracao_restante = calibracao
+        self.pendentes = []  # (ax, ay, az) aguardando o processamento em lote
+
+        # Médias móveis incrementais; as janelas também alimentam o gráfico ao vivo
+        self.media_tilt = JanelaMovel(janela_tilt)
+        self.media_vib = JanelaMovel(janela_vib)
+        self.tilts = self.media_tilt.valores
+        self.vibracoes = self.media_vib.valores
+        self.regra_tilt = RegraHisterese()
+        self.regra_vib = RegraHisterese()
+        self.alerts = []
+
+        self.sessao = sessao if sessao is not None else SessaoColunar()
+        self.fluxo = FluxoDispositivo()
+
+
+class Dispositivos:
+    """Demultiplexa os pacotes pela origem; o estado de cada sensor nasce no primeiro pacote.
+
+    Uma única thread de ingestão atende todos os dispositivos: o custo por pacote
+    é uma busca em dicionário, independente de quantos sensores estão enviando.
+    """
+
+    def __init__(self, janela_tilt, janela_vib, calibracao, chave='ip', limite=LIMITE_DISPOSITIVOS,
+                 fabrica_sessao=None):
+        # chave='ip' agrupa por aparelho; chave='endereco' separa também pela porta de origem
+        # fabrica_sessao(identificador) cria o histórico de cada dispositivo novo (padrão: em memória)
+        self.fabrica_sessao = fabrica_sessao
+        self.janela_tilt = janela_tilt
+        self.janela_vib = janela_vib
+        self.calibracao = calibracao
+        self.chave = chave
+        self.limite = limite
+        self.versao = 0  # incrementada a cada dispositivo novo (a GUI compara para atualizar a lista)
+        self._por_id = {}
+        self._lock = threading.Lock()
+
+    def identificar(self, endereco):
+        ip, porta = endereco[:2]
+        return ip if self.chave == 'ip' else f"{ip}:{porta}"
+
+    def obter(self, endereco):
+        """Devolve o dispositivo da origem do pacote, criando-o se necessário (None acima do limite)"""
+        return self.registrar(self.identificar(endereco))
+
+    def registrar(self, identificador):
+        """Devolve o dispositivo pelo identificador, criando-o se necessário (None acima do limite)"""
+        disp = self._por_id.get(identificador)
+        if disp is not None:
+            return disp
+        with self._lock:
+            disp = self._por_id.get(identificador)
+            if disp is not None:
+                return disp
+            if len(self._por_id) >= self.limite:
+                return None
+            sessao = self.fabrica_sessao(identificador) if self.fabrica_sessao is not None else None
+            disp = Dispositivo(identificador, self.janela_tilt, self.janela_vib, self.calibracao,
+                               indice=len(self._por_id), sessao=sessao)
+            self._por_id[identificador] = disp
+            self.versao += 1
+        print(f"Novo dispositivo conectado: {identificador}")
+        return disp
+
+    def get(self, identificador):
+        return self._por_id.get(identificador)
+
+    def ids(self):
+        with self._lock:
+            return list(self._por_id)
+
+    def __len__(self):
+        return len(self._por_id)
+
+    def sincronizar_sessoes(self):
+        """Leva ao disco o histórico de todos os dispositivos (no-op nas sessões em memória)"""
+        with self._lock:
+            sessoes = [disp.sessao for disp in self._por_id.values()]
+        for sessao in sessoes:
+            sessao.sincronizar()
+
+    def sincronizar_sessoes_se_devido(self):
+        """Sincroniza as sessões cujo intervalo de fsync já passou (barato quando nenhuma está devendo)"""
+        with self._lock:
+            sessoes = [disp.sessao for disp in self._por_id.values()]
+        for sessao in sessoes:
+            sessao.sincronizar_se_devido()
+
+    def fechar_sessoes(self):
+        """Sincroniza e fecha as sessões em disco; o histórico continua legível até limpar()"""
+        with self._lock:
+            sessoes = [disp.sessao for disp in self._por_id.values()]
+        for sessao in sessoes:
+            sessao.fechar()
+
+    def limpar(self):
+        with self._lock:
+            sessoes = [disp.sessao for disp in self._por_id.values()]
+            self._por_id.clear()
+            self.versao += 1
+        for sessao in sessoes:
+            sessao.fechar()
@@ -0,0 +1,160 @@
+"""Gerador de carga SensaGram sintética: acelerômetro (e giroscópio) em JSON via UDP.
+
+Cada dispositivo simulado envia de um socket próprio, com inclinação em rampa,
+rajadas de vibração e ruído gaussiano. O timestamp dos pacotes é o
+time.perf_counter_ns() do envio (relógio monotônico, como o do Android), o que
+permite medir a latência de ponta a ponta no mesmo computador.
+
+Uso: python gerador_sensagram.py [--taxa HZ] [--dispositivos N] [--duracao S] [--destino IP] [--porta P]
+"""
+import argparse
+import math
+import random
+import socket
+import time
+
+# === CONFIGURAÇÕES PADRÃO ===
+GRAVIDADE = 9.81
+PORTA_PADRAO = 5000
+LOTE_ENVIO_MAXIMO = 64  # pacotes atrasados enviados de uma vez antes de reavaliar o relógio
+
+FORMATO_PACOTE = '{"type": "android.sensor.%s", "timestamp": %d, "values": [%.6f, %.6f, %.6f]}'
+
+
+class SinalSintetico:
+    """Aceleração de um sensor parado que inclina em rampa e sofre rajadas de vibração"""
+
+    def __init__(self, ruido=0.02, rampa_tilt=1.0, tilt_maximo=30.0, intervalo_rajada=10.0,
+                 duracao_rajada=1.0, amplitude_rajada=2.0, frequencia_rajada=15.0, semente=None):
+        self.ruido = ruido  # desvio padrão (m/s²) em cada eixo
+        self.rampa_tilt = rampa_tilt  # graus por segundo até tilt_maximo, depois volta a zero
+        self.tilt_maximo = tilt_maximo
+        self.intervalo_rajada = intervalo_rajada  # s entre inícios de rajada (0 desliga)
+        self.duracao_rajada = duracao_rajada
+        self.amplitude_rajada = amplitude_rajada  # m/s²
+        self.frequencia_rajada = frequencia_rajada  # Hz
+        self._aleatorio = random.Random(semente)
+
+    def inclinacao(self, t):
+        """Ângulo (graus) no instante t: rampa dente de serra até tilt_maximo"""
+        if not self.rampa_tilt or not self.tilt_maximo:
+            return 0.0
+        periodo = self.tilt_maximo / self.rampa_tilt
+        return (t % periodo) * self.rampa_tilt
+
+    def vibracao(self, t):
+        if not self.intervalo_rajada or t % self.intervalo_rajada >= self.duracao_rajada:
+            return 0.0
+        return self.amplitude_rajada * math.sin(2 * math.pi * self.frequencia_rajada * t)
+
+    def acelerometro(self, t):
+        theta = math.radians(self.inclinacao(t))
+        gauss = self._aleatorio.gauss
+        vib = self.vibracao(t)
+        return (GRAVIDADE * math.sin(theta) + gauss(0, self.ruido),
+                gauss(0, self.ruido),
+                GRAVIDADE * math.cos(theta) + vib + gauss(0, self.ruido))
+
+    def giroscopio(self, t):
+        gauss = self._aleatorio.gauss
+        return (math.radians(self.rampa_tilt) if self.inclinacao(t) else 0.0) + gauss(0, 0.001), \
+            gauss(0, 0.001), gauss(0, 0.001)
+
+
+def montar_pacote(tipo, timestamp_ns, valores):
+    return (FORMATO_PACOTE % (tipo, timestamp_ns, *valores)).encode()
+
+
+def abrir_sockets(quantidade, ips_distintos=True):
+    """Um socket por dispositivo; com ips_distintos cada um sai de 127.0.0.N (Linux/Windows)"""
+    sockets = []
+    for i in range(quantidade):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if ips_distintos:
+            try:
+                sock.bind((f"127.0.0.{i + 1}", 0))
+            except OSError:
+                # macOS só tem 127.0.0.1 sem alias: os dispositivos se distinguem pela porta
+                ips_distintos = False
+        sockets.append(sock)
+    return sockets
+
+
+def gerar_carga(destino, taxa, dispositivos=1, duracao=None, total=None, giroscopio=True,
+                ips_distintos=True, parar=None, **parametros_sinal):
+    """Envia acelerômetro a `taxa` Hz por dispositivo até duracao (s), total (pacotes) ou parar().
+
+    Segue um cronograma absoluto: se o envio atrasar, os pacotes devidos saem em
+    sequência em vez de a taxa média cair. Devolve o número de pacotes de
+    acelerômetro e de giroscópio enviados.
+    """
+    # Origens 127.0.0.N só alcançam destinos de loopback
+    sockets = abrir_sockets(dispositivos, ips_distintos and destino[0].startswith('127.'))
+    sinais = [SinalSintetico(semente=i, **parametros_sinal) for i in range(dispositivos)]
+    intervalo = 1.0 / taxa
+    enviados_acc = 0
+    enviados_gyro = 0
+    inicio = time.perf_counter()
+    n = 0  # rodadas já enviadas (uma amostra por dispositivo)
+    try:
+        while True:
+            agora = time.perf_counter()
+            decorrido = agora - inicio
+            if (duracao is not None and decorrido >= duracao) or (total is not None and enviados_acc >= total):
+                break
+            if parar is not None and parar():
+                break
+            devidas = int(decorrido / intervalo) + 1 - n
+            if devidas <= 0:
+                espera = inicio + n * intervalo - agora
+                if espera > 0.002:
+                    time.sleep(espera - 0.001)
+                continue
+            for _ in range(min(devidas, LOTE_ENVIO_MAXIMO)):
+                t = n * intervalo
+                for sock, sinal in zip(sockets, sinais):
+                    timestamp = time.perf_counter_ns()
+                    sock.sendto(montar_pacote('accelerometer', timestamp, sinal.acelerometro(t)), destino)
+                    enviados_acc += 1
+                    if giroscopio:
+                        sock.sendto(montar_pacote('gyroscope', timestamp, sinal.giroscopio(t)), destino)
+                        enviados_gyro += 1
+                n += 1
+    finally:
+        for sock in sockets:
+            sock.close()
+    return enviados_acc, enviados_gyro
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--destino', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--taxa', type=float, default=50.0, help='amostras/s por dispositivo')
+    parser.add_argument('--dispositivos', type=int, default=1)
+    parser.add_argument('--duracao', type=float, default=None, help='segundos (padrão: até Ctrl+C)')
+    parser.add_argument('--sem-giroscopio', action='store_true')
+    parser.add_argument('--ruido', type=float, default=0.02, help='desvio padrão do ruído (m/s²)')
+    parser.add_argument('--rampa-tilt', type=float, default=1.0, help='graus/s')
+    parser.add_argument('--tilt-maximo', type=float, default=30.0, help='graus')
+    parser.add_argument('--intervalo-rajada', type=float, default=10.0, help='s entre rajadas (0 desliga)')
+    parser.add_argument('--duracao-rajada', type=float, default=1.0)
+    parser.add_argument('--amplitude-rajada', type=float, default=2.0, help='m/s²')
+    parser.add_argument('--frequencia-rajada', type=float, default=15.0, help='Hz')
+    args = parser.parse_args()
+
+    print(f"Enviando {args.taxa:g} Hz x {args.dispositivos} dispositivo(s) para {args.destino}:{args.porta}")
+    try:
+        acc, gyro = gerar_carga(
+            (args.destino, args.porta), args.taxa, args.dispositivos, args.duracao,
+            giroscopio=not args.sem_giroscopio, ruido=args.ruido, rampa_tilt=args.rampa_tilt,
+            tilt_maximo=args.tilt_maximo, intervalo_rajada=args.intervalo_rajada,
+            duracao_rajada=args.duracao_rajada, amplitude_rajada=args.amplitude_rajada,
+            frequencia_rajada=args.frequencia_rajada)
+        print(f"✅ {acc} pacotes de acelerômetro e {gyro} de giroscópio enviados")
+    except KeyboardInterrupt:
+        print("Interrompido")
+
+
+if __name__ == '__main__':
+    main()
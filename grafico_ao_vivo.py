@@ -0,0 +1,150 @@
+from collections import deque
+
+import numpy as np
+
+from processamento import DURACAO_MINIMA_FS, FS_PADRAO, PassaBaixaStreaming, estimar_fs, g_para_ms2
+
+# Gráfico ao vivo com artistas retidos e blitting: eixos, títulos, limites e linhas são
+# montados uma vez por combinação de gráficos/unidade (e a cada redimensionamento); cada
+# quadro só troca os dados das linhas e redesenha a área dos eixos sobre o fundo guardado.
+# Não depende do Tk: funciona com qualquer canvas do matplotlib que suporte blitting.
+# A suavização é um passa-baixa causal que só processa as amostras novas de cada quadro.
+
+# === ESTILO ===
+COR_LINHA_TILT = '#FF8800'
+COR_LINHA_VIB = '#FFB266'
+
+# === CONFIGURAÇÕES PADRÃO ===
+AQUECIMENTO = 200  # amostras filtradas antes da janela ao trocar de sessão (o biquad converge bem antes)
+VARIACAO_FS = 0.2  # variação relativa da taxa estimada que recalcula os coeficientes do filtro
+
+
+class SerieAoVivo:
+    """Últimas `janela` amostras suavizadas de uma coluna da sessão, atualizadas incrementalmente.
+
+    Cada atualização filtra só as amostras chegadas desde a anterior; ao trocar de
+    sessão (ou após um salto maior que a janela) recomeça pelas AQUECIMENTO + janela finais.
+    A taxa do filtro começa em FS_PADRAO e, assim que há AQUECIMENTO amostras, acompanha
+    a estimada sobre as últimas (no mínimo AQUECIMENTO amostras e DURACAO_MINIMA_FS).
+    """
+
+    def __init__(self, coluna, janela):
+        self.coluna = coluna  # 'tilts' ou 'vibracoes'
+        self.janela = janela
+        self.saida = deque(maxlen=janela)
+        self._filtro = PassaBaixaStreaming()
+        self._sessao = None
+        self._lidas = 0
+
+    def atualizar(self, sessao):
+        valores = getattr(sessao, self.coluna)
+        n = len(valores)
+        if sessao is not self._sessao or n < self._lidas or n - self._lidas > AQUECIMENTO + self.janela:
+            self._sessao = sessao
+            self._lidas = max(0, n - AQUECIMENTO - self.janela)
+            self._filtro = PassaBaixaStreaming(fs=FS_PADRAO)
+            self.saida.clear()
+        if n >= AQUECIMENTO:
+            tempo = sessao.tempo[:n]
+            # Última amostra com pelo menos DURACAO_MINIMA_FS de distância (ou a primeira)
+            distante = max(0, int(np.searchsorted(tempo, tempo[-1] - DURACAO_MINIMA_FS, side='right')) - 1)
+            inicio = min(n - AQUECIMENTO, distante)
+            fs = estimar_fs(tempo[inicio:])
+            if abs(fs - self._filtro.fs) > VARIACAO_FS * self._filtro.fs:
+                self._filtro.ajustar_fs(fs)
+        self.saida.extend(self._filtro.filtrar(valores[self._lidas:n]).tolist())
+        self._lidas = n
+        return np.fromiter(self.saida, dtype=np.float64, count=len(self.saida))
+
+
+class GraficoAoVivo:
+    """Janela móvel de inclinação e vibração (suavizadas) nos eixos de uma figura existente"""
+
+    def __init__(self, fig, axs, canvas, janela, cor_titulo, cor_texto, cor_fundo):
+        self.fig = fig
+        self.axs = axs
+        self.canvas = canvas
+        self.janela = janela  # amostras visíveis: o eixo x fica fixo em 0..janela-1
+        self.cor_titulo = cor_titulo
+        self.cor_texto = cor_texto
+        self.cor_fundo = cor_fundo
+        self._chave = None  # (tilt, vib, unidade) da montagem atual; None força remontar
+        self._linhas = []  # [(eixo, Line2D, 'tilt' | 'vib')]
+        self._fundos = []
+        self._versao = None
+        self._series = {'tilt': SerieAoVivo('tilts', janela), 'vib': SerieAoVivo('vibracoes', janela)}
+        canvas.mpl_connect('draw_event', self._ao_desenhar)
+        canvas.mpl_connect('resize_event', lambda evento: self.invalidar())
+
+    def invalidar(self):
+        """Descarta a montagem (outro desenho usou os eixos ou a janela mudou de tamanho)"""
+        self._chave = None
+        self._linhas = []
+        self._fundos = []
+
+    def desenhar(self, mostrar_tilt, mostrar_vib, unidade_vib, sessao):
+        """Atualiza as linhas com o fim da sessão; remonta só se os gráficos ou a unidade mudaram.
+
+        Se a sessão não recebeu amostras desde o último quadro, nada é redesenhado.
+        Devolve True se algo foi desenhado.
+        """
+        chave = (mostrar_tilt, mostrar_vib, unidade_vib)
+        versao = (id(sessao), len(sessao))
+        if chave != self._chave:
+            self._montar(chave)
+        elif versao == self._versao:
+            return False
+        self._versao = versao
+
+        canvas = self.canvas
+        for (ax, linha, tipo), fundo in zip(self._linhas, self._fundos):
+            suave = self._series[tipo].atualizar(sessao)
+            if tipo == 'vib' and unidade_vib == 'm/s²':
+                suave = g_para_ms2(suave)
+            canvas.restore_region(fundo)
+            linha.set_data(np.arange(len(suave)), suave)
+            ax.draw_artist(linha)
+            canvas.blit(ax.bbox)
+        return True
+
+    def _montar(self, chave):
+        mostrar_tilt, mostrar_vib, unidade_vib = chave
+        self.invalidar()
+        for ax in self.axs:
+            ax.clear()
+            ax.set_visible(False)
+
+        unidade_display = 'm/s²' if unidade_vib == 'm/s²' else 'g'
+        graficos = []
+        if mostrar_tilt:
+            graficos.append(('tilt', 'Inclinação (°)', 'Grau', (0, 100), COR_LINHA_TILT))
+        if mostrar_vib:
+            graficos.append(('vib', f'Vibração ({unidade_display})', unidade_display,
+                             (0, 50) if unidade_vib == 'm/s²' else (0, 5), COR_LINHA_VIB))
+        linhas = []
+        for ax, (tipo, titulo, rotulo, limites, cor) in zip(self.axs, graficos):
+            ax.set_visible(True)
+            ax.set_xlim(0, max(1, self.janela - 1))
+            ax.set_ylim(*limites)
+            ax.set_title(titulo, color=self.cor_titulo, fontsize=12, fontweight='bold')
+            ax.set_ylabel(rotulo, color=self.cor_texto)
+            ax.set_facecolor(self.cor_fundo)
+            # animated: fica fora do desenho completo e entra só pelo blit
+            linha, = ax.plot([], [], color=cor, linewidth=2, animated=True)
+            linhas.append((ax, linha, tipo))
+
+        self.fig.tight_layout(pad=3.0)
+        self._linhas = linhas
+        self._chave = chave
+        self._versao = None
+        # O desenho completo dispara _ao_desenhar, que guarda os fundos
+        self.canvas.draw()
+
+    def _ao_desenhar(self, evento):
+        """Após cada desenho completo (montagem, redimensionamento): guarda o fundo dos eixos"""
+        if self._chave is None:
+            return
+        self._fundos = [self.canvas.copy_from_bbox(ax.bbox) for ax, _, _ in self._linhas]
+        # O desenho completo não inclui as linhas animadas: repõe as atuais no buffer
+        for ax, linha, _ in self._linhas:
+            ax.draw_artist(linha)
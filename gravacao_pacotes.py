@@ -0,0 +1,131 @@
+import socket
+import struct
+import threading
+import time
+
+# === FORMATO DO ARQUIVO ===
+# Cabeçalho: MAGICO + versão (u16) + início da gravação (epoch, f8)
+# Registro:  chegada (epoch, f8) + porta (u16) + tamanho do IP (u8) + tamanho dos dados (u16),
+#            seguidos do IP empacotado (4 ou 16 bytes) e do datagrama original
+MAGICO = b'RIGGYPKT'
+VERSAO = 1
+_CABECALHO = struct.Struct('<Hd')
+_REGISTRO = struct.Struct('<dHBH')
+BUFFER_ARQUIVO = 1024 * 1024
+
+# === CONFIGURAÇÕES PADRÃO ===
+LOTE_MAXIMO = 256
+
+
+class GravadorPacotes:
+    """Grava cada datagrama recebido, com instante de chegada e origem, num log binário compacto"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.pacotes = 0
+        self._arquivo = open(caminho, 'wb', buffering=BUFFER_ARQUIVO)
+        self._arquivo.write(MAGICO + _CABECALHO.pack(VERSAO, time.time()))
+
+    def gravar(self, chegada, data, endereco):
+        ip, porta = endereco[:2]
+        familia = socket.AF_INET6 if ':' in ip else socket.AF_INET
+        ip_bytes = socket.inet_pton(familia, ip)
+        self._arquivo.write(_REGISTRO.pack(chegada, porta, len(ip_bytes), len(data)) + ip_bytes + data)
+        self.pacotes += 1
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+def ler_pacotes(caminho):
+    """Gera (chegada, data, endereço) na ordem em que os datagramas foram gravados"""
+    with open(caminho, 'rb', buffering=BUFFER_ARQUIVO) as arquivo:
+        if arquivo.read(len(MAGICO)) != MAGICO:
+            raise ValueError(f"{caminho} não é uma gravação de pacotes do Riggy")
+        versao, _ = _CABECALHO.unpack(arquivo.read(_CABECALHO.size))
+        if versao != VERSAO:
+            raise ValueError(f"versão de gravação não suportada: {versao}")
+        while True:
+            cabecalho = arquivo.read(_REGISTRO.size)
+            if len(cabecalho) < _REGISTRO.size:
+                # Fim do arquivo (ou último registro cortado por um encerramento abrupto)
+                return
+            chegada, porta, tam_ip, tam_dados = _REGISTRO.unpack(cabecalho)
+            corpo = arquivo.read(tam_ip + tam_dados)
+            if len(corpo) < tam_ip + tam_dados:
+                return
+            familia = socket.AF_INET6 if tam_ip == 16 else socket.AF_INET
+            yield chegada, corpo[tam_ip:], (socket.inet_ntop(familia, corpo[:tam_ip]), porta)
+
+
+class ReprodutorPacotes:
+    """Fonte de pacotes que substitui o ReceptorUDP lendo uma gravação.
+
+    receber_lote devolve (data, endereço, chegada): a chegada gravada segue para o
+    pipeline, então sessão, lacunas e jitter saem iguais aos da captura original.
+    velocidade=1 reproduz em tempo real, N acelera N vezes e 0 entrega o mais
+    rápido possível.
+    """
+
+    def __init__(self, caminho, velocidade=1.0, lote_maximo=LOTE_MAXIMO):
+        self.caminho = caminho
+        self.velocidade = velocidade
+        self.lote_maximo = lote_maximo
+        self.terminado = False
+        self.erros_recepcao = 0
+        self._pacotes = ler_pacotes(caminho)
+        self._proximo = next(self._pacotes, None)
+        self._inicio_real = None
+        self._inicio_gravacao = None
+        self._acordar = threading.Event()
+
+    def _instante_real(self, chegada):
+        return self._inicio_real + (chegada - self._inicio_gravacao) / self.velocidade
+
+    def receber_lote(self, timeout=None):
+        """Devolve os pacotes cujo instante de reprodução já chegou (espera até timeout se nenhum)"""
+        if self._proximo is None:
+            self.terminado = True
+            self._acordar.wait(timeout)
+            self._acordar.clear()
+            return []
+        if self._inicio_real is None:
+            self._inicio_real = time.perf_counter()
+            self._inicio_gravacao = self._proximo[0]
+
+        if self.velocidade:
+            espera = self._instante_real(self._proximo[0]) - time.perf_counter()
+            if espera > 0:
+                if timeout is not None and espera > timeout:
+                    self._acordar.wait(timeout)
+                    self._acordar.clear()
+                    return []
+                if self._acordar.wait(espera):
+                    self._acordar.clear()
+                    return []
+
+        lote = []
+        agora = time.perf_counter()
+        while self._proximo is not None and len(lote) < self.lote_maximo:
+            chegada, data, endereco = self._proximo
+            if self.velocidade and self._instante_real(chegada) > agora:
+                break
+            lote.append((data, endereco, chegada))
+            self._proximo = next(self._pacotes, None)
+        return lote
+
+    def despertar(self):
+        self._acordar.set()
+
+    def descartes_kernel(self):
+        return None
+
+    def fechar(self):
+        self._pacotes.close()
+        self._proximo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
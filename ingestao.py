@@ -0,0 +1,215 @@
+import time
+from datetime import datetime
+
+import numpy as np
+
+from processamento import GRAVIDADE, LP_ALPHA, processar_lote
+from saude import SaudeIngestao
+from sensagram import decodificar_acelerometro, extrair_timestamp
+
+# === TIPOS DE ALERTA ===
+ALERTA_TILT = 'tilt'
+ALERTA_VIB = 'vibração'
+
+# Limites e regras de alerta; a interface envia atualizações via configurar()
+CONFIGURACAO_PADRAO = {
+    'tilt': 80.0,
+    'vib': 1.5,
+    'histerese_tilt': 20.0,
+    'histerese_vib': 0.3,
+    'monitorar_tilt': False,
+    'monitorar_vib': False,
+    'unidade_vib': 'g',  # unidade em que o limite de vibração foi informado ('g' ou 'm/s²')
+}
+
+
+class PipelineIngestao:
+    """Do datagrama ao alerta: demultiplexa, decodifica, calibra, processa em lote e avalia alertas.
+
+    Não depende da interface: roda na thread de recepção, no loop asyncio ou no
+    processo de ingestão. ao_lote(disp, colunas) recebe cada lote processado
+    (padrão: grava na sessão do dispositivo) e ao_alertar(disp, tipo, instante, valor)
+    é chamado a cada disparo.
+    """
+
+    def __init__(self, dispositivos, configuracao=None, alpha=LP_ALPHA, ao_lote=None, ao_alertar=None):
+        self.dispositivos = dispositivos
+        self.alpha = alpha
+        self.configuracao = dict(CONFIGURACAO_PADRAO)
+        if configuracao:
+            self.configuracao.update(configuracao)
+        self._ao_lote = ao_lote or self._gravar_na_sessao
+        self._ao_alertar = ao_alertar
+        self.saude = SaudeIngestao()
+        self.gravador = None  # GravadorPacotes: grava cada datagrama recebido, antes de decodificar
+        # Relógio de chegada em epoch com a resolução do perf_counter (time.time é grosseiro no Windows)
+        self._base_epoch = time.time() - time.perf_counter()
+
+    def configurar(self, **valores):
+        """Troca limites/regras de alerta; vale a partir do próximo lote"""
+        configuracao = dict(self.configuracao)
+        configuracao.update(valores)
+        # Substitui o dicionário inteiro: a thread de ingestão nunca vê uma configuração pela metade
+        self.configuracao = configuracao
+
+    def processar_datagrama(self, data, endereco, chegada=None):
+        """Encaminha um datagrama ao dispositivo de origem.
+
+        chegada (epoch, s) vem da gravação ao reproduzir; na recepção ao vivo é o instante atual.
+        Nunca levanta: um datagrama que provoca erro é contado em malformados e a recepção segue.
+        """
+        try:
+            self._encaminhar_datagrama(data, endereco, chegada)
+        except Exception as e:
+            self.saude.malformados += 1
+            self.saude.ultimo_erro = f"datagrama descartado: {e}"
+
+    def _desativar_gravador(self, gravador, erro):
+        """Desliga a gravação de pacotes depois de uma falha; a recepção continua"""
+        self.gravador = None
+        self.saude.ultimo_erro = f"gravação de pacotes desativada: {erro}"
+        print(f"⚠️ Gravação de pacotes desativada ({gravador.caminho}): {erro}")
+        try:
+            gravador.fechar()
+        except Exception:
+            pass
+
+    def _encaminhar_datagrama(self, data, endereco, chegada):
+        if chegada is None:
+            chegada = self._base_epoch + time.perf_counter()
+        gravador = self.gravador
+        if gravador is not None:
+            try:
+                gravador.gravar(chegada, data, endereco)
+            except Exception as e:
+                # Disco cheio etc.: perde-se a gravação, não o datagrama
+                self._desativar_gravador(gravador, e)
+        saude = self.saude
+        saude.recebidos += 1
+        disp = self.dispositivos.obter(endereco)
+        if disp is None:
+            saude.ignorados_limite += 1
+            return
+        try:
+            amostra = decodificar_acelerometro(data)
+        except ValueError as e:
+            # JSON/UTF-8 inválido ou campos fora do formato esperado
+            saude.malformados += 1
+            saude.ultimo_erro = str(e)
+            amostra = None
+        else:
+            if amostra is None:
+                saude.rejeitados_tipo += 1
+            else:
+                saude.decodificados += 1
+                disp.fluxo.registrar(chegada, extrair_timestamp(data))
+
+        # Os primeiros datagramas de cada dispositivo só calibram a gravidade
+        if disp.calibracao_restante:
+            disp.calibracao_restante -= 1
+            if amostra is not None:
+                ax, ay, az = amostra
+                alpha = self.alpha
+                gravity = disp.gravity
+                gravity[0] = alpha*gravity[0] + (1-alpha)*ax
+                gravity[1] = alpha*gravity[1] + (1-alpha)*ay
+                gravity[2] = alpha*gravity[2] + (1-alpha)*az
+            return
+
+        if amostra is None:
+            return
+        # Acumula; o lote é processado de uma vez em processar_pendentes()
+        disp.pendentes.append((chegada, *amostra))
+
+    def processar_pendentes(self):
+        """Processa as amostras acumuladas de todos os dispositivos (fim de cada lote recebido).
+
+        Nunca levanta: um lote que falha é descartado e contado em malformados, e a
+        recepção continua (uma exceção aqui encerraria a thread ou o processo de ingestão).
+        """
+        for identificador in self.dispositivos.ids():
+            disp = self.dispositivos.get(identificador)
+            if disp is None or not disp.pendentes:
+                continue
+            pendentes = disp.pendentes
+            disp.pendentes = []
+            try:
+                self._processar_lote(disp, pendentes)
+            except Exception as e:
+                self._descartar(len(pendentes), f"lote de {identificador} descartado: {e}")
+                print(f"⚠️ Erro ao processar lote de {identificador}: {e}")
+
+    def reiniciar_saude(self):
+        self.saude = SaudeIngestao()
+
+    def resumo_saude(self):
+        """Contadores gerais mais o fluxo de cada dispositivo"""
+        return self.saude.resumo(self.dispositivos)
+
+    def _descartar(self, amostras, erro):
+        """Amostras já contadas como decodificadas que não chegaram à sessão: passam a malformadas"""
+        saude = self.saude
+        saude.decodificados -= amostras
+        saude.malformados += amostras
+        saude.ultimo_erro = erro
+
+    def _converter_lote(self, pendentes):
+        """(chegada, ax, ay, az) -> array n x 4; linhas que não viram float finito são descartadas"""
+        try:
+            colunas = np.array(pendentes, dtype=np.float64)
+            if colunas.ndim == 2 and colunas.shape[1] == 4 and np.isfinite(colunas).all():
+                return colunas
+        except (TypeError, ValueError):
+            pass
+        validas = []
+        for linha in pendentes:
+            try:
+                valores = np.array(linha, dtype=np.float64)
+            except (TypeError, ValueError):
+                continue
+            if valores.shape == (4,) and np.isfinite(valores).all():
+                validas.append(valores)
+        if len(validas) < len(pendentes):
+            self._descartar(len(pendentes) - len(validas), "amostra não numérica no lote")
+        return np.array(validas, dtype=np.float64).reshape(-1, 4)
+
+    def _processar_lote(self, disp, pendentes):
+        colunas = self._converter_lote(pendentes)
+        if not len(colunas):
+            return
+        tempo, ax, ay, az = colunas[:, 0], colunas[:, 1], colunas[:, 2], colunas[:, 3]
+
+        # Mesmo resultado, bit a bit, do cálculo amostra a amostra
+        tilts_lote, vibs_lote = processar_lote(ax, ay, az, disp.gravity, self.alpha)
+        self._ao_lote(disp, {
+            'tempo': tempo, 'ax': ax, 'ay': ay, 'az': az,
+            'tilt': tilts_lote, 'vib': vibs_lote,
+        })
+        self._avaliar_alertas(disp, tempo, tilts_lote, vibs_lote)
+
+    def _gravar_na_sessao(self, disp, colunas):
+        disp.sessao.adicionar_lote(**colunas)
+
+    def _avaliar_alertas(self, disp, tempo, tilts_lote, vibs_lote):
+        """Atualiza as médias móveis do lote e dispara os alertas com histerese"""
+        configuracao = self.configuracao
+        medias_tilt = disp.media_tilt.adicionar_lote(tilts_lote)
+        medias_vib = disp.media_vib.adicionar_lote(vibs_lote)
+
+        if configuracao['monitorar_tilt']:
+            for i in disp.regra_tilt.avaliar(medias_tilt, configuracao['tilt'], configuracao['histerese_tilt']):
+                self._disparar(disp, ALERTA_TILT, tempo[i], float(medias_tilt[i]))
+
+        # Alerta de vibração - compara na unidade correta
+        if configuracao['monitorar_vib']:
+            if configuracao['unidade_vib'] == 'm/s²':
+                medias_vib = medias_vib * GRAVIDADE
+            for i in disp.regra_vib.avaliar(medias_vib, configuracao['vib'], configuracao['histerese_vib']):
+                self._disparar(disp, ALERTA_VIB, tempo[i], float(medias_vib[i]))
+
+    def _disparar(self, disp, tipo, tempo, valor):
+        # Instante de chegada da amostra que disparou (reprodução gera os mesmos alertas)
+        instante = datetime.fromtimestamp(float(tempo))
+        disp.alerts.append((tipo, instante, valor))
+        if self._ao_alertar:
+            self._ao_alertar(disp, tipo, instante, valor)
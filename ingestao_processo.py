@@ -0,0 +1,193 @@
+import multiprocessing
+import queue
+import sys
+import time
+from contextlib import contextmanager
+
+from anel_compartilhado import CAPACIDADE_ANEL, AnelAmostras
+from diario import aplicar_estado
+from dispositivos import Dispositivos
+from gravacao_pacotes import GravadorPacotes, ReprodutorPacotes
+from ingestao import PipelineIngestao
+from processamento import LP_ALPHA
+from receptor_udp import LOTE_MAXIMO, RCVBUF_PADRAO, TAMANHO_DATAGRAMA, ReceptorUDP
+
+# === CONFIGURAÇÕES PADRÃO ===
+ESPERA_CONTROLE = 0.1  # s; intervalo máximo entre consultas às mensagens de controle
+ESPERA_ENCERRAMENTO = 2.0
+INTERVALO_SAUDE = 1.0  # s entre envios dos contadores de saúde para a interface
+
+
+def executar_ingestao(porta, nome_anel, controle, eventos, parametros, configuracao):
+    """Alvo do processo filho: recepção UDP, processamento e alertas, sem interface.
+
+    As amostras processadas vão para o anel compartilhado; alertas, erros e o aviso
+    de encerramento vão pela fila de eventos, junto com o resumo de saúde a cada
+    INTERVALO_SAUDE. Mensagens de controle aceitas:
+    ('configurar', {...}) e ('parar',).
+    """
+    anel = AnelAmostras(nome_anel)
+    dispositivos = Dispositivos(parametros['janela_tilt'], parametros['janela_vib'], parametros['calibracao'])
+    # Sessão retomada: filtro, janelas e regras de alerta continuam de onde pararam
+    for identificador, estado in (parametros['estado_inicial'] or {}).items():
+        aplicar_estado(dispositivos.registrar(identificador), estado)
+
+    nomes_publicados = set()
+
+    def ao_lote(disp, colunas):
+        if disp.indice not in nomes_publicados:
+            anel.registrar_nome(disp.indice, disp.id)
+            nomes_publicados.add(disp.indice)
+        anel.escrever(disp.indice, colunas)
+
+    def ao_alertar(disp, tipo, instante, valor):
+        eventos.put(('alerta', disp.id, tipo, instante, valor))
+
+    pipeline = PipelineIngestao(dispositivos, configuracao, parametros['alpha'], ao_lote, ao_alertar)
+    receptor = None
+    try:
+        if parametros['reproduzir']:
+            receptor = ReprodutorPacotes(parametros['reproduzir'], parametros['velocidade'],
+                                         lote_maximo=parametros['lote_maximo'])
+        else:
+            receptor = ReceptorUDP(porta, rcvbuf=parametros['rcvbuf'], tamanho_datagrama=parametros['tamanho_datagrama'],
+                                   lote_maximo=parametros['lote_maximo'])
+        pipeline.saude.receptor = receptor
+        if parametros['gravar_pacotes']:
+            pipeline.gravador = GravadorPacotes(parametros['gravar_pacotes'])
+        ultimo_envio_saude = time.monotonic()
+        reproducao_concluida = False
+        while True:
+            # Windows não mistura pipes e sockets no mesmo seletor: o controle é consultado a cada espera
+            while controle.poll():
+                mensagem = controle.recv()
+                if mensagem[0] == 'parar':
+                    return
+                if mensagem[0] == 'configurar':
+                    pipeline.configurar(**mensagem[1])
+            for pacote in receptor.receber_lote(ESPERA_CONTROLE):
+                pipeline.processar_datagrama(*pacote)
+            pipeline.processar_pendentes()
+            if getattr(receptor, 'terminado', False) and not reproducao_concluida:
+                reproducao_concluida = True
+                eventos.put(('reproducao_concluida', parametros['reproduzir']))
+            if time.monotonic() - ultimo_envio_saude >= INTERVALO_SAUDE:
+                ultimo_envio_saude = time.monotonic()
+                eventos.put(('saude', pipeline.resumo_saude()))
+    except (KeyboardInterrupt, EOFError, BrokenPipeError):
+        # Interface encerrada sem mandar 'parar'
+        pass
+    except Exception as e:
+        eventos.put(('erro', f"{type(e).__name__}: {e}"))
+    finally:
+        # Último retrato (com o receptor ainda aberto) para o relatório
+        eventos.put(('saude', pipeline.resumo_saude()))
+        if pipeline.gravador is not None:
+            pipeline.gravador.fechar()
+        if receptor is not None:
+            receptor.fechar()
+        anel.fechar()
+        eventos.put(('encerrado',))
+
+
+class ProcessoIngestao:
+    """Lado da interface do processo de ingestão.
+
+    Cria o anel compartilhado (somente leitura deste lado), sobe o processo filho e
+    troca mensagens com ele. drenar() é chamado no loop do Tk e devolve as amostras
+    novas e os eventos pendentes; uma renderização lenta só atrasa a leitura do anel,
+    nunca a recepção dos pacotes.
+    """
+
+    def __init__(self, porta, configuracao, janela_tilt, janela_vib, calibracao, alpha=LP_ALPHA,
+                 rcvbuf=RCVBUF_PADRAO, tamanho_datagrama=TAMANHO_DATAGRAMA, lote_maximo=LOTE_MAXIMO,
+                 capacidade=CAPACIDADE_ANEL, gravar_pacotes=None, reproduzir=None, velocidade=1.0,
+                 estado_inicial=None):
+        self.porta = porta
+        self._configuracao = dict(configuracao)
+        self._parametros = {
+            'janela_tilt': janela_tilt, 'janela_vib': janela_vib, 'calibracao': calibracao, 'alpha': alpha,
+            'rcvbuf': rcvbuf, 'tamanho_datagrama': tamanho_datagrama, 'lote_maximo': lote_maximo,
+            'gravar_pacotes': gravar_pacotes, 'reproduzir': reproduzir, 'velocidade': velocidade,
+            'estado_inicial': estado_inicial,  # {identificador: reconstruir_estado(...)} ao retomar
+        }
+        self._capacidade = capacidade
+        self.anel = None
+        self._processo = None
+        self._controle = None
+        self._eventos = None
+
+    def iniciar(self):
+        # spawn em todas as plataformas: o filho não herda a interface nem as threads do Tk
+        contexto = multiprocessing.get_context('spawn')
+        self.anel = AnelAmostras(capacidade=self._capacidade, somente_leitura=True)
+        controle_filho, self._controle = contexto.Pipe(duplex=False)
+        self._eventos = contexto.Queue()
+        self._processo = contexto.Process(
+            target=executar_ingestao, name='riggy-ingestao', daemon=True,
+            args=(self.porta, self.anel.nome, controle_filho, self._eventos, self._parametros, self._configuracao))
+        _iniciar_sem_reimportar_main(self._processo)
+        controle_filho.close()
+
+    def configurar(self, **valores):
+        """Envia novos limites/regras de alerta ao processo de ingestão"""
+        self._configuracao.update(valores)
+        self._enviar(('configurar', valores))
+
+    def _enviar(self, mensagem):
+        try:
+            self._controle.send(mensagem)
+        except (OSError, AttributeError):
+            # Processo já encerrado (ou nunca iniciado)
+            pass
+
+    def drenar(self):
+        """Devolve (amostras novas do anel, lista de eventos pendentes)"""
+        eventos = []
+        while True:
+            try:
+                eventos.append(self._eventos.get_nowait())
+            except (queue.Empty, OSError, ValueError):
+                break
+        return self.anel.ler(), eventos
+
+    def nome_dispositivo(self, indice):
+        return self.anel.nome_dispositivo(indice)
+
+    def parar(self):
+        """Pede o encerramento e espera o filho sair; o anel continua legível até fechar()"""
+        self._enviar(('parar',))
+        self._processo.join(ESPERA_ENCERRAMENTO)
+        if self._processo.is_alive():
+            self._processo.terminate()
+            self._processo.join()
+        self._controle.close()
+
+    def fechar(self):
+        self._eventos.close()
+        self.anel.fechar()
+
+
+def _iniciar_sem_reimportar_main(processo):
+    with sem_reimportar_main():
+        processo.start()
+
+
+@contextmanager
+def sem_reimportar_main():
+    """Processos iniciados dentro do bloco não reexecutam o script principal.
+
+    No modo spawn o filho importa o __main__ do pai antes de chamar o alvo; main.py
+    monta a interface ao ser importado, então o caminho do script é escondido
+    durante o start() (no executável congelado o multiprocessing já pula esse passo).
+    """
+    principal = sys.modules['__main__']
+    arquivo = principal.__dict__.pop('__file__', None)
+    especificacao = getattr(principal, '__spec__', None)
+    principal.__spec__ = None
+    try:
+        yield
+    finally:
+        principal.__spec__ = especificacao
+        if arquivo is not None:
+            principal.__file__ = arquivo
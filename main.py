@@ -1,24 +1,44 @@
+import sys
+
+# Modo headless (servico.py): recepção, alertas, sessões e relatórios sem Tk, matplotlib nem pygame.
+# Decidido antes de qualquer import da interface, que monta a janela e o mixer ao ser importada.
+if __name__ == "__main__" and '--headless' in sys.argv[1:]:
+    import servico
+    sys.exit(servico.main([arg for arg in sys.argv[1:] if arg != '--headless']))
+
 import customtkinter as ctk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import socket
 import threading
 import time
-import pygame
-import json
 from datetime import datetime
 import os
 from collections import deque
-import math
-import statistics
+from concurrent.futures import wait
 import subprocess
-import cv2
 import numpy as np
-from ebooklib import epub
-from jinja2 import Template
-import base64
-import fitz  # PyMuPDF
-import sys
+import argparse
+import multiprocessing
+from tkinter import messagebox
+from receptor_udp import ReceptorUDP
+from receptor_asyncio import ReceptorAsyncio
+from dispositivos import Dispositivos
+from armazenamento import SessaoColunar, SessaoEmDisco, nome_diretorio
+from audio import AlertasSonoros
+from captura_video import CapturaQuadros, CodificadorVideo
+from diario import DiarioSessao, aplicar_estado, ler_diario, reconstruir_estado, resumir_diario, sessao_interrompida
+from ingestao import ALERTA_TILT, PipelineIngestao
+from ingestao_processo import ProcessoIngestao
+from normas import estruturas_normas, unidade_vibracao
+from trabalhos import FilaTrabalhos, TrabalhoCancelado
+from video_offline import renderizar_em_segundo_plano
+from grafico_ao_vivo import GraficoAoVivo
+from processamento import CacheSuavizacao, estimar_fs, g_para_ms2, reduzir_serie, vibracao_na_unidade
+import relatorio
+from relatorio import contexto_relatorio
+from gravacao_pacotes import GravadorPacotes, ReprodutorPacotes
+from saude import formatar_saude
 
 def resource_path(relative_path):
     try:
@@ -29,84 +49,95 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description='Riggy - UDP SensaGram')
+    parser.add_argument('--ingestao', choices=['thread', 'asyncio', 'processo'], default='thread',
+                        help='backend de recepção UDP (padrão: thread; processo: ingestão fora da interface)')
+    parser.add_argument('--gravar-pacotes', action='store_true',
+                        help='grava todos os datagramas recebidos em pacotes_<data>.rpk')
+    parser.add_argument('--reproduzir', metavar='ARQUIVO',
+                        help='usa uma gravação .rpk como fonte de pacotes no lugar da rede')
+    parser.add_argument('--velocidade', type=float, default=1.0,
+                        help='velocidade da reprodução (1 = tempo real, 0 = o mais rápido possível)')
+    parser.add_argument('--sessoes', metavar='DIRETORIO', default='sessoes',
+                        help='onde o histórico de cada recepção é persistido (padrão: sessoes)')
+    parser.add_argument('--video', choices=['offline', 'ao-vivo'], default='offline',
+                        help='offline: vídeo renderizado das amostras ao encerrar (padrão); '
+                             'ao-vivo: cópia do gráfico durante a recepção')
+    parser.add_argument('--headless', action='store_true',
+                        help='sem interface: veja python servico.py --help')
+    # parse_known_args: o executável do PyInstaller pode receber argumentos extras
+    args, _ = parser.parse_known_args()
+    return args
+
 def fechar_janela():
+    parar_thread_ingestao()
+    encerrar_processo_ingestao()
+    finalizar_persistencia_sessao()
     app.destroy()
     sys.exit(0)
 
 # === CONFIGURAÇÕES ===
+# Executável congelado: o processo de ingestão reentra por aqui e não deve montar a interface
+multiprocessing.freeze_support()
+ARGS = ler_argumentos()
+BACKEND_INGESTAO = ARGS.ingestao
+if ARGS.reproduzir and BACKEND_INGESTAO == 'asyncio':
+    # A reprodução não passa por socket; o laço da thread atende o mesmo pipeline
+    print("Reprodução usa o backend 'thread' no lugar do 'asyncio'")
+    BACKEND_INGESTAO = 'thread'
 PORTA_UDP = 5000
-TIMEOUT = 0.01
+TIMEOUT = 0.5  # espera máxima do seletor; o encerramento acorda a thread na hora
+ATRASO_LOTE_ASYNCIO = 0.005  # backend asyncio: junta os pacotes de 5 ms num lote
 LP_ALPHA = 0.9
 WINDOW_SIZE = 20
+JANELA_ALERTA_TILT = WINDOW_SIZE  # amostras na média móvel do alerta de inclinação
+JANELA_ALERTA_VIB = WINDOW_SIZE  # amostras na média móvel do alerta de vibração
 TARGET_FPS = 15
 FRAME_INTERVAL = 1.0 / TARGET_FPS
-BUFFER_SIZE = 2048
-gravacao_inicio = None
+MODO_VIDEO = ARGS.video
+BUFFER_SIZE = 2048  # tamanho máximo de um datagrama
+RCVBUF_UDP = 4 * 1024 * 1024  # buffer de recepção do kernel (SO_RCVBUF)
+LOTE_UDP = 256  # datagramas drenados por acordada do seletor
+gravacao_inicio = None  # início da recepção (mantido ao retomar uma sessão interrompida)
 gravacao_fim = None
-
-# === NORMAS TÉCNICAS BRASILEIRAS ===
-estruturas_normas = {
-    'Concreto Armado (NBR 6118)': {
-        'tilt': 1.0,
-        'vib': 0.7,
-        'norma': 'NBR 6118',
-        'descricao': 'Estruturas de concreto armado - Procedimento'
-    },
-    'Estruturas de Aço (NBR 8800)': {
-        'tilt': 1.5,
-        'vib': 0.5,
-        'norma': 'NBR 8800',
-        'descricao': 'Projeto de estruturas de aço e de estruturas mistas de aço e concreto'
-    },
-    'Estruturas Leves (NBR 15370)': {
-        'tilt': 2.0,
-        'vib': 0.3,
-        'norma': 'NBR 15370',
-        'descricao': 'Estruturas de madeira - Métodos de ensaio'
-    },
-    'Pontes e Viadutos (NBR 7188)': {
-        'tilt': 0.8,
-        'vib': 0.4,
-        'norma': 'NBR 7188',
-        'descricao': 'Carga móvel rodoviária e de pedestres em pontes'
-    },
-    'Estruturas Pré-moldadas (NBR 9062)': {
-        'tilt': 1.2,
-        'vib': 0.6,
-        'norma': 'NBR 9062',
-        'descricao': 'Projeto e execução de estruturas de concreto pré-moldado'
-    },
-    'Personalizada': {
-        'tilt': 80.0,
-        'vib': 1.5,
-        'norma': 'Limites Personalizados',
-        'descricao': 'Limites definidos pelo usuário'
-    }
-}
+video_inicio = None  # início dos frames do vídeo atual
 
 # Variáveis globais para limites atuais
+# O alerta rearma quando a média cai abaixo de limite - histerese (mesma unidade do limite)
 TILT_THRESHOLD = 80.0
 VIB_THRESHOLD = 1.5
+HISTERESE_TILT = 20.0
+HISTERESE_VIB = 0.3
 ESTRUTURA_ATUAL = 'Personalizada'
 UNIDADE_VIB_ATUAL = 'g'
 
 # === ÁUDIO ===
-pygame.mixer.init()
+ARQUIVOS_ALERTA = ['alerta_inclinacao.mp3', 'alerta_vibracao.mp3', 'alerta_deformacao.mp3']
+alertas_sonoros = AlertasSonoros(ARQUIVOS_ALERTA)
+alertas_sonoros.iniciar()
+
 def tocar_alerta(nome_arquivo):
-    if os.path.isfile(nome_arquivo):
-        pygame.mixer.music.load(nome_arquivo)
-        pygame.mixer.music.play()
+    # Só enfileira: a decodificação já foi feita e a reprodução roda em outra thread
+    alertas_sonoros.tocar(nome_arquivo)
 
 # === VARIÁVEIS GLOBAIS ===
 running = False
 thread = None
 recording = False
-video_writer = None
+codificador_video = None  # CodificadorVideo da gravação em andamento (modo ao-vivo)
+renderizacao_video = None  # Future do vídeo renderizado ao encerrar (modo offline)
 video_filename = None
-frames_buffer = []
+frames_gravados = 0  # quadros no arquivo da última gravação
 last_frame_time = 0
 
 data_thread = None
+receptor_udp = None
+processo_ingestao = None
+resumo_saude_processo = None  # último resumo de saúde enviado pelo processo de ingestão
+diario_sessao = None  # DiarioSessao da recepção em andamento
+ultima_atualizacao_saude = 0
+INTERVALO_SAUDE_UI = 1.0
 graph_thread = None
 video_thread = None
 
@@ -116,7 +147,8 @@ graph_queue = queue.Queue()
 
 graph_cache = {}
 last_update_time = 0
-UPDATE_INTERVAL = 0.1
+FPS_GRAFICO = 30  # quadros/s do gráfico ao vivo (só a área dos eixos é redesenhada)
+UPDATE_INTERVAL = 1.0 / FPS_GRAFICO
 
 performance_stats = {
     'frames_capturados': 0,
@@ -124,35 +156,23 @@ performance_stats = {
     'fps_real': 0
 }
 
-loading_dots = 0
-loading_timer_epub = None
-loading_timer_pdf = None
-
 INTERPOLACAO_HABILITADA = False
 encerrado = False
 
-tempo = []
+# Cada origem UDP tem seu próprio estado; os nomes abaixo apontam para o
+# dispositivo selecionado na interface (gráficos e relatórios)
+dispositivos = Dispositivos(JANELA_ALERTA_TILT, JANELA_ALERTA_VIB, WINDOW_SIZE)
+dispositivo_atual = None
+dispositivos_versao_menu = -1
+
 tilts = deque(maxlen=WINDOW_SIZE)
 vibracoes = deque(maxlen=WINDOW_SIZE)
 alerts = []
 
-tilts_all = []
-vibracoes_all = []
-
-tilt_alerted = False
-vib_alerted = False
-t = 0
-gravity = [0.0, 0.0, 9.81]
+# Histórico completo (tempo, eixos brutos, inclinação, vibração) em colunas NumPy
+sessao_atual = SessaoColunar()
 
 # === FUNÇÕES DE CONVERSÃO DE UNIDADES ===
-def g_para_ms2(valor_g):
-    """Converte aceleração de g para m/s²"""
-    return valor_g * 9.81
-
-def ms2_para_g(valor_ms2):
-    """Converte aceleração de m/s² para g"""
-    return valor_ms2 / 9.81
-
 def obter_limite_vib_convertido():
     """Obtém o limite de vibração na unidade correta"""
     global VIB_THRESHOLD, UNIDADE_VIB_ATUAL
@@ -163,74 +183,97 @@ def obter_limite_vib_convertido():
 
 def converter_vibracao_para_unidade_norma(vib_g):
     """Converte vibração de g para a unidade da norma (m/s²)"""
-    global UNIDADE_VIB_ATUAL
-    if UNIDADE_VIB_ATUAL == 'm/s²':
-        return g_para_ms2(vib_g)
-    else:
-        return vib_g
+    return vibracao_na_unidade(vib_g, UNIDADE_VIB_ATUAL)
 
 # === GRAVAÇÃO DE VÍDEO ===
 def iniciar_gravacao():
-    global recording, video_writer, video_filename, frames_buffer, gravacao_inicio
+    global recording, codificador_video, renderizacao_video, video_filename, frames_gravados, gravacao_inicio, video_inicio
     if recording:
         return
+    renderizacao_video = None
     now = datetime.now().strftime("%Y%m%d_%H%M%S")
     video_filename = f"gravacao_graficos_{now}.mp4"
-    recording = True
-    frames_buffer = []
+    frames_gravados = 0
+    # A recepção começa mesmo se o vídeo ao vivo falhar: o diário da sessão precisa deste instante
     gravacao_inicio = datetime.now()
-    print(f"Iniciando gravação: {video_filename}")
+    if MODO_VIDEO == 'ao-vivo':
+        try:
+            # Os quadros vão para o arquivo conforme são capturados, numa thread própria
+            codificador_video = CodificadorVideo(video_filename, TARGET_FPS)
+        except Exception as e:
+            print(f"Erro ao iniciar gravação: {e}")
+            return
+    recording = True
+    video_inicio = gravacao_inicio
+    if codificador_video is not None:
+        print(f"Iniciando gravação: {video_filename} ({codificador_video.codec})")
+    else:
+        print(f"Iniciando gravação: {video_filename} (renderizado das amostras ao encerrar)")
 
 def finalizar_gravacao():
-    global recording, video_writer, frames_buffer, gravacao_fim
+    global recording, codificador_video, frames_gravados, gravacao_fim
     if not recording:
         return
     recording = False
     gravacao_fim = datetime.now()
-
-    if len(frames_buffer) == 0:
-        print("Nenhum frame capturado para gravação")
+    if codificador_video is None:
+        iniciar_video_offline()
         return
+    captura_quadros.esperar()
+
+    codificador, codificador_video = codificador_video, None
     try:
-        height, width, channels = frames_buffer[0].shape
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        
-        duracao_segundos = (gravacao_fim - gravacao_inicio).total_seconds()
-        fps_real = len(frames_buffer) / duracao_segundos if duracao_segundos > 0 else TARGET_FPS
-        
-        fps_video = fps_real
-        video_writer = cv2.VideoWriter(video_filename, fourcc, fps_video, (width, height))
-        
-        if len(frames_buffer) > 1:
-            print(f"Usando frames reais: {len(frames_buffer)} frames")
-            print(f"FPS real calculado: {fps_video:.2f}")
-            print(f"Velocidade do vídeo será igual à velocidade real do teste")
-        
-        for frame in frames_buffer:
-            video_writer.write(frame)
-        video_writer.release()
-        video_writer = None
-        
-        duracao_real = (gravacao_fim - gravacao_inicio).total_seconds()
-        fps_real = len(frames_buffer) / duracao_real if duracao_real > 0 else 0
-        performance_stats['fps_real'] = fps_real
-        
-        print(f"Gravação finalizada: {video_filename}")
-        print(f"Frames capturados: {len(frames_buffer)}")
-        print(f"FPS real: {fps_video:.2f}")
-        print(f"Duração do teste: {duracao_segundos:.2f} segundos")
-        print(f"Duração do vídeo: {len(frames_buffer) / fps_video:.2f} segundos")
-        print(f"✅ Vídeo com velocidade correta!")
-        if video_filename and os.path.isfile(video_filename):
-            print(f"Vídeo salvo: {video_filename}")
+        duracao_video = codificador.encerrar(gravacao_fim.timestamp())
     except Exception as e:
         print(f"Erro ao finalizar gravação: {e}")
-        if video_writer:
-            video_writer.release()
+        return
+    frames_gravados = codificador.quadros
+
+    if codificador.recebidos == 0:
+        print("Nenhum frame capturado para gravação")
+        if os.path.isfile(video_filename):
+            os.remove(video_filename)
+        return
+
+    duracao_segundos = (gravacao_fim - video_inicio).total_seconds()
+    fps_real = codificador.recebidos / duracao_segundos if duracao_segundos > 0 else 0
+    performance_stats['fps_real'] = fps_real
+
+    print(f"Gravação finalizada: {video_filename}")
+    print(f"Frames capturados: {codificador.recebidos} ({captura_quadros.descartados} descartados)")
+    print(f"FPS real: {fps_real:.2f} (arquivo a {TARGET_FPS} FPS, {frames_gravados} frames)")
+    print(f"Duração do teste: {duracao_segundos:.2f} segundos")
+    print(f"Duração do vídeo: {duracao_video:.2f} segundos")
+    print(f"✅ Vídeo com velocidade correta!")
+    if os.path.isfile(video_filename):
+        print(f"Vídeo salvo: {video_filename}")
+
+def iniciar_video_offline():
+    """Renderiza o vídeo da sessão exibida a partir das amostras, num processo filho"""
+    global renderizacao_video
+    n = len(sessao_atual)
+    if n < 2:
+        print("Nenhuma amostra para o vídeo da gravação")
+        return
+    # Cópia das colunas: a renderização não depende da sessão continuar aberta
+    colunas = [np.array(coluna[:n]) for coluna in (sessao_atual.tempo, sessao_atual.tilts, sessao_atual.vibracoes)]
+    print(f"Renderizando vídeo da sessão: {video_filename}")
+    renderizacao_video = renderizar_em_segundo_plano(
+        video_filename, *colunas, mostrar_tilt=grafico_tilt_var.get(), mostrar_vib=grafico_vib_var.get(),
+        unidade_vib=UNIDADE_VIB_ATUAL, janela=WINDOW_SIZE,
+        cores={'titulo': COR_LARANJA, 'texto': COR_TEXTO, 'fundo': COR_CINZA, 'borda': COR_PRETO})
+
+def guardar_frame(frame, instante):
+    """Roda na thread de captura: repassa o quadro ao codificador (que guarda uma cópia)"""
+    codificador = codificador_video
+    if codificador is not None:
+        codificador.escrever(frame, instante)
+
+captura_quadros = CapturaQuadros(guardar_frame)
 
 def capturar_frame_grafico():
-    global frames_buffer, last_frame_time, performance_stats
-    if not recording:
+    global last_frame_time
+    if not recording or codificador_video is None:
         return
     
     current_time = time.time()
@@ -239,1078 +282,345 @@ def capturar_frame_grafico():
     
     last_frame_time = current_time
     
-    performance_stats['frames_capturados'] += 1
-    performance_stats['tempo_ultima_atualizacao'] = current_time
-    
+    # Reaproveita o buffer do quadro que o gráfico ao vivo acabou de desenhar (sem outro
+    # canvas.draw); aqui só a cópia, a conversão para o vídeo roda na thread de captura
     try:
-        canvas.draw()
-        canvas.flush_events()
-        
-        buf = canvas.buffer_rgba()
-        buf = np.asarray(buf)
-        buf = buf.reshape(canvas.get_width_height()[::-1] + (4,))
-        
-        frame_rgb = buf[:, :, :3]
-        frame = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-        frame = cv2.resize(frame, (640, 480))
-        frame = cv2.resize(frame, (640, 480), interpolation=cv2.INTER_LINEAR)
-        
-        frames_buffer.append(frame.copy())
-        
-        if len(frames_buffer) > 1000:
-            frames_buffer.pop(0)
-            
+        if captura_quadros.capturar(np.asarray(canvas.buffer_rgba()), current_time):
+            performance_stats['frames_capturados'] += 1
+            performance_stats['tempo_ultima_atualizacao'] = current_time
     except Exception as e:
         print(f"Erro ao capturar frame: {e}")
-        try:
-            buf = np.frombuffer(canvas.tostring_rgb(), dtype=np.uint8)
-            buf = buf.reshape(canvas.get_width_height()[::-1] + (3,))
-            frame = cv2.cvtColor(buf, cv2.COLOR_RGB2BGR)
-            frame = cv2.resize(frame, (640, 480))
-            frames_buffer.append(frame.copy())
-            if len(frames_buffer) > 500:
-                frames_buffer.pop(0)
-        except Exception as e2:
-            print(f"Erro no fallback: {e2}")
-
-# === TEMPLATE HTML PARA EPUB ===
-EPUB_TEMPLATE = """
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml">
-<head>
-    <title>{{ titulo }}</title>
-    <meta charset="utf-8"/>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            margin: 20px;
-            color: #333;
-        }
-        .header {
-            text-align: center;
-            border-bottom: 3px solid #FF8800;
-            padding-bottom: 20px;
-            margin-bottom: 30px;
-        }
-        .logo {
-            color: #FF8800;
-            font-size: 24px;
-            font-weight: bold;
-        }
-        .subtitle {
-            color: #666;
-            font-size: 14px;
-        }
-        .section {
-            margin: 20px 0;
-            padding: 15px;
-            border-left: 4px solid #FF8800;
-            background-color: #f9f9f9;
-        }
-        .section-title {
-            color: #FF8800;
-            font-size: 16px;
-            font-weight: bold;
-            margin-bottom: 10px;
-        }
-        .norma-section {
-            background-color: #f0f0ff;
-            border: 2px solid #0066cc;
-            border-radius: 5px;
-            padding: 15px;
-            margin: 20px 0;
-        }
-        .stats-grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 20px;
-            margin: 15px 0;
-        }
-        .stat-item {
-            margin: 5px 0;
-        }
-        .status-conforme {
-            color: #008000;
-            font-weight: bold;
-        }
-        .status-nao-conforme {
-            color: #cc0000;
-            font-weight: bold;
-        }
-        .video-section {
-            background-color: #1a1a1a;
-            color: white;
-            padding: 20px;
-            border-radius: 5px;
-            margin: 20px 0;
-            text-align: center;
-        }
-        .video-container {
-            margin: 20px 0;
-            background-color: #000;
-            border-radius: 5px;
-            padding: 10px;
-        }
-        video {
-            max-width: 100%;
-            height: auto;
-            border-radius: 5px;
-            background-color: #000;
-        }
-        .video-fallback {
-            background-color: #333;
-            padding: 20px;
-            border-radius: 5px;
-            margin: 10px 0;
-        }
-        .video-fallback a {
-            color: #FF8800;
-            text-decoration: none;
-            font-weight: bold;
-        }
-        .video-fallback a:hover {
-            text-decoration: underline;
-        }
-        .footer {
-            border-top: 1px solid #FF8800;
-            padding-top: 15px;
-            margin-top: 30px;
-            font-size: 12px;
-            color: #666;
-        }
-        .chart-container {
-            text-align: center;
-            margin: 20px 0;
-        }
-        .chart-container img {
-            max-width: 100%;
-            height: auto;
-            border: 1px solid #ddd;
-            border-radius: 5px;
-        }
-        .video-info {
-            font-size: 12px;
-            color: #ccc;
-            margin: 10px 0;
-        }
-        .compatibility-note {
-            background-color: #2a2a2a;
-            padding: 15px;
-            border-radius: 5px;
-            margin: 15px 0;
-            font-size: 12px;
-            color: #aaa;
-        }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="logo">RELATÓRIO RIGGY</div>
-        <div class="subtitle">UDP SensaGram - Monitoramento de Sensores</div>
-    </div>
-
-    <div class="norma-section">
-        <div class="section-title">📋 NORMA TÉCNICA APLICADA</div>
-        <p><strong>Estrutura Avaliada:</strong> {{ estrutura_atual }}</p>
-        <p><strong>Norma Aplicada:</strong> {{ norma_info.norma }}</p>
-        <p><strong>Descrição:</strong> {{ norma_info.descricao }}</p>
-        <p><strong>Limites:</strong> Inclinação ≤ {{ limite_tilt }}° | Vibração ≤ {{ limite_vib }} {{ unidade_display }}</p>
-    </div>
-
-    <div class="section">
-        <div class="section-title">INFORMAÇÕES GERAIS</div>
-        <div class="stats-grid">
-            <div>
-                <div class="stat-item"><strong>Data e Hora:</strong> {{ data_hora }}</div>
-                <div class="stat-item"><strong>Pontos Coletados:</strong> {{ pontos_coletados }}</div>
-                <div class="stat-item"><strong>Duração do Teste:</strong> {{ duracao_teste }} segundos</div>
-            </div>
-            <div>
-                <div class="stat-item"><strong>Alertas de Inclinação:</strong> {{ alertas_tilt }}</div>
-                <div class="stat-item"><strong>Alertas de Vibração:</strong> {{ alertas_vib }}</div>
-            </div>
-        </div>
-    </div>
-
-    {% if mostrar_tilt %}
-    <div class="section">
-        <div class="section-title">📐 ESTATÍSTICAS DE INCLINAÇÃO (°)</div>
-        <div class="stats-grid">
-            <div>
-                <div class="stat-item"><strong>Média:</strong> {{ tilt_media }}°</div>
-                <div class="stat-item"><strong>Máximo:</strong> {{ tilt_max }}°</div>
-                <div class="stat-item"><strong>Mínimo:</strong> {{ tilt_min }}°</div>
-            </div>
-            <div>
-                <div class="stat-item"><strong>Desvio Padrão:</strong> {{ tilt_std }}°</div>
-                <div class="stat-item"><strong>Limite da Norma:</strong> {{ limite_tilt }}°</div>
-                <div class="stat-item"><strong>Status:</strong> 
-                    <span class="{{ 'status-conforme' if tilt_status == 'CONFORME' else 'status-nao-conforme' }}">
-                        {{ tilt_status }}
-                    </span>
-                </div>
-                <div class="stat-item"><strong>Avaliação:</strong> {{ tilt_avaliacao }}</div>
-            </div>
-        </div>
-    </div>
-    {% endif %}
-
-    {% if mostrar_vib %}
-    <div class="section">
-        <div class="section-title">📳 ESTATÍSTICAS DE VIBRAÇÃO ({{ unidade_display }})</div>
-        <div class="stats-grid">
-            <div>
-                <div class="stat-item"><strong>Média:</strong> {{ vib_media }}{{ unidade_display }}</div>
-                <div class="stat-item"><strong>Máximo:</strong> {{ vib_max }}{{ unidade_display }}</div>
-                <div class="stat-item"><strong>Mínimo:</strong> {{ vib_min }}{{ unidade_display }}</div>
-            </div>
-            <div>
-                <div class="stat-item"><strong>Desvio Padrão:</strong> {{ vib_std }}{{ unidade_display }}</div>
-                <div class="stat-item"><strong>Limite da Norma:</strong> {{ limite_vib }}{{ unidade_display }}</div>
-                <div class="stat-item"><strong>Status:</strong> 
-                    <span class="{{ 'status-conforme' if vib_status == 'CONFORME' else 'status-nao-conforme' }}">
-                        {{ vib_status }}
-                    </span>
-                </div>
-                <div class="stat-item"><strong>Avaliação:</strong> {{ vib_avaliacao }}</div>
-            </div>
-        </div>
-        {% if unidade_display == 'm/s²' %}
-        <p style="font-size: 12px; color: #666; margin-top: 10px;">
-            * Valores convertidos de g para m/s² conforme NBR ISO 2631-1
-        </p>
-        {% endif %}
-    </div>
-    {% endif %}
-
-    {% if graficos %}
-    <div class="section">
-        <div class="section-title">📊 GRÁFICOS COMPLETOS POR TEMPO</div>
-        {% for grafico in graficos %}
-        <div class="chart-container">
-            <img src="{{ grafico.src }}" alt="{{ grafico.alt }}" />
-            <p>{{ grafico.titulo }}</p>
-        </div>
-        {% endfor %}
-    </div>
-    {% endif %}
-
-    {% if video_data %}
-    <div class="video-section">
-        <div class="section-title" style="color: #FF8800;">🎥 GRAVAÇÃO DOS GRÁFICOS</div>
-        <p><strong>Arquivo:</strong> {{ video_filename }}</p>
-        <p><strong>Frames Capturados:</strong> {{ frames_capturados }}</p>
-        <p><strong>Duração:</strong> {{ duracao_video }} segundos</p>
-        <p><strong>Tamanho:</strong> {{ video_size_mb }} MB</p>
-        
-        <div class="video-container">
-            {% if video_base64 %}
-            <!-- Vídeo embutido como base64 -->
-            <video controls preload="metadata" style="width: 100%; max-width: 640px;">
-                <source src="data:video/mp4;base64,{{ video_base64 }}" type="video/mp4">
-                <p style="color: #ff6666;">Seu leitor de EPUB não suporta vídeos HTML5.</p>
-            </video>
-            <div class="video-info">
-                ✅ Vídeo embutido diretamente no EPUB (base64)
-            </div>
-            {% else %}
-            <!-- Vídeo como arquivo anexo -->
-            <video controls preload="metadata" style="width: 100%; max-width: 640px;">
-                <source src="{{ video_src }}" type="video/mp4">
-                <div class="video-fallback">
-                    <p style="color: #ff6666;">❌ Não foi possível carregar o vídeo</p>
-                    <p>O vídeo está anexado ao EPUB como arquivo separado.</p>
-                    <p>Tente extrair o arquivo "{{ video_filename }}" do EPUB.</p>
-                </div>
-            </video>
-            <div class="video-info">
-                📎 Vídeo anexado como arquivo separado
-            </div>
-            {% endif %}
-        </div>
-        
-        <div class="compatibility-note">
-            <strong>💡 Dica de Compatibilidade:</strong><br>
-            • <strong>Calibre:</strong> Suporta vídeos HTML5 ✅<br>
-            • <strong>Adobe Digital Editions:</strong> Suporte limitado ⚠️<br>
-            • <strong>Apple Books:</strong> Suporta vídeos ✅<br>
-            • <strong>Google Play Books:</strong> Suporte limitado ⚠️<br>
-            <br>
-            Se o vídeo não reproduzir, o arquivo original está salvo em: <strong>{{ video_filename }}</strong>
-        </div>
-    </div>
-    {% endif %}
-
-    <div class="footer">
-        <p><strong>Gerado por Riggy - UDP SensaGram</strong></p>
-        <p>Relatório gerado em {{ data_hora }}</p>
-    </div>
-</body>
-</html>
-"""
-
-# === GERAÇÃO DE RELATÓRIO EPUB ===
-def gerar_relatorio_epub():
-    global video_filename, gravacao_inicio, gravacao_fim, ESTRUTURA_ATUAL, UNIDADE_VIB_ATUAL
-    
-    # Desabilita o botão e mostra loading
-    btn_report_epub.configure(state='disabled', text='Gerando EPUB...')
-    app.update()
-
-    finalizar_gravacao()
-
-    now = datetime.now().strftime("%Y%m%d_%H%M%S")
-    epub_filename = f"relatorio_epub_{now}.epub"
-
-    # Calcula estatísticas (mantém o código existente)
-    tilt_list = [v for v in tilts_all if not math.isnan(v)] if grafico_tilt_var.get() else []
-    vib_list = [v for v in vibracoes_all if not math.isnan(v)] if grafico_vib_var.get() else []
-    
-    tilt_media = sum(tilt_list) / len(tilt_list) if tilt_list else 0
-    vib_media = sum(vib_list) / len(vib_list) if vib_list else 0
-    tilt_max = max(tilt_list) if tilt_list else 0
-    tilt_min = min(tilt_list) if tilt_list else 0
-    vib_max = max(vib_list) if vib_list else 0
-    vib_min = min(vib_list) if vib_list else 0
-    tilt_std = statistics.stdev(tilt_list) if len(tilt_list) > 1 else 0
-    vib_std = statistics.stdev(vib_list) if len(vib_list) > 1 else 0
-
-    # Converte estatísticas de vibração para a unidade da norma se necessário
-    if UNIDADE_VIB_ATUAL == 'm/s²':
-        vib_media_norma = g_para_ms2(vib_media)
-        vib_max_norma = g_para_ms2(vib_max)
-        vib_min_norma = g_para_ms2(vib_min)
-        vib_std_norma = g_para_ms2(vib_std)
-        unidade_display = 'm/s²'
-    else:
-        vib_media_norma = vib_media
-        vib_max_norma = vib_max
-        vib_min_norma = vib_min
-        vib_std_norma = vib_std
-        unidade_display = 'g'
 
-    duracao_real = (gravacao_fim - gravacao_inicio).total_seconds() if gravacao_inicio and gravacao_fim else len(frames_buffer)/10
-
-    # Prepara dados para o template
-    norma_info = estruturas_normas.get(ESTRUTURA_ATUAL, estruturas_normas['Personalizada'])
-    
-    # Status de conformidade
-    tilt_status = "CONFORME" if tilt_max < TILT_THRESHOLD else "NÃO CONFORME"
-    vib_max_comparacao = vib_max if UNIDADE_VIB_ATUAL == 'g' else g_para_ms2(vib_max)
-    vib_status = "CONFORME" if vib_max_comparacao < VIB_THRESHOLD else "NÃO CONFORME"
-    
-    # Avaliações técnicas
-    if tilt_max < TILT_THRESHOLD * 0.5:
-        tilt_avaliacao = "EXCELENTE"
-    elif tilt_max < TILT_THRESHOLD * 0.8:
-        tilt_avaliacao = "BOM"
-    elif tilt_max < TILT_THRESHOLD:
-        tilt_avaliacao = "ACEITÁVEL"
-    else:
-        tilt_avaliacao = "CRÍTICO"
-    
-    if vib_max_comparacao < VIB_THRESHOLD * 0.5:
-        vib_avaliacao = "EXCELENTE"
-    elif vib_max_comparacao < VIB_THRESHOLD * 0.8:
-        vib_avaliacao = "BOM"
-    elif vib_max_comparacao < VIB_THRESHOLD:
-        vib_avaliacao = "ACEITÁVEL"
-    else:
-        vib_avaliacao = "CRÍTICO"
-
-    # Gera gráficos para o EPUB
-    graficos_info = []
-    graficos_paths = salvar_graficos_completos_para_epub(tilts_all, vibracoes_all, grafico_tilt_var.get(), grafico_vib_var.get())
-    
-    for i, path in enumerate(graficos_paths):
-        if 'tilt' in path:
-            graficos_info.append({
-                'src': f'images/grafico_tilt_{i}.png',
-                'alt': 'Gráfico de Inclinação por Tempo',
-                'titulo': 'Inclinação (°) por Tempo',
-                'path': path
-            })
-        else:
-            graficos_info.append({
-                'src': f'images/grafico_vib_{i}.png',
-                'alt': 'Gráfico de Vibração por Tempo',
-                'titulo': f'Vibração ({unidade_display}) por Tempo',
-                'path': path
-            })
-
-    # === LÓGICA PARA VÍDEO ===
-    video_base64 = None
-    video_size_mb = 0
-    if video_filename and os.path.isfile(video_filename):
-        try:
-            # Converte vídeo para H.264 (mais compatível)
-            video_h264_filename = f"video_h264_{now}.mp4"
-            converter_video_para_h264(video_filename, video_h264_filename)
-            
-            # Lê o vídeo convertido
-            with open(video_h264_filename, 'rb') as video_file:
-                video_data = video_file.read()
-                video_size_mb = len(video_data) / (1024 * 1024)  # Tamanho em MB
-                
-                # Se o vídeo for menor que 10MB, converte para base64
-                if video_size_mb < 10:
-                    video_base64 = base64.b64encode(video_data).decode('utf-8')
-                    print(f"✅ Vídeo convertido para base64: {video_size_mb:.2f} MB")
-                else:
-                    print(f"⚠️ Vídeo muito grande ({video_size_mb:.2f} MB), será anexado como arquivo")
-            
-            # Remove o arquivo temporário H.264
-            if os.path.exists(video_h264_filename):
-                os.remove(video_h264_filename)
-                
-        except Exception as e:
-            print(f"Erro ao processar vídeo: {e}")
-            # Fallback: usa o vídeo original
-            try:
-                with open(video_filename, 'rb') as video_file:
-                    video_data = video_file.read()
-                    video_size_mb = len(video_data) / (1024 * 1024)
-            except:
-                video_data = None
-
-    # Dados do template
-    template_data = {
-        'titulo': 'Relatório Riggy - UDP SensaGram',
-        'estrutura_atual': ESTRUTURA_ATUAL,
-        'norma_info': norma_info,
-        'limite_tilt': f"{TILT_THRESHOLD:.1f}",
-        'limite_vib': f"{VIB_THRESHOLD:.2f}",
-        'unidade_display': unidade_display,
-        'data_hora': datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-        'pontos_coletados': len(tempo),
-        'duracao_teste': f"{duracao_real:.1f}",
-        'alertas_tilt': sum(1 for a in alerts if a[0]=='tilt') if grafico_tilt_var.get() else 0,
-        'alertas_vib': sum(1 for a in alerts if a[0]=='vibração') if grafico_vib_var.get() else 0,
-        'mostrar_tilt': grafico_tilt_var.get(),
-        'mostrar_vib': grafico_vib_var.get(),
-        'tilt_media': f"{tilt_media:.2f}",
-        'tilt_max': f"{tilt_max:.2f}",
-        'tilt_min': f"{tilt_min:.2f}",
-        'tilt_std': f"{tilt_std:.2f}",
-        'tilt_status': tilt_status,
-        'tilt_avaliacao': tilt_avaliacao,
-        'vib_media': f"{vib_media_norma:.3f}",
-        'vib_max': f"{vib_max_norma:.3f}",
-        'vib_min': f"{vib_min_norma:.3f}",
-        'vib_std': f"{vib_std_norma:.3f}",
-        'vib_status': vib_status,
-        'vib_avaliacao': vib_avaliacao,
-        'graficos': graficos_info,
-        'video_data': video_filename and os.path.isfile(video_filename),
-        'video_filename': os.path.basename(video_filename) if video_filename else '',
-        'frames_capturados': len(frames_buffer),
-        'duracao_video': f"{duracao_real:.1f}",
-        'video_src': 'video/gravacao.mp4' if video_filename else '',
-        'video_base64': video_base64,
-        'video_size_mb': f"{video_size_mb:.2f}"
-    }
-
-    # Cria o EPUB
+# === RELATÓRIOS (montados em relatorio.py, também usado pelo modo headless) ===
+# Gerados numa thread de trabalhos: a janela segue respondendo, o botão mostra o andamento
+# e, clicado de novo, cancela o relatório na próxima etapa. "PDF + EPUB" gera os dois ao
+# mesmo tempo, do mesmo retrato da sessão (os números saem de relatorio.modelo_relatorio, uma vez)
+RELATORIOS = {'epub': ('Gerar EPUB', ('epub',)), 'pdf': ('Gerar PDF', ('pdf',)), 'ambos': ('PDF + EPUB', ('pdf', 'epub'))}
+trabalhos_relatorio = FilaTrabalhos(trabalhadores=2)
+relatorios_em_andamento = {}  # botão -> [Trabalho, ...]
+acompanhando_relatorios = False
+
+def contexto_relatorio_atual():
+    """Retrato da sessão exibida e das opções da janela para os relatórios"""
+    duracao = (gravacao_fim - gravacao_inicio).total_seconds() if gravacao_inicio and gravacao_fim else frames_gravados / TARGET_FPS
+    return contexto_relatorio(
+        sessao_atual, alerts, ESTRUTURA_ATUAL, TILT_THRESHOLD, VIB_THRESHOLD, UNIDADE_VIB_ATUAL,
+        grafico_tilt_var.get(), grafico_vib_var.get(),
+        dispositivo=dispositivo_atual.id if dispositivo_atual else None, saude=resumo_saude_atual(),
+        duracao=duracao, video=video_filename, frames=frames_gravados)
+
+def aguardar_video_offline(renderizacao, video, progresso):
+    """Roda no trabalho do relatório: espera o vídeo renderizado ao encerrar e devolve video/frames"""
+    global frames_gravados
+    while not renderizacao.done():
+        progresso(0.0, 'Aguardando vídeo')
+        wait([renderizacao], timeout=0.2)
     try:
-        book = epub.EpubBook()
-        
-        # Metadados
-        book.set_identifier('riggy-report-' + now)
-        book.set_title('Relatório Riggy - UDP SensaGram')
-        book.set_language('pt-BR')
-        book.add_author('Riggy - UDP SensaGram')
-        book.add_metadata('DC', 'description', 'Relatório de monitoramento de sensores estruturais')
-
-        # Renderiza o template HTML
-        template = Template(EPUB_TEMPLATE)
-        html_content = template.render(**template_data)
-        
-        # Cria o capítulo principal
-        chapter = epub.EpubHtml(title='Relatório de Monitoramento', 
-                              file_name='relatorio.xhtml', 
-                              lang='pt-BR')
-        chapter.content = html_content
-        book.add_item(chapter)
-
-        # Adiciona imagens dos gráficos
-        for grafico in graficos_info:
-            if os.path.exists(grafico['path']):
-                with open(grafico['path'], 'rb') as img_file:
-                    img_data = img_file.read()
-                
-                img_item = epub.EpubItem(
-                    uid=f"img_{grafico['src'].split('/')[-1]}",
-                    file_name=grafico['src'],
-                    media_type="image/png",
-                    content=img_data
-                )
-                book.add_item(img_item)
-
-        # Adiciona o vídeo se não foi convertido para base64
-        if video_filename and os.path.isfile(video_filename) and not video_base64:
-            try:
-                with open(video_filename, 'rb') as video_file:
-                    video_data = video_file.read()
-                
-                video_item = epub.EpubItem(
-                    uid="video_gravacao",
-                    file_name="video/gravacao.mp4",
-                    media_type="video/mp4",
-                    content=video_data
-                )
-                book.add_item(video_item)
-                print(f"✅ Vídeo anexado ao EPUB: {len(video_data)} bytes")
-            except Exception as e:
-                print(f"Erro ao anexar vídeo ao EPUB: {e}")
-
-        # Define a ordem de leitura
-        book.toc = [chapter]
-        book.add_item(epub.EpubNcx())
-        book.add_item(epub.EpubNav())
-
-        # Define a spine (ordem dos capítulos)
-        book.spine = ['nav', chapter]
-
-        # Salva o EPUB
-        epub.write_epub(epub_filename, book, {})
-        
-        # Remove arquivos temporários dos gráficos
-        for path in graficos_paths:
-            try:
-                os.remove(path)
-            except Exception as e:
-                print(f"Erro ao remover arquivo temporário {path}: {e}")
-
-        print(f"✅ Relatório EPUB gerado: {epub_filename}")
-        if video_base64:
-            print(f"✅ Vídeo embutido como base64 no HTML")
-        elif video_filename and os.path.isfile(video_filename):
-            print(f"✅ Vídeo anexado como arquivo separado")
-        
-        # Tenta abrir o arquivo
-        try:
-            os.startfile(epub_filename)
-        except:
-            print(f"Arquivo salvo em: {os.path.abspath(epub_filename)}")
-
+        frames_gravados = renderizacao.result()
     except Exception as e:
-        print(f"Erro ao gerar EPUB: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    # Para a animação e restaura o botão
-    global loading_timer_epub
-    if loading_timer_epub:
-        app.after_cancel(loading_timer_epub)
-    btn_report_epub.configure(state='normal', text='Gerar EPUB')
-    app.update()
-
-def converter_video_para_h264(input_file, output_file):
-    """Converte vídeo para H.264 usando OpenCV para melhor compatibilidade"""
-    try:
-        cap = cv2.VideoCapture(input_file)
-        
-        # Propriedades do vídeo original
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        
-        # Codec H.264 (mais compatível)
-        fourcc = cv2.VideoWriter_fourcc(*'avc1')  # H.264
-        out = cv2.VideoWriter(output_file, fourcc, fps, (width, height))
-        
-        frame_count = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            out.write(frame)
-            frame_count += 1
-        
-        cap.release()
-        out.release()
-        
-        print(f"✅ Vídeo convertido para H.264: {frame_count} frames")
-        return True
-        
-    except Exception as e:
-        print(f"Erro na conversão H.264: {e}")
-        return False
-
-# === GERAÇÃO DE RELATÓRIO PDF (FUNCIONALIDADE ORIGINAL) ===
-def gerar_relatorio_pdf():
-    global video_filename, gravacao_inicio, gravacao_fim, ESTRUTURA_ATUAL, UNIDADE_VIB_ATUAL
-    
-    # Desabilita o botão e mostra loading
-    btn_report_pdf.configure(state='disabled', text='Gerando PDF...')
-    app.update()
+        print(f"Erro ao renderizar vídeo: {e}")
+        return {'video': None, 'frames': 0}
+    print(f"✅ Vídeo renderizado: {video} ({frames_gravados} frames)")
+    return {'video': video if os.path.isfile(video) else None, 'frames': frames_gravados}
+
+def botao_relatorio(botao):
+    return {'epub': btn_report_epub, 'pdf': btn_report_pdf, 'ambos': btn_report_ambos}[botao]
+
+def acionar_relatorio(botao):
+    """Botão de relatório: gera em segundo plano; clicado durante a geração, cancela"""
+    trabalhos = relatorios_em_andamento.get(botao)
+    if trabalhos:
+        for trabalho in trabalhos:
+            trabalho.cancelar()
+        botao_relatorio(botao).configure(state='disabled', text='Cancelando...')
+        return
 
     finalizar_gravacao()
-
-    now = datetime.now().strftime("%Y%m%d_%H%M%S")
-    pdf_filename = f"relatorio_pdf_{now}.pdf"
-
-    # Estatísticas
-    tilt_list = [v for v in tilts_all if not math.isnan(v)] if grafico_tilt_var.get() else []
-    vib_list = [v for v in vibracoes_all if not math.isnan(v)] if grafico_vib_var.get() else []
-    tilt_media = sum(tilt_list) / len(tilt_list) if tilt_list else 0
-    vib_media = sum(vib_list) / len(vib_list) if vib_list else 0
-    tilt_max = max(tilt_list) if tilt_list else 0
-    tilt_min = min(tilt_list) if tilt_list else 0
-    vib_max = max(vib_list) if vib_list else 0
-    vib_min = min(vib_list) if vib_list else 0
-    tilt_std = statistics.stdev(tilt_list) if len(tilt_list) > 1 else 0
-    vib_std = statistics.stdev(vib_list) if len(vib_list) > 1 else 0
-
-    # Converte estatísticas de vibração para a unidade da norma se necessário
-    if UNIDADE_VIB_ATUAL == 'm/s²':
-        vib_media_norma = g_para_ms2(vib_media)
-        vib_max_norma = g_para_ms2(vib_max)
-        vib_min_norma = g_para_ms2(vib_min)
-        vib_std_norma = g_para_ms2(vib_std)
-        unidade_display = 'm/s²'
-    else:
-        vib_media_norma = vib_media
-        vib_max_norma = vib_max
-        vib_min_norma = vib_min
-        vib_std_norma = vib_std
-        unidade_display = 'g'
-
-    duracao_real = (gravacao_fim - gravacao_inicio).total_seconds() if gravacao_inicio and gravacao_fim else len(frames_buffer)/10
-
-    doc = fitz.open()
-    page = doc.new_page(width=595, height=842)  # A4
-
-    cor_laranja = (1, 0.5, 0)
-    cor_preta = (0, 0, 0)
-    cor_cinza = (0.3, 0.3, 0.3)
-    cor_cinza_claro = (0.9, 0.9, 0.9)
-    cor_azul = (0, 0.4, 0.8)
-
-    y_pos = 800
-    desenhou_estatisticas = False
-
-    # Cabeçalho
-    logo_path = os.path.join(os.path.dirname(__file__), 'riggy-logo.jpeg')
-    if os.path.isfile(logo_path):
+    # O retrato (sessão, limites, opções da janela) é tirado aqui, na thread do Tk
+    contexto = contexto_relatorio_atual()
+    agora = datetime.now()
+    relatorios_em_andamento[botao] = [enviar_relatorio(formato, contexto, agora) for formato in RELATORIOS[botao][1]]
+    botao_relatorio(botao).configure(text='Cancelar 0%')
+    if not acompanhando_relatorios:
+        acompanhar_relatorios()
+
+def enviar_relatorio(formato, contexto, agora):
+    arquivo = f"relatorio_{formato}_{agora:%Y%m%d_%H%M%S}.{formato}"
+    gerar = relatorio.gerar_relatorio_epub if formato == 'epub' else relatorio.gerar_relatorio_pdf
+    renderizacao, video = renderizacao_video, video_filename
+
+    def executar(progresso):
+        dados = dict(contexto)
+        if renderizacao is not None:
+            dados.update(aguardar_video_offline(renderizacao, video, progresso))
         try:
-            logo_rect = fitz.Rect(50, y_pos-60, 110, y_pos)
-            page.insert_image(logo_rect, filename=logo_path)
-        except:
-            pass
-
-    page.insert_text((130, y_pos-20), "RELATÓRIO RIGGY", fontsize=20, color=cor_laranja)
-    page.insert_text((130, y_pos-40), "UDP SensaGram - Monitoramento de Sensores", fontsize=12, color=cor_cinza)
-    page.draw_line(fitz.Point(50, y_pos-70), fitz.Point(545, y_pos-70), color=cor_laranja, width=2)
-    y_pos -= 90
-
-    # === SEÇÃO: INFORMAÇÕES DA NORMA ===
-    norma_info = estruturas_normas.get(ESTRUTURA_ATUAL, estruturas_normas['Personalizada'])
-    norma_rect = fitz.Rect(50, y_pos-100, 545, y_pos)
-    page.draw_rect(norma_rect, color=(0.95, 0.95, 1.0), fill=(0.95, 0.95, 1.0))
-    page.draw_rect(norma_rect, color=cor_azul, width=2)
-    page.insert_text((60, y_pos-15), "📋 NORMA TÉCNICA APLICADA", fontsize=12, color=cor_azul)
-    page.insert_text((60, y_pos-35), f"Estrutura Avaliada: {ESTRUTURA_ATUAL}", fontsize=11, color=cor_preta)
-    page.insert_text((60, y_pos-50), f"Norma Aplicada: {norma_info['norma']}", fontsize=11, color=cor_preta)
-    page.insert_text((60, y_pos-65), f"Descrição: {norma_info['descricao']}", fontsize=9, color=cor_cinza)
-    
-    # Limites da norma
-    limite_tilt_display = TILT_THRESHOLD
-    limite_vib_display = VIB_THRESHOLD if UNIDADE_VIB_ATUAL == 'g' else VIB_THRESHOLD
-    page.insert_text((60, y_pos-80), f"Limites: Inclinação ≤ {limite_tilt_display:.1f}° | Vibração ≤ {limite_vib_display:.2f} {unidade_display}", fontsize=10, color=cor_preta)
-    y_pos -= 120
-
-    # Informações gerais
-    info_rect = fitz.Rect(50, y_pos-80, 545, y_pos)
-    page.draw_rect(info_rect, color=cor_cinza_claro, fill=cor_cinza_claro)
-    page.draw_rect(info_rect, color=cor_cinza, width=1)
-    page.insert_text((60, y_pos-15), "INFORMAÇÕES GERAIS", fontsize=12, color=cor_laranja)
-    page.insert_text((60, y_pos-35), f"Data e Hora: {datetime.now():%d/%m/%Y %H:%M:%S}", fontsize=11, color=cor_preta)
-    page.insert_text((60, y_pos-50), f"Pontos Coletados: {len(tempo)}", fontsize=11, color=cor_preta)
-    page.insert_text((300, y_pos-35), f"Alertas de Inclinação: {sum(1 for a in alerts if a[0]=='tilt') if grafico_tilt_var.get() else 0}", fontsize=11, color=cor_preta)
-    page.insert_text((300, y_pos-50), f"Alertas de Vibração: {sum(1 for a in alerts if a[0]=='vibração') if grafico_vib_var.get() else 0}", fontsize=11, color=cor_preta)
-    page.insert_text((60, y_pos-65), f"Duração do Teste: {duracao_real:.1f} segundos", fontsize=11, color=cor_preta)
-    y_pos -= 100
-
-    # Estatísticas de inclinação
-    if grafico_tilt_var.get():
-        desenhou_estatisticas = True
-        tilt_rect = fitz.Rect(50, y_pos-140, 545, y_pos)
-        page.draw_rect(tilt_rect, color=cor_cinza_claro, fill=cor_cinza_claro)
-        page.draw_rect(tilt_rect, color=cor_cinza, width=1)
-        page.insert_text((60, y_pos-15), "📐 ESTATÍSTICAS DE INCLINAÇÃO (°)", fontsize=12, color=cor_laranja)
-        page.insert_text((60, y_pos-35), f"Média: {tilt_media:.2f}°", fontsize=11, color=cor_preta)
-        page.insert_text((60, y_pos-50), f"Máximo: {tilt_max:.2f}°", fontsize=11, color=cor_preta)
-        page.insert_text((60, y_pos-65), f"Mínimo: {tilt_min:.2f}°", fontsize=11, color=cor_preta)
-        page.insert_text((300, y_pos-35), f"Desvio Padrão: {tilt_std:.2f}°", fontsize=11, color=cor_preta)
-        page.insert_text((300, y_pos-50), f"Limite da Norma: {TILT_THRESHOLD:.1f}°", fontsize=11, color=cor_preta)
-        
-        # Status de conformidade
-        status_tilt = "CONFORME" if tilt_max < TILT_THRESHOLD else "NÃO CONFORME"
-        cor_status = (0, 0.7, 0) if tilt_max < TILT_THRESHOLD else (0.8, 0, 0)
-        page.insert_text((300, y_pos-65), f"Status: {status_tilt}", fontsize=11, color=cor_status)
-        
-        # Avaliação técnica
-        if tilt_max < TILT_THRESHOLD * 0.5:
-            avaliacao = "EXCELENTE"
-        elif tilt_max < TILT_THRESHOLD * 0.8:
-            avaliacao = "BOM"
-        elif tilt_max < TILT_THRESHOLD:
-            avaliacao = "ACEITÁVEL"
-        else:
-            avaliacao = "CRÍTICO"
-        page.insert_text((300, y_pos-80), f"Avaliação: {avaliacao}", fontsize=10, color=cor_cinza)
-        y_pos -= 160
-
-    # Estatísticas de vibração
-    if grafico_vib_var.get():
-        desenhou_estatisticas = True
-        vib_rect = fitz.Rect(50, y_pos-140, 545, y_pos)
-        page.draw_rect(vib_rect, color=cor_cinza_claro, fill=cor_cinza_claro)
-        page.draw_rect(vib_rect, color=cor_cinza, width=1)
-        page.insert_text((60, y_pos-15), f"📳 ESTATÍSTICAS DE VIBRAÇÃO ({unidade_display})", fontsize=12, color=cor_laranja)
-        page.insert_text((60, y_pos-35), f"Média: {vib_media_norma:.3f}{unidade_display}", fontsize=11, color=cor_preta)
-        page.insert_text((60, y_pos-50), f"Máximo: {vib_max_norma:.3f}{unidade_display}", fontsize=11, color=cor_preta)
-        page.insert_text((60, y_pos-65), f"Mínimo: {vib_min_norma:.3f}{unidade_display}", fontsize=11, color=cor_preta)
-        page.insert_text((300, y_pos-35), f"Desvio Padrão: {vib_std_norma:.3f}{unidade_display}", fontsize=11, color=cor_preta)
-        
-        limite_vib_display_norma = VIB_THRESHOLD if UNIDADE_VIB_ATUAL == 'g' else VIB_THRESHOLD
-        page.insert_text((300, y_pos-50), f"Limite da Norma: {limite_vib_display_norma:.2f}{unidade_display}", fontsize=11, color=cor_preta)
-        
-        # Status de conformidade (comparação na unidade correta)
-        vib_max_comparacao = vib_max if UNIDADE_VIB_ATUAL == 'g' else g_para_ms2(vib_max)
-        limite_comparacao = VIB_THRESHOLD
-        status_vib = "CONFORME" if vib_max_comparacao < limite_comparacao else "NÃO CONFORME"
-        cor_status = (0, 0.7, 0) if vib_max_comparacao < limite_comparacao else (0.8, 0, 0)
-        page.insert_text((300, y_pos-65), f"Status: {status_vib}", fontsize=11, color=cor_status)
-        
-        # Avaliação técnica
-        if vib_max_comparacao < limite_comparacao * 0.5:
-            avaliacao = "EXCELENTE"
-        elif vib_max_comparacao < limite_comparacao * 0.8:
-            avaliacao = "BOM"
-        elif vib_max_comparacao < limite_comparacao:
-            avaliacao = "ACEITÁVEL"
-        else:
-            avaliacao = "CRÍTICO"
-        page.insert_text((300, y_pos-80), f"Avaliação: {avaliacao}", fontsize=10, color=cor_cinza)
-        
-        # Nota sobre conversão de unidades
-        if UNIDADE_VIB_ATUAL == 'm/s²':
-            page.insert_text((60, y_pos-95), "* Valores convertidos de g para m/s² conforme NBR ISO 2631-1", fontsize=8, color=cor_cinza)
-        y_pos -= 160
-
-    # Se nenhuma estatística foi desenhada, corrige o y_pos
-    if not desenhou_estatisticas:
-        y_pos -= 40
-
-    # Seção de vídeo
-    if video_filename and os.path.isfile(video_filename):
-        video_rect = fitz.Rect(50, y_pos-100, 545, y_pos)
-        page.draw_rect(video_rect, color=(0.1, 0.1, 0.1), fill=(0.1, 0.1, 0.1))
-        page.draw_rect(video_rect, color=cor_laranja, width=2)
-        page.insert_text((60, y_pos-15), "🎥 GRAVAÇÃO DOS GRÁFICOS", fontsize=12, color=cor_laranja)
-        page.insert_text((60, y_pos-35), f"Arquivo: {video_filename}", fontsize=11, color=(1, 1, 1))
-        page.insert_text((60, y_pos-50), f"Frames Capturados: {len(frames_buffer)}", fontsize=11, color=(1, 1, 1))
-        page.insert_text((60, y_pos-65), f"Duração Aproximada: {duracao_real:.1f} segundos", fontsize=11, color=(1, 1, 1))
-        try:
-            with open(video_filename, 'rb') as video_file:
-                video_bytes = video_file.read()
-            doc.embfile_add(video_filename, video_bytes, filename=os.path.basename(video_filename))
-            page.insert_text((400, y_pos-35), "📎 VÍDEO ANEXADO", fontsize=12, color=cor_laranja)
-            page.insert_text((400, y_pos-50), "Clique no ícone de anexo", fontsize=10, color=(0.8, 0.8, 0.8))
-            page.insert_text((400, y_pos-65), "no seu leitor de PDF", fontsize=10, color=(0.8, 0.8, 0.8))
-        except Exception as e:
-            print(f"Erro ao anexar vídeo: {e}")
-            page.insert_text((400, y_pos-35), "❌ ERRO NO ANEXO", fontsize=12, color=(0.8, 0, 0))
-            page.insert_text((400, y_pos-50), "Vídeo salvo separadamente", fontsize=10, color=(0.8, 0.8, 0.8))
-        y_pos -= 30
-
-    # Rodapé
-    page.draw_line(fitz.Point(50, 80), fitz.Point(545, 80), color=cor_laranja, width=1)
-    page.insert_text((50, 60), "Gerado por Riggy - UDP SensaGram", fontsize=10, color=cor_cinza)
-    page.insert_text((50, 45), f"Relatório gerado em {datetime.now():%d/%m/%Y às %H:%M:%S}", fontsize=9, color=cor_cinza)
-    page.insert_text((400, 60), f"Página 1 de 1", fontsize=10, color=cor_cinza)
-
-    # Inserir gráficos completos (por tempo) em nova página
-    graficos_paths = salvar_graficos_completos_para_pdf(tilts_all, vibracoes_all, grafico_tilt_var.get(), grafico_vib_var.get())
-    if graficos_paths:
-        page_graficos = doc.new_page(width=595, height=842)
-        y_graf = 800
-        page_graficos.insert_text((60, y_graf-20), "GRÁFICOS COMPLETOS POR TEMPO", fontsize=16, color=cor_laranja)
-        y_graf -= 40
-        for path in graficos_paths:
-            try:
-                img = fitz.Pixmap(path)
-                img_width = 400
-                img_height = int(img.height * (img_width / img.width))
-                img_rect = fitz.Rect((595-img_width)//2, y_graf-img_height, (595+img_width)//2, y_graf)
-                page_graficos.insert_image(img_rect, filename=path)
-                y_graf -= (img_height + 20)
-            except Exception as e:
-                print(f"Erro ao inserir gráfico no PDF: {e}")
-
-    doc.save(pdf_filename)
-    doc.close()
-
-    # Remove arquivos temporários dos gráficos
-    for path in graficos_paths:
+            return gerar(arquivo, dados, progresso)
+        except TrabalhoCancelado:
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+            raise
+
+    return trabalhos_relatorio.enviar(formato, executar)
+
+def acompanhar_relatorios():
+    """Laço da janela enquanto há relatórios: mostra o andamento e recebe os terminados"""
+    global acompanhando_relatorios
+    # Um trabalho só sai de relatorios_em_andamento quando é recebido da fila de terminados:
+    # o estado muda antes de ele entrar na fila, e o aviso dele não pode se perder
+    for trabalho in trabalhos_relatorio.terminados():
+        informar_relatorio(trabalho)
+        for botao, trabalhos in list(relatorios_em_andamento.items()):
+            if trabalho in trabalhos:
+                trabalhos.remove(trabalho)
+                if not trabalhos:
+                    del relatorios_em_andamento[botao]
+                    botao_relatorio(botao).configure(state='normal' if encerrado else 'disabled',
+                                                     text=RELATORIOS[botao][0])
+    for botao, trabalhos in relatorios_em_andamento.items():
+        if not trabalhos[0].cancelado:
+            total = len(RELATORIOS[botao][1])
+            fracao = (total - len(trabalhos) + sum(trabalho.fracao for trabalho in trabalhos)) / total
+            botao_relatorio(botao).configure(text=f'Cancelar {fracao:.0%}')
+    acompanhando_relatorios = bool(relatorios_em_andamento)
+    if acompanhando_relatorios:
+        app.after(200, acompanhar_relatorios)
+
+def informar_relatorio(trabalho):
+    formato = trabalho.nome
+    if trabalho.estado == 'concluido':
+        # Tenta abrir o arquivo
         try:
-            os.remove(path)
-        except Exception as e:
-            print(f"Erro ao remover arquivo temporário {path}: {e}")
-
-    try:
-        os.startfile(pdf_filename)
-    except:
-        pass
-
-    print(f"Relatório PDF gerado: {pdf_filename}")
-    if video_filename and os.path.isfile(video_filename):
-        print(f"Vídeo anexado ao PDF: {video_filename}")
-    
-    # Para a animação e restaura o botão
-    global loading_timer_pdf
-    if loading_timer_pdf:
-        app.after_cancel(loading_timer_pdf)
-    btn_report_pdf.configure(state='normal', text='Gerar PDF')
-    app.update()
-
-def salvar_graficos_completos_para_epub(tilts_all, vibracoes_all, show_tilt, show_vib):
-    """Salva gráficos como imagens PNG para o EPUB"""
-    global UNIDADE_VIB_ATUAL
-    paths = []
-    
-    if show_tilt and tilts_all:
-        fig_tilt, ax_tilt = plt.subplots(figsize=(8, 4))
-        ax_tilt.plot(list(range(len(tilts_all))), tilts_all, color='#FF8800', linewidth=2)
-        ax_tilt.set_ylim(0, 100)
-        ax_tilt.set_title('Inclinação (°) por tempo', fontsize=14, fontweight='bold')
-        ax_tilt.set_ylabel('Grau')
-        ax_tilt.set_xlabel('Tempo (amostras)')
-        ax_tilt.grid(True, alpha=0.3)
-        fig_tilt.tight_layout()
-        tilt_path = f"tilt_grafico_epub_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        fig_tilt.savefig(tilt_path, dpi=150, bbox_inches='tight')
-        plt.close(fig_tilt)
-        paths.append(tilt_path)
-    
-    if show_vib and vibracoes_all:
-        fig_vib, ax_vib = plt.subplots(figsize=(8, 4))
-        
-        # Converte dados para a unidade correta se necessário
-        vib_data = vibracoes_all
-        unidade_display = 'g'
-        if UNIDADE_VIB_ATUAL == 'm/s²':
-            vib_data = [g_para_ms2(v) for v in vibracoes_all]
-            unidade_display = 'm/s²'
-            
-        ax_vib.plot(list(range(len(vib_data))), vib_data, color='#FFB266', linewidth=2)
-        
-        # Ajusta escala baseada na unidade
-        if UNIDADE_VIB_ATUAL == 'm/s²':
-            ax_vib.set_ylim(0, 50)
-        else:
-            ax_vib.set_ylim(0, 5)
-            
-        ax_vib.set_title(f'Vibração ({unidade_display}) por tempo', fontsize=14, fontweight='bold')
-        ax_vib.set_ylabel(unidade_display)
-        ax_vib.set_xlabel('Tempo (amostras)')
-        ax_vib.grid(True, alpha=0.3)
-        fig_vib.tight_layout()
-        vib_path = f"vib_grafico_epub_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        fig_vib.savefig(vib_path, dpi=150, bbox_inches='tight')
-        plt.close(fig_vib)
-        paths.append(vib_path)
-    
-    return paths
+            os.startfile(trabalho.resultado)
+        except Exception:
+            print(f"Arquivo salvo em: {os.path.abspath(trabalho.resultado)}")
+    elif trabalho.estado == 'cancelado':
+        print(f"Relatório {formato.upper()} cancelado")
+    else:
+        print(f"Erro ao gerar {formato.upper()}: {trabalho.erro}")
 
-def salvar_graficos_completos_para_pdf(tilts_all, vibracoes_all, show_tilt, show_vib):
-    """Salva gráficos como imagens PNG para o PDF"""
-    global UNIDADE_VIB_ATUAL
-    paths = []
-    
-    if show_tilt and tilts_all:
-        fig_tilt, ax_tilt = plt.subplots(figsize=(6, 3))
-        ax_tilt.plot(list(range(len(tilts_all))), tilts_all, color='#FF8800', linewidth=2)
-        ax_tilt.set_ylim(0, 100)
-        ax_tilt.set_title('Inclinação (°) por tempo', fontsize=12, fontweight='bold')
-        ax_tilt.set_ylabel('Grau')
-        ax_tilt.set_xlabel('Tempo (amostras)')
-        fig_tilt.tight_layout()
-        tilt_path = f"tilt_grafico_pdf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        fig_tilt.savefig(tilt_path)
-        plt.close(fig_tilt)
-        paths.append(tilt_path)
-    
-    if show_vib and vibracoes_all:
-        fig_vib, ax_vib = plt.subplots(figsize=(6, 3))
-        
-        # Converte dados para a unidade correta se necessário
-        vib_data = vibracoes_all
-        unidade_display = 'g'
-        if UNIDADE_VIB_ATUAL == 'm/s²':
-            vib_data = [g_para_ms2(v) for v in vibracoes_all]
-            unidade_display = 'm/s²'
-            
-        ax_vib.plot(list(range(len(vib_data))), vib_data, color='#FFB266', linewidth=2)
-        
-        # Ajusta escala baseada na unidade
-        if UNIDADE_VIB_ATUAL == 'm/s²':
-            ax_vib.set_ylim(0, 50)
-        else:
-            ax_vib.set_ylim(0, 5)
-            
-        ax_vib.set_title(f'Vibração ({unidade_display}) por tempo', fontsize=12, fontweight='bold')
-        ax_vib.set_ylabel(unidade_display)
-        ax_vib.set_xlabel('Tempo (amostras)')
-        fig_vib.tight_layout()
-        vib_path = f"vib_grafico_pdf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        fig_vib.savefig(vib_path)
-        plt.close(fig_vib)
-        paths.append(vib_path)
-    
-    return paths
-
-def animar_loading_epub():
-    """Anima o texto de loading com pontos para EPUB"""
-    global loading_dots, loading_timer_epub
-    loading_dots = (loading_dots + 1) % 4
-    dots = "." * loading_dots
-    btn_report_epub.configure(text=f'Gerando EPUB{dots}')
-    
-    if btn_report_epub.cget('state') == 'disabled':
-        loading_timer_epub = app.after(500, animar_loading_epub)
-
-def animar_loading_pdf():
-    """Anima o texto de loading com pontos para PDF"""
-    global loading_dots, loading_timer_pdf
-    loading_dots = (loading_dots + 1) % 4
-    dots = "." * loading_dots
-    btn_report_pdf.configure(text=f'Gerando PDF{dots}')
-    
-    if btn_report_pdf.cget('state') == 'disabled':
-        loading_timer_pdf = app.after(500, animar_loading_pdf)
+# === THREAD UDP ===
+def ao_alertar(disp, tipo, instante, valor):
+    diario = diario_sessao
+    if diario is not None and disp is not None:
+        diario.registrar('alerta', id=disp.id, alerta=tipo, instante=instante.timestamp(), valor=valor)
+    tocar_alerta('alerta_inclinacao.mp3' if tipo == ALERTA_TILT else 'alerta_vibracao.mp3')
+
+pipeline = PipelineIngestao(dispositivos, alpha=LP_ALPHA, ao_alertar=ao_alertar)
+
+def configuracao_alertas():
+    """Limites e regras de alerta atuais (lidos no thread do Tk)"""
+    return {
+        'tilt': TILT_THRESHOLD,
+        'vib': VIB_THRESHOLD,
+        'histerese_tilt': HISTERESE_TILT,
+        'histerese_vib': HISTERESE_VIB,
+        'monitorar_tilt': grafico_tilt_var.get(),
+        'monitorar_vib': grafico_vib_var.get(),
+        'unidade_vib': UNIDADE_VIB_ATUAL,
+    }
 
-def gerar_relatorio_epub_com_loading():
-    """Wrapper para gerar relatório EPUB com tratamento de erro"""
-    global loading_timer_epub
-    
-    # Inicia animação de loading
-    loading_dots = 0
-    animar_loading_epub()
-    
-    try:
-        gerar_relatorio_epub()
-    except Exception as e:
-        print(f"Erro ao gerar relatório EPUB: {e}")
-        if loading_timer_epub:
-            app.after_cancel(loading_timer_epub)
-        btn_report_epub.configure(state='normal', text='Gerar EPUB')
-        app.update()
-
-def gerar_relatorio_pdf_com_loading():
-    """Wrapper para gerar relatório PDF com tratamento de erro"""
-    global loading_timer_pdf
-    
-    # Inicia animação de loading
-    loading_dots = 0
-    animar_loading_pdf()
-    
-    try:
-        gerar_relatorio_pdf()
-    except Exception as e:
-        print(f"Erro ao gerar relatório PDF: {e}")
-        if loading_timer_pdf:
-            app.after_cancel(loading_timer_pdf)
-        btn_report_pdf.configure(state='normal', text='Gerar PDF')
-        app.update()
+def aplicar_configuracao_alertas():
+    """Repassa limites e regras à ingestão (mensagem de controle no modo processo)"""
+    configuracao = configuracao_alertas()
+    pipeline.configurar(**configuracao)
+    if processo_ingestao:
+        processo_ingestao.configurar(**configuracao)
+    if diario_sessao is not None:
+        diario_sessao.registrar('configuracao', estrutura=ESTRUTURA_ATUAL, configuracao=configuracao)
+
+def caminho_gravacao_pacotes():
+    """Arquivo da gravação de pacotes desta recepção (None se --gravar-pacotes não foi usado)"""
+    if not ARGS.gravar_pacotes:
+        return None
+    return f"pacotes_{datetime.now():%Y%m%d_%H%M%S}.rpk"
+
+def iniciar_gravacao_pacotes():
+    caminho = caminho_gravacao_pacotes()
+    if caminho:
+        pipeline.gravador = GravadorPacotes(caminho)
+        print(f"Gravando pacotes em {caminho}")
+
+def iniciar_persistencia_sessao(retomar=None):
+    """Dispositivos novos gravam o histórico em <--sessoes>/<data>/<dispositivo>, com fsync periódico,
+    e o diário registra configuração, dispositivos e alertas.
+
+    retomar: diretório de uma recepção interrompida; os dispositivos dela voltam com
+    histórico, alertas, janelas e filtro. Devolve o estado restaurado de cada um.
+    """
+    global diario_sessao, gravacao_inicio
+    diretorio = retomar or os.path.join(ARGS.sessoes, f"{datetime.now():%Y%m%d_%H%M%S}")
+    resumo = resumir_diario(ler_diario(diretorio)) if retomar else None
+    conhecidos = set(resumo['dispositivos']) if resumo else set()
+    diario = DiarioSessao(diretorio)
+
+    def criar_sessao(identificador):
+        if identificador not in conhecidos:
+            diario.registrar('dispositivo', id=identificador)
+        return SessaoEmDisco(os.path.join(diretorio, nome_diretorio(identificador)))
+
+    dispositivos.fabrica_sessao = criar_sessao
+    estados = {}
+    if resumo:
+        inicio = time.perf_counter()
+        diario.registrar('retomada', instante=time.time())
+        if resumo['inicio']:
+            # O vídeo recomeça, mas a duração da recepção conta desde o início original
+            gravacao_inicio = datetime.fromtimestamp(resumo['inicio']['gravacao_inicio'])
+        for identificador in resumo['dispositivos']:
+            disp = dispositivos.registrar(identificador)
+            if disp is None:
+                continue
+            estados[identificador] = reconstruir_estado(
+                disp.sessao, resumo['alertas'].get(identificador, []), resumo['configuracao'],
+                JANELA_ALERTA_TILT, JANELA_ALERTA_VIB, LP_ALPHA)
+            aplicar_estado(disp, estados[identificador])
+        print(f"✅ Sessão retomada de {diretorio} em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    else:
+        diario.registrar('inicio', estrutura=ESTRUTURA_ATUAL, configuracao=configuracao_alertas(),
+                         gravacao_inicio=gravacao_inicio.timestamp())
+        print(f"Persistindo a sessão em {diretorio}")
+    diario_sessao = diario
+    return estados
+
+def finalizar_persistencia_sessao():
+    """Fecha o histórico em disco (sincronizado) e marca a recepção como encerrada normalmente no diário"""
+    global diario_sessao
+    dispositivos.fechar_sessoes()
+    if diario_sessao is not None:
+        diario_sessao.fechar()
+        diario_sessao = None
+
+def finalizar_gravacao_pacotes():
+    gravador = pipeline.gravador
+    if gravador is not None:
+        pipeline.gravador = None
+        gravador.fechar()
+        print(f"✅ {gravador.pacotes} pacotes gravados em {gravador.caminho}")
 
-# === THREAD UDP ===
 def processar_dados_thread():
     """Thread separada para processamento de dados UDP"""
-    global t, running, gravity, tilt_alerted, vib_alerted
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("0.0.0.0", PORTA_UDP))
-    sock.settimeout(TIMEOUT)
-    
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, BUFFER_SIZE)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-    # Calibração da gravidade
-    for _ in range(WINDOW_SIZE):
-        if not running: return
-        try:
-            data, _ = sock.recvfrom(BUFFER_SIZE)
-            obj = json.loads(data.decode())
-            if 'accelerometer' in obj.get('type',''):
-                ax, ay, az = obj.get('values')[:3]
-                gravity[0] = LP_ALPHA*gravity[0] + (1-LP_ALPHA)*ax
-                gravity[1] = LP_ALPHA*gravity[1] + (1-LP_ALPHA)*ay
-                gravity[2] = LP_ALPHA*gravity[2] + (1-LP_ALPHA)*az
-        except:
-            pass
-
-    while running:
-        try:
-            data, _ = sock.recvfrom(BUFFER_SIZE)
-            obj = json.loads(data.decode())
-        except:
-            continue
+    global running, receptor_udp
+    if ARGS.reproduzir:
+        receptor = ReprodutorPacotes(ARGS.reproduzir, ARGS.velocidade, lote_maximo=LOTE_UDP)
+    else:
+        receptor = ReceptorUDP(PORTA_UDP, rcvbuf=RCVBUF_UDP, tamanho_datagrama=BUFFER_SIZE, lote_maximo=LOTE_UDP)
+    receptor_udp = receptor
+    pipeline.saude.receptor = receptor
+    iniciar_gravacao_pacotes()
 
-        if 'accelerometer' not in obj.get('type',''):
+    try:
+        while running:
+            # Da rede chega (data, endereço); da reprodução vem também o instante gravado
+            for pacote in receptor.receber_lote(TIMEOUT):
+                pipeline.processar_datagrama(*pacote)
+            pipeline.processar_pendentes()
+            # Também quando nada chegou: o fim do histórico vai ao disco mesmo com os sensores parados
+            dispositivos.sincronizar_sessoes_se_devido()
+            if getattr(receptor, 'terminado', False):
+                print(f"✅ Reprodução concluída: {ARGS.reproduzir}")
+                break
+    finally:
+        finalizar_gravacao_pacotes()
+        dispositivos.sincronizar_sessoes()
+        pipeline.saude.receptor = None
+        receptor_udp = None
+        receptor.fechar()
+
+def processar_dados_asyncio():
+    """Mesma ingestão com um loop asyncio (--ingestao asyncio)"""
+    global receptor_udp
+    receptor = ReceptorAsyncio([PORTA_UDP], pipeline.processar_datagrama, lambda: running,
+                               rcvbuf=RCVBUF_UDP, espera_maxima=TIMEOUT,
+                               ao_fim_do_lote=pipeline.processar_pendentes, atraso_lote=ATRASO_LOTE_ASYNCIO,
+                               ao_acordar=dispositivos.sincronizar_sessoes_se_devido)
+    receptor_udp = receptor
+    pipeline.saude.receptor = receptor
+    iniciar_gravacao_pacotes()
+    try:
+        receptor.executar()
+    finally:
+        finalizar_gravacao_pacotes()
+        dispositivos.sincronizar_sessoes()
+        pipeline.saude.receptor = None
+        receptor_udp = None
+
+def iniciar_processo_ingestao(estado_inicial=None):
+    """Ingestão em outro processo (--ingestao processo): render lento não atrasa a leitura do socket"""
+    global processo_ingestao
+    processo_ingestao = ProcessoIngestao(PORTA_UDP, configuracao_alertas(), JANELA_ALERTA_TILT, JANELA_ALERTA_VIB,
+                                         WINDOW_SIZE, alpha=LP_ALPHA, rcvbuf=RCVBUF_UDP,
+                                         tamanho_datagrama=BUFFER_SIZE, lote_maximo=LOTE_UDP,
+                                         gravar_pacotes=caminho_gravacao_pacotes(),
+                                         reproduzir=ARGS.reproduzir, velocidade=ARGS.velocidade,
+                                         estado_inicial=estado_inicial)
+    processo_ingestao.iniciar()
+
+def drenar_processo_ingestao():
+    """Copia as amostras novas do anel compartilhado para os dispositivos (loop do Tk)"""
+    global resumo_saude_processo
+    if processo_ingestao is None:
+        return
+    registros, eventos = processo_ingestao.drenar()
+    for indice in np.unique(registros['dispositivo']):
+        disp = dispositivos.registrar(processo_ingestao.nome_dispositivo(int(indice)))
+        if disp is None:
             continue
-
-        ax, ay, az = obj.get('values')[:3]
-
-        # Filtro de gravidade
-        gravity[0] = LP_ALPHA*gravity[0] + (1-LP_ALPHA)*ax
-        gravity[1] = LP_ALPHA*gravity[1] + (1-LP_ALPHA)*ay
-        gravity[2] = LP_ALPHA*gravity[2] + (1-LP_ALPHA)*az
-        gx, gy, gz = gravity
-
-        # Inclinação
-        mag = math.sqrt(gx*gx + gy*gy + gz*gz)
-        cos_t = gz/mag if mag else 1
-        cos_t = max(-1.0, min(1.0, cos_t))
-        tilt_angle = math.degrees(math.acos(cos_t))
-        tilts.append(tilt_angle)
-        tilts_all.append(tilt_angle)
-
-        # Vibração - mantém em g para processamento interno
-        total_acc = math.sqrt(ax*ax + ay*ay + az*az)
-        vib = abs(total_acc - 9.81)
-        vibracoes.append(vib)
-        vibracoes_all.append(vib)
-        avg_vib = sum(vibracoes) / len(vibracoes) if vibracoes else 0
-
-        tempo.append(t)
-        t += 1
-
-        # Alerta de inclinação
-        if grafico_tilt_var.get():
-            avg_tilt = sum(tilts) / len(tilts) if tilts else 0
-            if avg_tilt >= TILT_THRESHOLD and not tilt_alerted:
-                alerts.append(('tilt', datetime.now(), avg_tilt))
-                tocar_alerta('alerta_inclinacao.mp3')
-                tilt_alerted = True
-            if avg_tilt < TILT_THRESHOLD - 20:
-                tilt_alerted = False
-
-        # Alerta de vibração - compara na unidade correta
-        if grafico_vib_var.get():
-            if UNIDADE_VIB_ATUAL == 'm/s²':
-                avg_vib_comparacao = g_para_ms2(avg_vib)
-            else:
-                avg_vib_comparacao = avg_vib
-                
-            if avg_vib_comparacao >= VIB_THRESHOLD and not vib_alerted:
-                alerts.append(('vibração', datetime.now(), avg_vib_comparacao))
-                tocar_alerta('alerta_vibracao.mp3')
-                vib_alerted = True
-            if avg_vib_comparacao < VIB_THRESHOLD - (0.3 if UNIDADE_VIB_ATUAL == 'g' else 3.0):
-                vib_alerted = False
+        lote = registros[registros['dispositivo'] == indice]
+        disp.sessao.adicionar_lote(**{campo: lote[campo] for campo in ('tempo', 'ax', 'ay', 'az', 'tilt', 'vib')})
+        # As janelas do lado da interface só alimentam o gráfico ao vivo; os alertas vêm do processo
+        disp.media_tilt.adicionar_lote(lote['tilt'])
+        disp.media_vib.adicionar_lote(lote['vib'])
+    dispositivos.sincronizar_sessoes_se_devido()
+    for evento in eventos:
+        if evento[0] == 'alerta':
+            _, identificador, tipo, instante, valor = evento
+            disp = dispositivos.registrar(identificador)
+            if disp is not None:
+                disp.alerts.append((tipo, instante, valor))
+            ao_alertar(disp, tipo, instante, valor)
+        elif evento[0] == 'saude':
+            resumo_saude_processo = evento[1]
+        elif evento[0] == 'erro':
+            print(f"Erro no processo de ingestão: {evento[1]}")
+        elif evento[0] == 'reproducao_concluida':
+            print(f"✅ Reprodução concluída: {evento[1]}")
+
+def resumo_saude_atual():
+    """Contadores de saúde da ingestão, de onde quer que ela esteja rodando"""
+    if BACKEND_INGESTAO != 'processo':
+        return pipeline.resumo_saude()
+    resumo = dict(resumo_saude_processo or pipeline.resumo_saude())
+    if processo_ingestao is not None:
+        # Amostras que a interface não leu a tempo do anel compartilhado
+        resumo['perdidas_anel'] = processo_ingestao.anel.perdidas
+    return resumo
+
+def atualizar_saude(forcar=False):
+    """Atualiza o painel de saúde da ingestão (no máximo uma vez por segundo)"""
+    global ultima_atualizacao_saude
+    agora = time.time()
+    if not forcar and agora - ultima_atualizacao_saude < INTERVALO_SAUDE_UI:
+        return
+    ultima_atualizacao_saude = agora
+    resumo = resumo_saude_atual()
+    texto = formatar_saude(resumo, dispositivo_atual.id if dispositivo_atual else None)
+    if resumo.get('perdidas_anel'):
+        texto += f"\nNão lidas a tempo (anel): {resumo['perdidas_anel']}"
+    label_saude.configure(text=texto)
+
+def encerrar_processo_ingestao():
+    global processo_ingestao
+    processo = processo_ingestao
+    if processo is None:
+        return
+    processo.parar()
+    drenar_processo_ingestao()
+    if processo.anel.perdidas:
+        print(f"⚠️ {processo.anel.perdidas} amostras sobrescritas no anel antes de serem lidas")
+        if resumo_saude_processo is not None:
+            resumo_saude_processo['perdidas_anel'] = processo.anel.perdidas
+    processo.fechar()
+    processo_ingestao = None
 
 # === INTERFACE ===
 ctk.set_appearance_mode('dark')
@@ -1423,6 +733,7 @@ grafico_tilt_var = ctk.BooleanVar(value=False)
 grafico_vib_var = ctk.BooleanVar(value=False)
 
 def on_checkbox_change():
+    aplicar_configuracao_alertas()
     atualizar_inputs_limites()
     atualizar_estado_iniciar()
     update_graph()
@@ -1442,6 +753,29 @@ checkbox_vib.pack(side='left', padx=10, pady=5)
 status_label = ctk.CTkLabel(frame_esquerdo, text='Pronto para iniciar', font=('Segoe UI', 16, 'bold'), text_color=COR_LARANJA)
 status_label.pack(pady=(10, 20))
 
+# Seleção do dispositivo exibido (vários celulares podem enviar para a mesma porta)
+frame_dispositivo = ctk.CTkFrame(frame_esquerdo, fg_color='transparent')
+frame_dispositivo.pack(fill='x', pady=(0, 10), padx=10)
+
+label_dispositivo = ctk.CTkLabel(frame_dispositivo, text="Dispositivo:", font=('Segoe UI', 12))
+label_dispositivo.pack(side='left', padx=(0, 5))
+
+dispositivo_var = ctk.StringVar(value='Aguardando...')
+dispositivo_menu = ctk.CTkOptionMenu(
+    frame_dispositivo,
+    values=['Aguardando...'],
+    variable=dispositivo_var,
+    command=lambda identificador: selecionar_dispositivo(identificador),
+    font=('Segoe UI', 11),
+    width=180,
+    state='disabled'
+)
+dispositivo_menu.pack(side='left')
+
+# Saúde da ingestão: pacotes recebidos, rejeitados, descartados, lacunas e jitter
+label_saude = ctk.CTkLabel(frame_esquerdo, text='', font=('Segoe UI', 10), text_color=COR_TEXTO, justify='left')
+label_saude.pack(pady=(0, 10), padx=10, anchor='w')
+
 # Gráficos
 fig, axs = plt.subplots(2, 1, figsize=(7, 5))
 fig.patch.set_facecolor(COR_CINZA)
@@ -1456,18 +790,14 @@ plt.rcParams['ytick.color'] = COR_TEXTO
 plt.rcParams['axes.edgecolor'] = COR_PRETO
 plt.rcParams['text.color'] = COR_TEXTO
 
-# Função para suavizar sinal usando FFT (passa-baixa)
-def suavizar_fft(sinal, freq_corte=10, fs=50):
-    if len(sinal) < 2:
-        return sinal
-    N = len(sinal)
-    y = np.array(sinal)
-    y = y - np.mean(y)
-    Y = np.fft.fft(y)
-    freqs = np.fft.fftfreq(N, d=1/fs)
-    Y[np.abs(freqs) > freq_corte] = 0
-    y_suave = np.fft.ifft(Y).real + np.mean(sinal)
-    return y_suave.tolist()
+grafico_ao_vivo = GraficoAoVivo(fig, axs, canvas, WINDOW_SIZE, COR_LARANJA, COR_TEXTO, COR_CINZA)
+cache_suavizacao = CacheSuavizacao()
+
+def suavizar_historico(coluna):
+    """Histórico inteiro suavizado (fase zero), recalculado só se a sessão recebeu amostras"""
+    sessao = sessao_atual
+    return cache_suavizacao.suavizar((id(sessao), coluna), len(sessao), getattr(sessao, coluna),
+                                     fs=estimar_fs(sessao.tempo), dono=sessao)
 
 def update_graph():
     global encerrado, last_update_time, graph_cache, UNIDADE_VIB_ATUAL
@@ -1479,22 +809,27 @@ def update_graph():
         return
     
     last_update_time = current_time
+    drenar_processo_ingestao()
+    atualizar_menu_dispositivos()
+    atualizar_saude()
     
-    for ax in axs:
-        ax.clear()
-        ax.set_visible(False)
-
     show_tilt = grafico_tilt_var.get()
     show_vib = grafico_vib_var.get()
 
     unidade_display = 'm/s²' if UNIDADE_VIB_ATUAL == 'm/s²' else 'g'
 
     if encerrado:
+        # Histórico inteiro: desenho completo único, fora do gráfico ao vivo
+        grafico_ao_vivo.invalidar()
+        for ax in axs:
+            ax.clear()
+            ax.set_visible(False)
         if show_tilt:
             axs[0].set_visible(True)
-            if tilts_all:
-                suave = suavizar_fft(tilts_all)
-                axs[0].plot(list(range(len(suave))), suave, color=COR_LARANJA, linewidth=2)
+            if len(sessao_atual):
+                # Histórico inteiro reduzido à largura do eixo em pixels (mantém os picos)
+                pts, suave = reduzir_serie(suavizar_historico('tilts'), axs[0].bbox.width)
+                axs[0].plot(pts, suave, color=COR_LARANJA, linewidth=2)
             axs[0].set_ylim(0, 100)
             axs[0].set_title('Inclinação (°) por tempo', color=COR_LARANJA, fontsize=12, fontweight='bold')
             axs[0].set_ylabel('Grau', color=COR_TEXTO)
@@ -1502,11 +837,11 @@ def update_graph():
         if show_vib:
             idx = 1 if show_tilt else 0
             axs[idx].set_visible(True)
-            if vibracoes_all:
-                suave = suavizar_fft(vibracoes_all)
+            if len(sessao_atual):
+                pts, suave = reduzir_serie(suavizar_historico('vibracoes'), axs[idx].bbox.width)
                 if UNIDADE_VIB_ATUAL == 'm/s²':
-                    suave = [g_para_ms2(v) for v in suave]
-                axs[idx].plot(list(range(len(suave))), suave, color='#FFB266', linewidth=2)
+                    suave = g_para_ms2(suave)
+                axs[idx].plot(pts, suave, color='#FFB266', linewidth=2)
             
             if UNIDADE_VIB_ATUAL == 'm/s²':
                 axs[idx].set_ylim(0, 50)
@@ -1520,77 +855,14 @@ def update_graph():
         canvas.draw()
         return
 
-    if not show_tilt and not show_vib:
-        canvas.draw()
-        if running:
-            app.after(50, update_graph)
-        return
-
-    if show_tilt and show_vib:
-        axs[0].set_visible(True)
-        axs[1].set_visible(True)
-        if tilts:
-            suave = suavizar_fft(list(tilts))
-            pts = list(range(len(suave)))
-            axs[0].plot(pts, suave, color=COR_LARANJA, linewidth=2)
-        axs[0].set_ylim(0, 100)
-        axs[0].set_title('Inclinação (°)', color=COR_LARANJA, fontsize=12, fontweight='bold')
-        axs[0].set_ylabel('Grau', color=COR_TEXTO)
-        axs[0].set_facecolor(COR_CINZA)
-
-        if vibracoes:
-            suave = suavizar_fft(list(vibracoes))
-            if UNIDADE_VIB_ATUAL == 'm/s²':
-                suave = [g_para_ms2(v) for v in suave]
-            pts = list(range(len(suave)))
-            axs[1].plot(pts, suave, color='#FFB266', linewidth=2)
-        
-        if UNIDADE_VIB_ATUAL == 'm/s²':
-            axs[1].set_ylim(0, 50)
-        else:
-            axs[1].set_ylim(0, 5)
-            
-        axs[1].set_title(f'Vibração ({unidade_display})', color=COR_LARANJA, fontsize=12, fontweight='bold')
-        axs[1].set_ylabel(unidade_display, color=COR_TEXTO)
-        axs[1].set_facecolor(COR_CINZA)
-
-    elif show_tilt:
-        axs[0].set_visible(True)
-        if tilts:
-            suave = suavizar_fft(list(tilts))
-            pts = list(range(len(suave)))
-            axs[0].plot(pts, suave, color=COR_LARANJA, linewidth=2)
-        axs[0].set_ylim(0, 100)
-        axs[0].set_title('Inclinação (°)', color=COR_LARANJA, fontsize=12, fontweight='bold')
-        axs[0].set_ylabel('Grau', color=COR_TEXTO)
-        axs[0].set_facecolor(COR_CINZA)
-
-    elif show_vib:
-        axs[0].set_visible(True)
-        if vibracoes:
-            suave = suavizar_fft(list(vibracoes))
-            if UNIDADE_VIB_ATUAL == 'm/s²':
-                suave = [g_para_ms2(v) for v in suave]
-            pts = list(range(len(suave)))
-            axs[0].plot(pts, suave, color='#FFB266', linewidth=2)
-        
-        if UNIDADE_VIB_ATUAL == 'm/s²':
-            axs[0].set_ylim(0, 50)
-        else:
-            axs[0].set_ylim(0, 5)
-            
-        axs[0].set_title(f'Vibração ({unidade_display})', color=COR_LARANJA, fontsize=12, fontweight='bold')
-        axs[0].set_ylabel(unidade_display, color=COR_TEXTO)
-        axs[0].set_facecolor(COR_CINZA)
-
-    fig.tight_layout(pad=3.0)
-    canvas.draw()
+    # Ao vivo: só os dados das linhas mudam; a montagem é refeita se gráficos ou unidade mudarem
+    grafico_ao_vivo.desenhar(show_tilt, show_vib, UNIDADE_VIB_ATUAL, sessao_atual)
     
     if recording:
         capturar_frame_grafico()
     
     if running:
-        app.after(100, update_graph)
+        app.after(round(UPDATE_INTERVAL * 1000), update_graph)
 
 grafico_tilt_var.trace_add('write', lambda *a: update_graph())
 grafico_vib_var.trace_add('write', lambda *a: update_graph())
@@ -1610,21 +882,20 @@ label_nenhum = None
 
 def atualizar_limites_por_norma():
     """Atualiza os limites baseado na norma selecionada"""
-    global TILT_THRESHOLD, VIB_THRESHOLD, ESTRUTURA_ATUAL, UNIDADE_VIB_ATUAL
+    global TILT_THRESHOLD, VIB_THRESHOLD, ESTRUTURA_ATUAL, UNIDADE_VIB_ATUAL, HISTERESE_TILT, HISTERESE_VIB
     
     estrutura = estrutura_var.get()
     ESTRUTURA_ATUAL = estrutura
     
     if estrutura in estruturas_normas:
         norma_info = estruturas_normas[estrutura]
+        HISTERESE_TILT = norma_info['histerese_tilt']
+        HISTERESE_VIB = norma_info['histerese_vib']
         
         info_text = f"{norma_info['norma']}\n{norma_info['descricao']}"
         label_info_norma.configure(text=info_text)
         
-        if estrutura == 'Personalizada':
-            UNIDADE_VIB_ATUAL = 'g'
-        else:
-            UNIDADE_VIB_ATUAL = 'm/s²'
+        UNIDADE_VIB_ATUAL = unidade_vibracao(estrutura)
         
         if entry_tilt_limit:
             entry_tilt_limit.delete(0, 'end')
@@ -1637,6 +908,7 @@ def atualizar_limites_por_norma():
             else:
                 entry_vib_limit.insert(0, str(norma_info['vib']))
     
+    aplicar_configuracao_alertas()
     atualizar_inputs_limites()
     atualizar_estado_iniciar()
 
@@ -1776,7 +1048,7 @@ btn_report_epub = ctk.CTkButton(
     fg_color=COR_LARANJA, hover_color='#FFB266',
     text_color=COR_PRETO, font=('Segoe UI', 14, 'bold'),
     width=120, height=40, corner_radius=10,
-    command=gerar_relatorio_epub_com_loading, state='disabled'
+    command=lambda: acionar_relatorio('epub'), state='disabled'
 )
 btn_report_epub.pack(side='left', padx=5)
 
@@ -1785,10 +1057,19 @@ btn_report_pdf = ctk.CTkButton(
     fg_color=COR_LARANJA, hover_color='#FFB266',
     text_color=COR_PRETO, font=('Segoe UI', 14, 'bold'),
     width=120, height=40, corner_radius=10,
-    command=gerar_relatorio_pdf_com_loading, state='disabled'
+    command=lambda: acionar_relatorio('pdf'), state='disabled'
 )
 btn_report_pdf.pack(side='left', padx=5)
 
+btn_report_ambos = ctk.CTkButton(
+    frame_botoes, text='PDF + EPUB',
+    fg_color=COR_LARANJA, hover_color='#FFB266',
+    text_color=COR_PRETO, font=('Segoe UI', 14, 'bold'),
+    width=120, height=40, corner_radius=10,
+    command=lambda: acionar_relatorio('ambos'), state='disabled'
+)
+btn_report_ambos.pack(side='left', padx=5)
+
 def atualizar_lado_direito(estado):
     if estado == 'passos':
         frame_graficos.pack_forget()
@@ -1799,16 +1080,18 @@ def atualizar_lado_direito(estado):
         btn_encerrar.configure(state='normal')
         btn_report_epub.configure(state='disabled')
         btn_report_pdf.configure(state='disabled')
+        btn_report_ambos.configure(state='disabled')
     elif estado == 'encerrado':
         frame_passos.pack_forget()
         frame_graficos.pack(fill='both', expand=True)
         btn_encerrar.configure(state='disabled')
         btn_report_epub.configure(state='normal')
         btn_report_pdf.configure(state='normal')
+        btn_report_ambos.configure(state='normal')
 
 atualizar_lado_direito('passos')
 
-def start_recepcao():
+def start_recepcao(retomar=None):
     global running, data_thread, TILT_THRESHOLD, VIB_THRESHOLD, encerrado
     reset_dados()
     
@@ -1824,6 +1107,8 @@ def start_recepcao():
             VIB_THRESHOLD = float(entry_vib_limit.get())
     except:
         VIB_THRESHOLD = 1.5
+    aplicar_configuracao_alertas()
+    estados = iniciar_persistencia_sessao(retomar)
     
     running = True
     encerrado = False
@@ -1831,31 +1116,113 @@ def start_recepcao():
     btn_start.configure(state='disabled')
     atualizar_lado_direito('graficos')
     
-    data_thread = threading.Thread(target=processar_dados_thread, daemon=True)
-    data_thread.start()
+    if BACKEND_INGESTAO == 'processo':
+        iniciar_processo_ingestao(estados)
+    else:
+        alvo = processar_dados_asyncio if BACKEND_INGESTAO == 'asyncio' else processar_dados_thread
+        data_thread = threading.Thread(target=alvo, daemon=True)
+        data_thread.start()
     update_graph()
 
 def reset_dados():
-    global tempo, tilts, vibracoes, alerts, t, gravity, tilt_alerted, vib_alerted, tilts_all, vibracoes_all
-    tempo = []
+    global tilts, vibracoes, alerts, sessao_atual, dispositivo_atual, resumo_saude_processo
+    dispositivos.limpar()
+    pipeline.reiniciar_saude()
+    resumo_saude_processo = None
+    dispositivo_atual = None
     tilts = deque(maxlen=WINDOW_SIZE)
     vibracoes = deque(maxlen=WINDOW_SIZE)
     alerts = []
-    t = 0
-    gravity = [0.0, 0.0, 9.81]
-    tilt_alerted = False
-    vib_alerted = False
-    tilts_all = []
-    vibracoes_all = []
+    sessao_atual = SessaoColunar()
+    atualizar_menu_dispositivos()
+
+def selecionar_dispositivo(identificador):
+    """Faz gráficos e relatórios apontarem para o histórico de um dispositivo"""
+    global tilts, vibracoes, alerts, sessao_atual, dispositivo_atual
+    disp = dispositivos.get(identificador)
+    if disp is None:
+        return
+    dispositivo_atual = disp
+    tilts = disp.tilts
+    vibracoes = disp.vibracoes
+    alerts = disp.alerts
+    sessao_atual = disp.sessao
+    dispositivo_var.set(identificador)
+    if encerrado:
+        update_graph()
 
-def stop_recepcao():
-    global running, encerrado
+def atualizar_menu_dispositivos():
+    """Sincroniza o menu com os dispositivos conhecidos (chamado no loop do Tk)"""
+    global dispositivos_versao_menu
+    if dispositivos.versao == dispositivos_versao_menu:
+        return
+    dispositivos_versao_menu = dispositivos.versao
+    ids = dispositivos.ids()
+    if not ids:
+        dispositivo_menu.configure(values=['Aguardando...'], state='disabled')
+        dispositivo_var.set('Aguardando...')
+        return
+    dispositivo_menu.configure(values=ids, state='normal')
+    # O primeiro dispositivo a enviar dados é selecionado automaticamente
+    if dispositivo_atual is None:
+        selecionar_dispositivo(ids[0])
+
+def parar_thread_ingestao():
+    """Sinaliza o fim da recepção e espera a thread sair: depois disso ninguém mais escreve no histórico"""
+    global running
     running = False
+    receptor = receptor_udp
+    if receptor:
+        receptor.despertar()
+    if data_thread is not None:
+        data_thread.join()
+
+def stop_recepcao():
+    global encerrado
     encerrado = True
+    parar_thread_ingestao()
+    encerrar_processo_ingestao()
+    # Só com a ingestão parada: fechar as sessões com a thread ainda gravando perderia o fim do lote
+    finalizar_persistencia_sessao()
+    # O vídeo termina junto com a recepção (no modo offline a renderização começa aqui)
+    finalizar_gravacao()
+    atualizar_saude(forcar=True)
     status_label.configure(text='Parado', text_color=COR_LARANJA)
     btn_start.configure(state='normal')
     atualizar_lado_direito('encerrado')
     update_graph()
 
+def oferecer_retomada():
+    """Na abertura: se a recepção mais recente não foi encerrada normalmente, oferece retomá-la"""
+    diretorio = sessao_interrompida(ARGS.sessoes)
+    if diretorio is None:
+        return
+    resumo = resumir_diario(ler_diario(diretorio))
+    if resumo['inicio'] is None:
+        return
+    inicio = datetime.fromtimestamp(resumo['inicio']['gravacao_inicio'])
+    if messagebox.askyesno(
+            'Riggy - sessão interrompida',
+            f"A recepção iniciada em {inicio:%d/%m/%Y %H:%M:%S} não foi encerrada normalmente.\n\n"
+            "Retomar com o histórico, os alertas e o estado do filtro?"):
+        retomar_sessao(diretorio, resumo)
+    else:
+        # O histórico continua em disco; só deixa de ser oferecido
+        DiarioSessao(diretorio).fechar(retomada=False)
+
+def retomar_sessao(diretorio, resumo):
+    """Restaura norma, gráficos e limites da recepção interrompida e volta a receber"""
+    configuracao = resumo['configuracao']
+    estrutura_var.set(resumo['estrutura'])
+    grafico_tilt_var.set(configuracao['monitorar_tilt'])
+    grafico_vib_var.set(configuracao['monitorar_vib'])
+    atualizar_limites_por_norma()
+    for entrada, valor in ((entry_tilt_limit, configuracao['tilt']), (entry_vib_limit, configuracao['vib'])):
+        if entrada is not None and entrada.cget('state') == 'normal':
+            entrada.delete(0, 'end')
+            entrada.insert(0, str(valor))
+    start_recepcao(retomar=diretorio)
+
 if __name__ == "__main__":
+    app.after(0, oferecer_retomada)
     app.mainloop()
\ No newline at end of file
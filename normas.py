@@ -0,0 +1,59 @@
+# === NORMAS TÉCNICAS BRASILEIRAS ===
+# Limites de inclinação (°) e vibração (g ou m/s²) por tipo de estrutura, com a histerese
+# de rearme de cada alerta. Usados pela janela, pelo modo headless e pelos relatórios.
+
+estruturas_normas = {
+    'Concreto Armado (NBR 6118)': {
+        'tilt': 1.0,
+        'vib': 0.7,
+        'histerese_tilt': 0.2,
+        'histerese_vib': 0.14,
+        'norma': 'NBR 6118',
+        'descricao': 'Estruturas de concreto armado - Procedimento'
+    },
+    'Estruturas de Aço (NBR 8800)': {
+        'tilt': 1.5,
+        'vib': 0.5,
+        'histerese_tilt': 0.3,
+        'histerese_vib': 0.1,
+        'norma': 'NBR 8800',
+        'descricao': 'Projeto de estruturas de aço e de estruturas mistas de aço e concreto'
+    },
+    'Estruturas Leves (NBR 15370)': {
+        'tilt': 2.0,
+        'vib': 0.3,
+        'histerese_tilt': 0.4,
+        'histerese_vib': 0.06,
+        'norma': 'NBR 15370',
+        'descricao': 'Estruturas de madeira - Métodos de ensaio'
+    },
+    'Pontes e Viadutos (NBR 7188)': {
+        'tilt': 0.8,
+        'vib': 0.4,
+        'histerese_tilt': 0.15,
+        'histerese_vib': 0.08,
+        'norma': 'NBR 7188',
+        'descricao': 'Carga móvel rodoviária e de pedestres em pontes'
+    },
+    'Estruturas Pré-moldadas (NBR 9062)': {
+        'tilt': 1.2,
+        'vib': 0.6,
+        'histerese_tilt': 0.25,
+        'histerese_vib': 0.12,
+        'norma': 'NBR 9062',
+        'descricao': 'Projeto e execução de estruturas de concreto pré-moldado'
+    },
+    'Personalizada': {
+        'tilt': 80.0,
+        'vib': 1.5,
+        'histerese_tilt': 20.0,
+        'histerese_vib': 0.3,
+        'norma': 'Limites Personalizados',
+        'descricao': 'Limites definidos pelo usuário'
+    }
+}
+
+
+def unidade_vibracao(estrutura):
+    """Unidade do limite de vibração: as normas usam m/s², a configuração personalizada usa g"""
+    return 'g' if estrutura == 'Personalizada' else 'm/s²'
@@ -0,0 +1,337 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+# Núcleo de processamento de sinais, sem interface: filtro de gravidade, inclinação,
+# vibração, suavização, conversão de unidades e avaliação frente às normas. As funções
+# recebem arrays NumPy e tratam uma sessão inteira numa chamada (reanálise offline de
+# sessões gravadas, notebooks e benchmarks); a ingestão usa as mesmas por lote.
+
+# === CONSTANTES ===
+GRAVIDADE = 9.81
+LP_ALPHA = 0.9
+GRAVIDADE_INICIAL = (0.0, 0.0, GRAVIDADE)  # estado do filtro de um dispositivo novo
+FS_PADRAO = 50  # Hz; taxa nominal do SensaGram
+FAIXA_FS = (1.0, 2000.0)  # Hz; estimativas fora disso vêm de rajadas ou pausas, não da taxa real
+DURACAO_MINIMA_FS = 1.0  # s; abaixo disso as chegadas não dizem nada confiável sobre a taxa
+FREQ_CORTE_PADRAO = 10  # Hz; passa-baixa dos gráficos
+LOTE_MINIMO_VETORIAL = 32  # abaixo disso o custo fixo das chamadas NumPy supera o ganho
+
+
+def filtrar_gravidade(ax, ay, az, gravity, alpha=LP_ALPHA):
+    """Passa-baixa recursivo g = alpha*g + (1-alpha)*a sobre um lote.
+
+    Atualiza gravity ([gx, gy, gz]) com o estado final e devolve os arrays (gx, gy, gz).
+    A recursão é sequencial por natureza: reescrevê-la em forma fechada com potências
+    de alpha mudaria o arredondamento, então ela roda num laço de floats nativos.
+    """
+    beta = 1 - alpha
+    gx, gy, gz = gravity
+    # Uma compreensão por eixo: o acumulador fica numa variável local rápida
+    saida_x = [gx := alpha*gx + beta*x for x in _como_lista(ax)]
+    saida_y = [gy := alpha*gy + beta*y for y in _como_lista(ay)]
+    saida_z = [gz := alpha*gz + beta*z for z in _como_lista(az)]
+    gravity[0], gravity[1], gravity[2] = gx, gy, gz
+    return np.array(saida_x), np.array(saida_y), np.array(saida_z)
+
+
+def _como_lista(valores):
+    return valores.tolist() if isinstance(valores, np.ndarray) else valores
+
+
+def calcular_inclinacao(gx, gy, gz):
+    """Ângulo (graus) entre o vetor gravidade e o eixo z, amostra a amostra"""
+    mag = np.sqrt(gx*gx + gy*gy + gz*gz)
+    cos_t = np.ones_like(mag)
+    np.divide(gz, mag, out=cos_t, where=mag != 0)
+    # fmin/fmax tratam NaN como o max(-1, min(1, x)) do Python: NaN vira 1.0
+    cos_t = np.fmax(-1.0, np.fmin(1.0, cos_t))
+    # np.arccos usa aproximações SIMD que diferem da libm no último bit;
+    # math.acos mantém o resultado idêntico ao caminho escalar
+    angulos = np.fromiter(map(math.acos, cos_t.tolist()), dtype=np.float64, count=len(cos_t))
+    return np.degrees(angulos)
+
+
+def calcular_vibracao(ax, ay, az):
+    """Vibração |‖a‖ - 9.81| amostra a amostra"""
+    ax = np.asarray(ax, dtype=np.float64)
+    ay = np.asarray(ay, dtype=np.float64)
+    az = np.asarray(az, dtype=np.float64)
+    total_acc = np.sqrt(ax*ax + ay*ay + az*az)
+    return np.abs(total_acc - GRAVIDADE)
+
+
+def processar_escalar(ax, ay, az, gravity, alpha=LP_ALPHA):
+    """Caminho de referência amostra a amostra (listas de inclinação e vibração)"""
+    beta = 1 - alpha
+    gx, gy, gz = gravity
+    tilts = []
+    vibs = []
+    for x, y, z in zip(_como_lista(ax), _como_lista(ay), _como_lista(az)):
+        gx = alpha*gx + beta*x
+        gy = alpha*gy + beta*y
+        gz = alpha*gz + beta*z
+        mag = math.sqrt(gx*gx + gy*gy + gz*gz)
+        cos_t = gz/mag if mag else 1
+        cos_t = max(-1.0, min(1.0, cos_t))
+        tilts.append(math.degrees(math.acos(cos_t)))
+        vibs.append(abs(math.sqrt(x*x + y*y + z*z) - GRAVIDADE))
+    gravity[0], gravity[1], gravity[2] = gx, gy, gz
+    return tilts, vibs
+
+
+def processar_lote(ax, ay, az, gravity, alpha=LP_ALPHA):
+    """Filtro de gravidade + inclinação + vibração de um lote; idêntico bit a bit ao cálculo por amostra"""
+    if len(ax) < LOTE_MINIMO_VETORIAL:
+        tilts, vibs = processar_escalar(ax, ay, az, gravity, alpha)
+        return np.array(tilts, dtype=np.float64), np.array(vibs, dtype=np.float64)
+    gx, gy, gz = filtrar_gravidade(ax, ay, az, gravity, alpha)
+    return calcular_inclinacao(gx, gy, gz), calcular_vibracao(ax, ay, az)
+
+
+# === SESSÃO INTEIRA ===
+def processar_sessao(ax, ay, az, alpha=LP_ALPHA, gravity=None, calibracao=0):
+    """Inclinação e vibração de uma sessão inteira a partir dos eixos brutos.
+
+    Reproduz a ingestão: as `calibracao` primeiras amostras só alimentam o filtro
+    de gravidade, que parte de gravity (padrão: GRAVIDADE_INICIAL). Aceita as
+    colunas float32 das sessões em disco. Devolve (tilts, vibs, gravidade final).
+    """
+    gravity = list(GRAVIDADE_INICIAL if gravity is None else gravity)
+    ax, ay, az = (np.asarray(eixo, dtype=np.float64) for eixo in (ax, ay, az))
+    if calibracao:
+        filtrar_gravidade(ax[:calibracao], ay[:calibracao], az[:calibracao], gravity, alpha)
+        ax, ay, az = ax[calibracao:], ay[calibracao:], az[calibracao:]
+    tilts, vibs = processar_lote(ax, ay, az, gravity, alpha)
+    return tilts, vibs, gravity
+
+
+# === SUAVIZAÇÃO ===
+def suavizar_fft(sinal, freq_corte=FREQ_CORTE_PADRAO, fs=FS_PADRAO):
+    """Passa-baixa ideal de fase zero: zera as frequências acima de freq_corte (Hz).
+
+    FFT real (rfft/irfft): metade do espectro e do custo da FFT complexa, mesmo resultado.
+    """
+    y = np.asarray(sinal, dtype=np.float64)
+    if len(y) < 2:
+        return y
+    media = y.mean()
+    Y = np.fft.rfft(y - media)
+    Y[np.fft.rfftfreq(len(y), d=1/fs) > freq_corte] = 0
+    return np.fft.irfft(Y, n=len(y)) + media
+
+
+def estimar_fs(tempo, padrao=FS_PADRAO):
+    """Taxa de amostragem média (Hz) a partir dos instantes de chegada (s).
+
+    Com menos de DURACAO_MINIMA_FS de amostras devolve o padrão (algumas amostras da
+    mesma rajada UDP dariam dezenas de kHz); o resultado fica dentro de FAIXA_FS.
+    """
+    n = len(tempo)
+    if n < 2:
+        return padrao
+    duracao = float(tempo[-1]) - float(tempo[0])
+    if duracao < DURACAO_MINIMA_FS:
+        return padrao
+    return min(max((n - 1) / duracao, FAIXA_FS[0]), FAIXA_FS[1])
+
+
+class CacheSuavizacao:
+    """Resultados de suavizar_fft por série, recalculados só quando a versão da série muda.
+
+    A versão é qualquer valor que mude junto com os dados (ex.: o número de
+    amostras de uma sessão que só cresce). `dono`, se dado, é o objeto de onde a
+    série vem (ex.: a sessão): a entrada guarda a referência e só vale para o mesmo
+    objeto (`is`), então um objeto novo que herde o id de outro já coletado não
+    recebe o resultado antigo. Guarda as `maximo` séries mais recentes.
+    """
+
+    def __init__(self, maximo=8):
+        self.maximo = maximo
+        self._itens = OrderedDict()
+
+    def suavizar(self, chave, versao, serie, freq_corte=FREQ_CORTE_PADRAO, fs=FS_PADRAO, dono=None):
+        assinatura = (versao, freq_corte, fs)
+        item = self._itens.get(chave)
+        if item is not None and item[0] == assinatura and item[2] is dono:
+            self._itens.move_to_end(chave)
+            return item[1]
+        resultado = suavizar_fft(serie, freq_corte, fs)
+        self._itens[chave] = (assinatura, resultado, dono)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.maximo:
+            self._itens.popitem(last=False)
+        return resultado
+
+    def limpar(self):
+        self._itens.clear()
+
+
+class PassaBaixaStreaming:
+    """Butterworth de 2ª ordem (biquad) aplicado por blocos, com o estado mantido entre chamadas.
+
+    Causal: cada amostra nova custa o mesmo, independente do tamanho da sessão.
+    A primeira amostra inicializa o filtro em regime (sem transitório a partir de zero).
+    """
+
+    def __init__(self, freq_corte=FREQ_CORTE_PADRAO, fs=FS_PADRAO):
+        self.freq_corte = freq_corte
+        self._estado = None  # (x1, x2, y1, y2)
+        self.ajustar_fs(fs)
+
+    def ajustar_fs(self, fs):
+        """Troca a taxa de amostragem mantendo o estado (a saída segue contínua)"""
+        self.fs = fs
+        freq_corte = self.freq_corte
+        # Coeficientes do passa-baixa do "Audio EQ Cookbook" (Q = 1/√2); corte limitado abaixo de Nyquist
+        w0 = 2 * math.pi * min(freq_corte, 0.45 * fs) / fs
+        alpha = math.sin(w0) / math.sqrt(2)
+        a0 = 1 + alpha
+        self._b0 = self._b2 = (1 - math.cos(w0)) / 2 / a0
+        self._b1 = (1 - math.cos(w0)) / a0
+        self._a1 = -2 * math.cos(w0) / a0
+        self._a2 = (1 - alpha) / a0
+
+    def reiniciar(self):
+        self._estado = None
+
+    def filtrar(self, valores):
+        """Filtra o bloco de amostras novas e devolve a saída (mesmo tamanho)"""
+        valores = _como_lista(valores)
+        if not len(valores):
+            return np.empty(0)
+        if self._estado is None:
+            v = float(valores[0])
+            self._estado = (v, v, v, v)
+        b0, b1, b2, a1, a2 = self._b0, self._b1, self._b2, self._a1, self._a2
+        x1, x2, y1, y2 = self._estado
+        saida = []
+        for x in valores:
+            y = b0*x + b1*x1 + b2*x2 - a1*y1 - a2*y2
+            saida.append(y)
+            x1, x2, y1, y2 = x, x1, y, y1
+        self._estado = (x1, x2, y1, y2)
+        return np.array(saida)
+
+
+# === UNIDADES ===
+def g_para_ms2(valor_g):
+    """Converte aceleração de g para m/s² (escalar ou array)"""
+    return valor_g * GRAVIDADE
+
+
+def ms2_para_g(valor_ms2):
+    """Converte aceleração de m/s² para g (escalar ou array)"""
+    return valor_ms2 / GRAVIDADE
+
+
+def vibracao_na_unidade(vib_g, unidade):
+    """Vibração na unidade do limite da norma ('g' ou 'm/s²')"""
+    return g_para_ms2(vib_g) if unidade == 'm/s²' else vib_g
+
+
+# === CONFORMIDADE ===
+def estatisticas_serie(valores):
+    """Média, máximo, mínimo e desvio padrão amostral de um array, ignorando NaN"""
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[~np.isnan(valores)]
+    if not valores.size:
+        return 0, 0, 0, 0
+    desvio = float(valores.std(ddof=1)) if valores.size > 1 else 0
+    return float(valores.mean()), float(valores.max()), float(valores.min()), desvio
+
+
+def avaliacao_tecnica(maximo, limite):
+    """Classificação do pico medido frente ao limite da norma"""
+    if maximo < limite * 0.5:
+        return "EXCELENTE"
+    elif maximo < limite * 0.8:
+        return "BOM"
+    elif maximo < limite:
+        return "ACEITÁVEL"
+    return "CRÍTICO"
+
+
+def status_conformidade(maximo, limite):
+    return "CONFORME" if maximo < limite else "NÃO CONFORME"
+
+
+def avaliar_serie(valores, limite, unidade_vib=None):
+    """Estatísticas, conformidade e avaliação de uma série inteira frente ao limite.
+
+    Para a vibração (em g) informe unidade_vib: as estatísticas e o pico são
+    convertidos para a unidade do limite antes da comparação.
+    """
+    media, maximo, minimo, desvio = estatisticas_serie(valores)
+    if unidade_vib is not None:
+        media, maximo, minimo, desvio = (vibracao_na_unidade(v, unidade_vib) for v in (media, maximo, minimo, desvio))
+    return {
+        'media': media, 'maximo': maximo, 'minimo': minimo, 'desvio': desvio,
+        'status': status_conformidade(maximo, limite),
+        'avaliacao': avaliacao_tecnica(maximo, limite),
+    }
+
+
+# === DECIMAÇÃO PARA GRÁFICOS ===
+def decimar_minmax(y, baldes):
+    """Envelope mín/máx: divide a série em `baldes` e mantém o menor e o maior de cada um.
+
+    Devolve (índices, valores) em ordem temporal, até 2*baldes pontos. Os picos
+    de toda a série sobrevivem, então o máximo usado na conformidade aparece no gráfico.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * baldes:
+        return np.arange(n), y
+    tamanho = -(-n // baldes)  # teto: o último balde pode ficar menor
+    completos = n // tamanho
+    blocos = y[:completos * tamanho].reshape(completos, tamanho)
+    base = np.arange(completos) * tamanho
+    i_min = base + blocos.argmin(axis=1)
+    i_max = base + blocos.argmax(axis=1)
+    indices = np.column_stack((np.minimum(i_min, i_max), np.maximum(i_min, i_max))).ravel()
+    if completos * tamanho < n:
+        resto = y[completos * tamanho:]
+        base_resto = completos * tamanho
+        extremos = sorted({base_resto + int(resto.argmin()), base_resto + int(resto.argmax())})
+        indices = np.concatenate((indices, extremos))
+    return indices, y[indices]
+
+
+def decimar_lttb(y, pontos):
+    """Largest-Triangle-Three-Buckets: `pontos` amostras que preservam a forma visual da série.
+
+    Mantém a primeira e a última amostra; em cada balde intermediário escolhe a que
+    forma o maior triângulo com a anterior escolhida e a média do balde seguinte.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if pontos >= n or pontos < 3:
+        return np.arange(n), y
+    limites = np.linspace(1, n - 1, pontos - 1).astype(np.int64)
+    indices = np.empty(pontos, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(pontos - 2):
+        inicio, fim = limites[i], max(limites[i + 1], limites[i] + 1)
+        seguinte = slice(limites[i + 1], limites[i + 2]) if i + 2 < len(limites) else slice(n - 1, n)
+        x_medio = (seguinte.start + seguinte.stop - 1) / 2
+        y_medio = y[seguinte].mean()
+        candidatos = np.arange(inicio, fim)
+        area = np.abs((a - x_medio) * (y[inicio:fim] - y[a]) - (a - candidatos) * (y_medio - y[a]))
+        a = inicio + int(area.argmax())
+        indices[i + 1] = a
+    return indices, y[indices]
+
+
+def reduzir_serie(y, largura, metodo='minmax'):
+    """Série pronta para um eixo de `largura` pixels: (índices das amostras, valores).
+
+    'minmax' (padrão) guarda os picos de cada pixel; 'lttb' guarda a forma com um
+    ponto por pixel. Séries que já cabem na largura voltam inteiras.
+    """
+    largura = max(1, int(largura))
+    if metodo == 'lttb':
+        return decimar_lttb(y, largura)
+    return decimar_minmax(y, largura)
@@ -0,0 +1,127 @@
+import asyncio
+
+from receptor_udp import LOTE_MAXIMO, RCVBUF_PADRAO, TAMANHO_DATAGRAMA, criar_socket_udp, ler_descartes_kernel
+
+
+class ReceptorAsyncio:
+    """Backend de ingestão com asyncio: um único loop atende várias portas sem polling.
+
+    Como o ReceptorUDP, cada acordada do loop drena a fila do kernel de um socket
+    (até lote_maximo datagramas) em vez de passar por uma volta do loop por datagrama,
+    o que a 10 mil pacotes/s deixava a fila do kernel transbordar. Por isso o loop é
+    sempre um SelectorEventLoop (add_reader), também no Windows.
+    ao_receber(data, endereco) é chamado no thread do loop para cada datagrama.
+    ao_fim_do_lote() é chamado uma vez para os datagramas que chegarem dentro de atraso_lote.
+    continuar() é consultado sempre que o receptor é acordado por despertar().
+    ao_acordar() é chamado a cada volta do laço de espera, no máximo espera_maxima
+    depois da anterior (também sem tráfego): serve para tarefas periódicas como o fsync.
+    """
+
+    def __init__(self, portas, ao_receber, continuar, host="0.0.0.0", rcvbuf=RCVBUF_PADRAO,
+                 espera_maxima=None, ao_fim_do_lote=None, atraso_lote=0.0,
+                 tamanho_datagrama=TAMANHO_DATAGRAMA, lote_maximo=LOTE_MAXIMO, ao_acordar=None):
+        self.portas = list(portas)
+        self.tamanho_datagrama = tamanho_datagrama
+        self.lote_maximo = lote_maximo
+        self._ao_receber = ao_receber
+        self._continuar = continuar
+        self._ao_fim_do_lote = ao_fim_do_lote
+        self._atraso_lote = atraso_lote
+        self._ao_acordar = ao_acordar
+        self._lote_agendado = False
+        self._host = host
+        self._rcvbuf = rcvbuf
+        self._espera_maxima = espera_maxima
+        self._loop = None
+        self._acordar = None
+        self._sockets = []
+        self.erros_recepcao = 0
+
+    def executar(self):
+        """Bloqueia até continuar() retornar falso (use como alvo de uma thread)"""
+        # O ProactorEventLoop (padrão no Windows) não tem add_reader
+        loop = asyncio.SelectorEventLoop()
+        try:
+            loop.run_until_complete(self._principal())
+        finally:
+            loop.close()
+
+    async def _principal(self):
+        self._loop = asyncio.get_running_loop()
+        self._acordar = asyncio.Event()
+        sockets = []
+        try:
+            for porta in self.portas:
+                sock = criar_socket_udp(porta, self._host, self._rcvbuf)
+                sockets.append(sock)
+                self._loop.add_reader(sock, self._drenar, sock)
+            self._sockets = list(sockets)
+
+            while self._continuar():
+                try:
+                    await asyncio.wait_for(self._acordar.wait(), self._espera_maxima)
+                except asyncio.TimeoutError:
+                    pass
+                self._acordar.clear()
+                if self._ao_acordar:
+                    self._ao_acordar()
+        finally:
+            self._sockets = []
+            for sock in sockets:
+                self._loop.remove_reader(sock)
+                sock.close()
+            if self._lote_agendado:
+                self._fim_do_lote()
+
+    def _drenar(self, sock):
+        """Socket legível: lê tudo o que já está na fila do kernel (até lote_maximo) de uma vez"""
+        recvfrom = sock.recvfrom
+        ao_receber = self._ao_receber
+        tamanho = self.tamanho_datagrama
+        recebeu = False
+        for _ in range(self.lote_maximo):
+            try:
+                data, endereco = recvfrom(tamanho)
+            except BlockingIOError:
+                break
+            except InterruptedError:
+                continue
+            except OSError as e:
+                # Windows: ICMP "port unreachable" refletido ou datagrama maior que o buffer
+                print(f"Erro de recepção UDP: {e}")
+                self.erros_recepcao += 1
+                continue
+            ao_receber(data, endereco)
+            recebeu = True
+        if recebeu and self._ao_fim_do_lote:
+            self._agendar_fim_do_lote()
+
+    def descartes_kernel(self):
+        """Soma dos descartes do kernel em todas as portas; None se o SO não informa"""
+        contagens = [ler_descartes_kernel(sock) for sock in list(self._sockets)]
+        contagens = [c for c in contagens if c is not None]
+        return sum(contagens) if contagens else None
+
+    def _agendar_fim_do_lote(self):
+        if self._lote_agendado:
+            return
+        self._lote_agendado = True
+        if self._atraso_lote:
+            self._loop.call_later(self._atraso_lote, self._fim_do_lote)
+        else:
+            self._loop.call_soon(self._fim_do_lote)
+
+    def _fim_do_lote(self):
+        self._lote_agendado = False
+        self._ao_fim_do_lote()
+
+    def despertar(self):
+        """Acorda o loop para reavaliar continuar() (chamado por outra thread)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._acordar.set)
+        except RuntimeError:
+            # Loop encerrado entre a verificação e a chamada
+            pass
@@ -0,0 +1,131 @@
+import os
+import selectors
+import socket
+
+# === CONFIGURAÇÕES PADRÃO ===
+RCVBUF_PADRAO = 4 * 1024 * 1024  # 4 MB: ~20 s de folga a 1 kHz com datagramas de ~200 bytes
+TAMANHO_DATAGRAMA = 2048
+LOTE_MAXIMO = 256
+
+
+def criar_socket_udp(porta, host="0.0.0.0", rcvbuf=RCVBUF_PADRAO):
+    """Cria o socket UDP não bloqueante com o buffer de recepção do kernel dimensionado"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # O SO_RCVBUF precisa ser definido antes do bind para valer desde o primeiro pacote
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    except OSError as e:
+        print(f"⚠️ Não foi possível definir SO_RCVBUF={rcvbuf}: {e}")
+    sock.bind((host, porta))
+    sock.setblocking(False)
+    efetivo = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    if efetivo < rcvbuf:
+        # Linux limita pelo net.core.rmem_max; Windows/macOS têm limites próprios
+        print(f"⚠️ Buffer de recepção UDP limitado pelo sistema: {efetivo // 1024} KB "
+              f"(solicitado {rcvbuf // 1024} KB)")
+    return sock
+
+
+def ler_descartes_kernel(sock):
+    """Datagramas que o kernel descartou neste socket por fila cheia; None se o SO não informa.
+
+    Linux expõe o contador na coluna "drops" de /proc/net/udp; Windows e macOS não
+    têm equivalente por socket.
+    """
+    try:
+        inode = os.fstat(sock.fileno()).st_ino
+    except (OSError, ValueError):
+        return None
+    if not inode:
+        return None
+    for caminho in ('/proc/net/udp', '/proc/net/udp6'):
+        try:
+            with open(caminho) as arquivo:
+                next(arquivo)
+                for linha in arquivo:
+                    campos = linha.split()
+                    if len(campos) >= 13 and int(campos[9]) == inode:
+                        return int(campos[12])
+        except (OSError, ValueError, StopIteration):
+            continue
+    return None
+
+
+class ReceptorUDP:
+    """Socket UDP não bloqueante que espera num seletor e drena a fila do kernel em lotes"""
+
+    def __init__(self, porta, host="0.0.0.0", rcvbuf=RCVBUF_PADRAO,
+                 tamanho_datagrama=TAMANHO_DATAGRAMA, lote_maximo=LOTE_MAXIMO):
+        self.porta = porta
+        self.tamanho_datagrama = tamanho_datagrama
+        self.lote_maximo = lote_maximo
+
+        self._sock = criar_socket_udp(porta, host, rcvbuf)
+        self.rcvbuf_efetivo = self._sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        self.erros_recepcao = 0  # ICMP refletido, datagrama maior que o buffer...
+
+        # Par de sockets usado apenas para acordar o seletor ao encerrar
+        self._despertador_r, self._despertador_w = socket.socketpair()
+        self._despertador_r.setblocking(False)
+        self._despertador_w.setblocking(False)
+
+        self._seletor = selectors.DefaultSelector()
+        self._seletor.register(self._sock, selectors.EVENT_READ)
+        self._seletor.register(self._despertador_r, selectors.EVENT_READ)
+
+    def receber_lote(self, timeout=None):
+        """Espera até haver dados e devolve todos os datagramas já enfileirados como [(bytes, endereço)]"""
+        eventos = self._seletor.select(timeout)
+        if not eventos:
+            return []
+
+        for chave, _ in eventos:
+            if chave.fileobj is self._despertador_r:
+                try:
+                    self._despertador_r.recv(64)
+                except BlockingIOError:
+                    pass
+
+        # Drena a fila do kernel numa única acordada (equivalente em Python ao recvmmsg)
+        lote = []
+        recvfrom = self._sock.recvfrom
+        tamanho = self.tamanho_datagrama
+        for _ in range(self.lote_maximo):
+            try:
+                lote.append(recvfrom(tamanho))
+            except BlockingIOError:
+                break
+            except InterruptedError:
+                continue
+            except ConnectionResetError:
+                # Windows reporta ICMP "port unreachable" de envios anteriores como erro no recv
+                self.erros_recepcao += 1
+                continue
+            except OSError:
+                # Windows: datagrama maior que tamanho_datagrama (WSAEMSGSIZE) é descartado com erro
+                self.erros_recepcao += 1
+                continue
+        return lote
+
+    def descartes_kernel(self):
+        return ler_descartes_kernel(self._sock)
+
+    def despertar(self):
+        """Interrompe uma espera em receber_lote (chamado por outra thread)"""
+        try:
+            self._despertador_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def fechar(self):
+        self._seletor.close()
+        self._sock.close()
+        self._despertador_r.close()
+        self._despertador_w.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
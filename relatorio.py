@@ -0,0 +1,939 @@
+import base64
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+import fitz  # PyMuPDF
+from ebooklib import epub
+from jinja2 import Template
+
+from normas import estruturas_normas
+from processamento import avaliar_serie, g_para_ms2, reduzir_serie
+from saude import LIMITES_JITTER_MS, faixas_jitter
+
+# Geração dos relatórios PDF e EPUB sem interface: usada pelo botão da janela e pelo
+# modo headless. matplotlib (gráficos) e OpenCV (vídeo) só são importados quando um
+# relatório precisa deles, e sem pyplot: nada aqui abre ou exige um display.
+
+# Estilo dos gráficos completos em cada formato
+ESTILO_GRAFICOS = {
+    'epub': {'figsize': (8, 4), 'titulo': 14, 'grade': True, 'savefig': {'dpi': 150, 'bbox_inches': 'tight'}},
+    'pdf': {'figsize': (6, 3), 'titulo': 12, 'grade': False, 'savefig': {}},
+}
+
+# Vídeo usado no EPUB por gravação: (caminho, mtime, tamanho) -> caminho H.264 (ou o original)
+_videos_compativeis = {}
+
+# Modelos já calculados por versão da sessão (PDF e EPUB da mesma sessão leem o mesmo)
+MODELOS_EM_CACHE = 4
+_modelos = {}
+_trava_modelos = threading.Lock()
+
+
+# === TEMPLATE HTML PARA EPUB ===
+EPUB_TEMPLATE = """
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head>
+    <title>{{ titulo }}</title>
+    <meta charset="utf-8"/>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            line-height: 1.6;
+            margin: 20px;
+            color: #333;
+        }
+        .header {
+            text-align: center;
+            border-bottom: 3px solid #FF8800;
+            padding-bottom: 20px;
+            margin-bottom: 30px;
+        }
+        .logo {
+            color: #FF8800;
+            font-size: 24px;
+            font-weight: bold;
+        }
+        .subtitle {
+            color: #666;
+            font-size: 14px;
+        }
+        .section {
+            margin: 20px 0;
+            padding: 15px;
+            border-left: 4px solid #FF8800;
+            background-color: #f9f9f9;
+        }
+        .section-title {
+            color: #FF8800;
+            font-size: 16px;
+            font-weight: bold;
+            margin-bottom: 10px;
+        }
+        .norma-section {
+            background-color: #f0f0ff;
+            border: 2px solid #0066cc;
+            border-radius: 5px;
+            padding: 15px;
+            margin: 20px 0;
+        }
+        .stats-grid {
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            gap: 20px;
+            margin: 15px 0;
+        }
+        .stat-item {
+            margin: 5px 0;
+        }
+        .status-conforme {
+            color: #008000;
+            font-weight: bold;
+        }
+        .status-nao-conforme {
+            color: #cc0000;
+            font-weight: bold;
+        }
+        .video-section {
+            background-color: #1a1a1a;
+            color: white;
+            padding: 20px;
+            border-radius: 5px;
+            margin: 20px 0;
+            text-align: center;
+        }
+        .video-container {
+            margin: 20px 0;
+            background-color: #000;
+            border-radius: 5px;
+            padding: 10px;
+        }
+        video {
+            max-width: 100%;
+            height: auto;
+            border-radius: 5px;
+            background-color: #000;
+        }
+        .video-fallback {
+            background-color: #333;
+            padding: 20px;
+            border-radius: 5px;
+            margin: 10px 0;
+        }
+        .video-fallback a {
+            color: #FF8800;
+            text-decoration: none;
+            font-weight: bold;
+        }
+        .video-fallback a:hover {
+            text-decoration: underline;
+        }
+        .footer {
+            border-top: 1px solid #FF8800;
+            padding-top: 15px;
+            margin-top: 30px;
+            font-size: 12px;
+            color: #666;
+        }
+        .chart-container {
+            text-align: center;
+            margin: 20px 0;
+        }
+        .chart-container img {
+            max-width: 100%;
+            height: auto;
+            border: 1px solid #ddd;
+            border-radius: 5px;
+        }
+        .video-info {
+            font-size: 12px;
+            color: #ccc;
+            margin: 10px 0;
+        }
+        .compatibility-note {
+            background-color: #2a2a2a;
+            padding: 15px;
+            border-radius: 5px;
+            margin: 15px 0;
+            font-size: 12px;
+            color: #aaa;
+        }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <div class="logo">RELATÓRIO RIGGY</div>
+        <div class="subtitle">UDP SensaGram - Monitoramento de Sensores</div>
+    </div>
+
+    <div class="norma-section">
+        <div class="section-title">📋 NORMA TÉCNICA APLICADA</div>
+        <p><strong>Estrutura Avaliada:</strong> {{ estrutura_atual }}</p>
+        <p><strong>Norma Aplicada:</strong> {{ norma_info.norma }}</p>
+        <p><strong>Descrição:</strong> {{ norma_info.descricao }}</p>
+        <p><strong>Limites:</strong> Inclinação ≤ {{ limite_tilt }}° | Vibração ≤ {{ limite_vib }} {{ unidade_display }}</p>
+    </div>
+
+    <div class="section">
+        <div class="section-title">INFORMAÇÕES GERAIS</div>
+        <div class="stats-grid">
+            <div>
+                <div class="stat-item"><strong>Data e Hora:</strong> {{ data_hora }}</div>
+                <div class="stat-item"><strong>Pontos Coletados:</strong> {{ pontos_coletados }}</div>
+                <div class="stat-item"><strong>Duração do Teste:</strong> {{ duracao_teste }} segundos</div>
+            </div>
+            <div>
+                <div class="stat-item"><strong>Alertas de Inclinação:</strong> {{ alertas_tilt }}</div>
+                <div class="stat-item"><strong>Alertas de Vibração:</strong> {{ alertas_vib }}</div>
+                <div class="stat-item"><strong>Dispositivo:</strong> {{ dispositivo }}</div>
+            </div>
+        </div>
+    </div>
+
+    <div class="section">
+        <div class="section-title">📡 SAÚDE DA INGESTÃO</div>
+        <div class="stats-grid">
+            <div>
+                <div class="stat-item"><strong>Pacotes Recebidos:</strong> {{ saude.recebidos }}</div>
+                <div class="stat-item"><strong>Amostras Válidas:</strong> {{ saude.decodificados }}</div>
+                <div class="stat-item"><strong>Outros Sensores:</strong> {{ saude.rejeitados_tipo }}</div>
+                <div class="stat-item"><strong>Malformados:</strong> {{ saude.malformados }}</div>
+                <div class="stat-item"><strong>Descartados pelo Kernel:</strong> {{ saude.descartados_kernel }}</div>
+                <div class="stat-item"><strong>Erros de Recepção:</strong> {{ saude.erros_recepcao }}</div>
+            </div>
+            <div>
+                <div class="stat-item"><strong>Lacunas:</strong> {{ saude.lacunas }} (~{{ saude.amostras_perdidas }} amostras)</div>
+                <div class="stat-item"><strong>Maior Lacuna:</strong> {{ saude.maior_lacuna }} s</div>
+                <div class="stat-item"><strong>Fora de Ordem:</strong> {{ saude.fora_de_ordem }}</div>
+                <div class="stat-item"><strong>Jitter Médio:</strong> {{ saude.jitter_medio }} ms</div>
+                <div class="stat-item"><strong>Jitter p95:</strong> {{ saude.jitter_p95 }} ms</div>
+                {% if saude.perdidas_anel %}
+                <div class="stat-item"><strong>Não Lidas a Tempo:</strong> {{ saude.perdidas_anel }}</div>
+                {% endif %}
+            </div>
+        </div>
+        {% if saude.histograma %}
+        <p style="font-size: 12px; color: #666; margin-top: 10px;">
+            Histograma de jitter:
+            {% for faixa in saude.histograma %}{{ faixa.faixa }}: {{ faixa.contagem }}{% if not loop.last %} | {% endif %}{% endfor %}
+        </p>
+        {% endif %}
+    </div>
+
+    {% if mostrar_tilt %}
+    <div class="section">
+        <div class="section-title">📐 ESTATÍSTICAS DE INCLINAÇÃO (°)</div>
+        <div class="stats-grid">
+            <div>
+                <div class="stat-item"><strong>Média:</strong> {{ tilt_media }}°</div>
+                <div class="stat-item"><strong>Máximo:</strong> {{ tilt_max }}°</div>
+                <div class="stat-item"><strong>Mínimo:</strong> {{ tilt_min }}°</div>
+            </div>
+            <div>
+                <div class="stat-item"><strong>Desvio Padrão:</strong> {{ tilt_std }}°</div>
+                <div class="stat-item"><strong>Limite da Norma:</strong> {{ limite_tilt }}°</div>
+                <div class="stat-item"><strong>Status:</strong> 
+                    <span class="{{ 'status-conforme' if tilt_status == 'CONFORME' else 'status-nao-conforme' }}">
+                        {{ tilt_status }}
+                    </span>
+                </div>
+                <div class="stat-item"><strong>Avaliação:</strong> {{ tilt_avaliacao }}</div>
+            </div>
+        </div>
+    </div>
+    {% endif %}
+
+    {% if mostrar_vib %}
+    <div class="section">
+        <div class="section-title">📳 ESTATÍSTICAS DE VIBRAÇÃO ({{ unidade_display }})</div>
+        <div class="stats-grid">
+            <div>
+                <div class="stat-item"><strong>Média:</strong> {{ vib_media }}{{ unidade_display }}</div>
+                <div class="stat-item"><strong>Máximo:</strong> {{ vib_max }}{{ unidade_display }}</div>
+                <div class="stat-item"><strong>Mínimo:</strong> {{ vib_min }}{{ unidade_display }}</div>
+            </div>
+            <div>
+                <div class="stat-item"><strong>Desvio Padrão:</strong> {{ vib_std }}{{ unidade_display }}</div>
+                <div class="stat-item"><strong>Limite da Norma:</strong> {{ limite_vib }}{{ unidade_display }}</div>
+                <div class="stat-item"><strong>Status:</strong> 
+                    <span class="{{ 'status-conforme' if vib_status == 'CONFORME' else 'status-nao-conforme' }}">
+                        {{ vib_status }}
+                    </span>
+                </div>
+                <div class="stat-item"><strong>Avaliação:</strong> {{ vib_avaliacao }}</div>
+            </div>
+        </div>
+        {% if unidade_display == 'm/s²' %}
+        <p style="font-size: 12px; color: #666; margin-top: 10px;">
+            * Valores convertidos de g para m/s² conforme NBR ISO 2631-1
+        </p>
+        {% endif %}
+    </div>
+    {% endif %}
+
+    {% if graficos %}
+    <div class="section">
+        <div class="section-title">📊 GRÁFICOS COMPLETOS POR TEMPO</div>
+        {% for grafico in graficos %}
+        <div class="chart-container">
+            <img src="{{ grafico.src }}" alt="{{ grafico.alt }}" />
+            <p>{{ grafico.titulo }}</p>
+        </div>
+        {% endfor %}
+    </div>
+    {% endif %}
+
+    {% if video_data %}
+    <div class="video-section">
+        <div class="section-title" style="color: #FF8800;">🎥 GRAVAÇÃO DOS GRÁFICOS</div>
+        <p><strong>Arquivo:</strong> {{ video_filename }}</p>
+        <p><strong>Frames Capturados:</strong> {{ frames_capturados }}</p>
+        <p><strong>Duração:</strong> {{ duracao_video }} segundos</p>
+        <p><strong>Tamanho:</strong> {{ video_size_mb }} MB</p>
+        
+        <div class="video-container">
+            {% if video_base64 %}
+            <!-- Vídeo embutido como base64 -->
+            <video controls preload="metadata" style="width: 100%; max-width: 640px;">
+                <source src="data:video/mp4;base64,{{ video_base64 }}" type="video/mp4">
+                <p style="color: #ff6666;">Seu leitor de EPUB não suporta vídeos HTML5.</p>
+            </video>
+            <div class="video-info">
+                ✅ Vídeo embutido diretamente no EPUB (base64)
+            </div>
+            {% else %}
+            <!-- Vídeo como arquivo anexo -->
+            <video controls preload="metadata" style="width: 100%; max-width: 640px;">
+                <source src="{{ video_src }}" type="video/mp4">
+                <div class="video-fallback">
+                    <p style="color: #ff6666;">❌ Não foi possível carregar o vídeo</p>
+                    <p>O vídeo está anexado ao EPUB como arquivo separado.</p>
+                    <p>Tente extrair o arquivo "{{ video_filename }}" do EPUB.</p>
+                </div>
+            </video>
+            <div class="video-info">
+                📎 Vídeo anexado como arquivo separado
+            </div>
+            {% endif %}
+        </div>
+        
+        <div class="compatibility-note">
+            <strong>💡 Dica de Compatibilidade:</strong><br>
+            • <strong>Calibre:</strong> Suporta vídeos HTML5 ✅<br>
+            • <strong>Adobe Digital Editions:</strong> Suporte limitado ⚠️<br>
+            • <strong>Apple Books:</strong> Suporta vídeos ✅<br>
+            • <strong>Google Play Books:</strong> Suporte limitado ⚠️<br>
+            <br>
+            Se o vídeo não reproduzir, o arquivo original está salvo em: <strong>{{ video_filename }}</strong>
+        </div>
+    </div>
+    {% endif %}
+
+    <div class="footer">
+        <p><strong>Gerado por Riggy - UDP SensaGram</strong></p>
+        <p>Relatório gerado em {{ data_hora }}</p>
+    </div>
+</body>
+</html>
+"""
+
+
+# === DADOS DO RELATÓRIO ===
+def contexto_relatorio(sessao, alerts, estrutura, limite_tilt, limite_vib, unidade_vib, mostrar_tilt, mostrar_vib,
+                       dispositivo=None, saude=None, duracao=0.0, video=None, frames=0):
+    """Tudo o que os relatórios leem de uma sessão, num dicionário (capturado no thread de quem pede)"""
+    return {
+        'sessao': sessao,
+        'alerts': list(alerts),
+        'estrutura': estrutura,
+        'limite_tilt': limite_tilt,
+        'limite_vib': limite_vib,
+        'unidade_vib': unidade_vib,
+        'mostrar_tilt': mostrar_tilt,
+        'mostrar_vib': mostrar_vib,
+        'dispositivo': dispositivo or 'N/A',
+        'saude': saude,
+        'duracao': duracao,
+        'video': video if video and os.path.isfile(video) else None,
+        'frames': frames,
+    }
+
+
+def dados_saude_relatorio(resumo, identificador):
+    """Contadores de saúde da ingestão formatados para os relatórios (um dispositivo)"""
+    resumo = resumo or {}
+    kernel = resumo.get('descartados_kernel')
+    fluxo = resumo.get('dispositivos', {}).get(identificador)
+    dados = {
+        'recebidos': resumo.get('recebidos', 0),
+        'decodificados': resumo.get('decodificados', 0),
+        'rejeitados_tipo': resumo.get('rejeitados_tipo', 0),
+        'malformados': resumo.get('malformados', 0),
+        'ignorados_limite': resumo.get('ignorados_limite', 0),
+        'descartados_kernel': 'não informado pelo sistema' if kernel is None else kernel,
+        'erros_recepcao': resumo.get('erros_recepcao', 0),
+        'perdidas_anel': resumo.get('perdidas_anel', 0),
+        'lacunas': 0,
+        'amostras_perdidas': 0,
+        'maior_lacuna': '0.00',
+        'fora_de_ordem': 0,
+        'jitter_medio': '0.0',
+        'jitter_p95': '0',
+        'histograma': [],
+    }
+    if fluxo:
+        p95 = fluxo['jitter_p95_ms']
+        dados.update({
+            'lacunas': fluxo['lacunas'],
+            'amostras_perdidas': fluxo['amostras_perdidas'],
+            'maior_lacuna': f"{fluxo['maior_lacuna_s']:.2f}",
+            'fora_de_ordem': fluxo['fora_de_ordem'],
+            'jitter_medio': f"{fluxo['jitter_ms']:.1f}",
+            'jitter_p95': f"> {LIMITES_JITTER_MS[-1]}" if p95 is None else f"≤ {p95}",
+            'histograma': [{'faixa': faixa, 'contagem': contagem}
+                           for faixa, contagem in zip(faixas_jitter(), fluxo['histograma_jitter']) if contagem],
+        })
+    return dados
+
+
+def modelo_relatorio(contexto):
+    """Números dos relatórios calculados uma vez por versão da sessão, lidos pelo PDF e pelo EPUB.
+
+    Estatísticas, conversão de unidade, conformidade e avaliação saem de uma passada
+    vetorizada por série (avaliar_serie); o resultado fica em cache enquanto a sessão,
+    o número de amostras e as opções do relatório não mudam.
+    """
+    sessao = contexto['sessao']
+    opcoes = tuple(contexto[k] for k in ('estrutura', 'limite_tilt', 'limite_vib', 'unidade_vib',
+                                         'mostrar_tilt', 'mostrar_vib'))
+    chave = (id(sessao), len(sessao), len(contexto['alerts'])) + opcoes
+    with _trava_modelos:
+        # A entrada guarda a sessão: enquanto estiver no cache, o id não é reaproveitado
+        entrada = _modelos.get(chave)
+        if entrada is not None and entrada[0] is sessao:
+            return entrada[1]
+        modelo = _calcular_modelo(contexto)
+        _modelos[chave] = (sessao, modelo)
+        while len(_modelos) > MODELOS_EM_CACHE:
+            del _modelos[next(iter(_modelos))]
+        return modelo
+
+
+def _calcular_modelo(contexto):
+    sessao, alerts, unidade_vib = contexto['sessao'], contexto['alerts'], contexto['unidade_vib']
+    mostrar_tilt, mostrar_vib = contexto['mostrar_tilt'], contexto['mostrar_vib']
+    # Série oculta: zeros, como antes (o relatório não mostra a seção)
+    tilt = avaliar_serie(sessao.tilts if mostrar_tilt else (), contexto['limite_tilt'])
+    vib = avaliar_serie(sessao.vibracoes if mostrar_vib else (), contexto['limite_vib'], unidade_vib=unidade_vib)
+    tipos = [a[0] for a in alerts]
+    return {
+        'norma_info': estruturas_normas.get(contexto['estrutura'], estruturas_normas['Personalizada']),
+        'unidade_display': 'm/s²' if unidade_vib == 'm/s²' else 'g',
+        'pontos': len(sessao),
+        'alertas_tilt': tipos.count('tilt') if mostrar_tilt else 0,
+        'alertas_vib': tipos.count('vibração') if mostrar_vib else 0,
+        'tilt': tilt,
+        'vib': vib,  # na unidade da norma
+    }
+
+
+# === GERAÇÃO DE RELATÓRIO EPUB ===
+def gerar_relatorio_epub(epub_filename, contexto, progresso=None):
+    """Gera o relatório EPUB (gráficos em PNG, vídeo embutido ou anexado) e devolve o caminho.
+
+    progresso(fracao, etapa), se dado, é chamado a cada etapa (e pode interromper levantando exceção).
+    """
+    sessao, dispositivo, frames, video = (
+        contexto['sessao'], contexto['dispositivo'], contexto['frames'], contexto['video'])
+    estrutura, unidade_vib = contexto['estrutura'], contexto['unidade_vib']
+    limite_tilt, limite_vib = contexto['limite_tilt'], contexto['limite_vib']
+    mostrar_tilt, mostrar_vib = contexto['mostrar_tilt'], contexto['mostrar_vib']
+
+    now = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    modelo = modelo_relatorio(contexto)
+    tilt, vib, unidade_display = modelo['tilt'], modelo['vib'], modelo['unidade_display']
+    duracao_real = contexto['duracao']
+
+    # === LÓGICA PARA VÍDEO ===
+    _avisar(progresso, 0.1, 'Preparando vídeo')
+    video_base64 = None
+    video_size_mb = 0
+    if video and os.path.isfile(video):
+        try:
+            # Versão H.264 da gravação (a própria, ou convertida uma vez e reaproveitada)
+            video = video_compativel(video)
+        except Exception as e:
+            print(f"Erro ao processar vídeo: {e}")
+        try:
+            with open(video, 'rb') as video_file:
+                video_data = video_file.read()
+            video_size_mb = len(video_data) / (1024 * 1024)  # Tamanho em MB
+
+            # Se o vídeo for menor que 10MB, converte para base64
+            if video_size_mb < 10:
+                video_base64 = base64.b64encode(video_data).decode('utf-8')
+                print(f"✅ Vídeo convertido para base64: {video_size_mb:.2f} MB")
+            else:
+                print(f"⚠️ Vídeo muito grande ({video_size_mb:.2f} MB), será anexado como arquivo")
+        except Exception as e:
+            print(f"Erro ao ler vídeo: {e}")
+
+    _avisar(progresso, 0.3, 'Gerando gráficos')
+    # Gera gráficos para o EPUB (num diretório temporário: relatórios simultâneos não colidem)
+    with tempfile.TemporaryDirectory(prefix='riggy_') as temporario:
+        graficos_info = []
+        graficos_paths = salvar_graficos_completos(temporario, 'epub', sessao.tilts, sessao.vibracoes,
+                                                   mostrar_tilt, mostrar_vib, unidade_vib)
+    
+        for i, path in enumerate(graficos_paths):
+            if os.path.basename(path).startswith('tilt'):
+                graficos_info.append({
+                    'src': f'images/grafico_tilt_{i}.png',
+                    'alt': 'Gráfico de Inclinação por Tempo',
+                    'titulo': 'Inclinação (°) por Tempo',
+                    'path': path
+                })
+            else:
+                graficos_info.append({
+                    'src': f'images/grafico_vib_{i}.png',
+                    'alt': 'Gráfico de Vibração por Tempo',
+                    'titulo': f'Vibração ({unidade_display}) por Tempo',
+                    'path': path
+                })
+
+        # Dados do template
+        template_data = {
+            'titulo': 'Relatório Riggy - UDP SensaGram',
+            'estrutura_atual': estrutura,
+            'norma_info': modelo['norma_info'],
+            'limite_tilt': f"{limite_tilt:.1f}",
+            'limite_vib': f"{limite_vib:.2f}",
+            'unidade_display': unidade_display,
+            'data_hora': datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            'pontos_coletados': modelo['pontos'],
+            'dispositivo': dispositivo,
+            'duracao_teste': f"{duracao_real:.1f}",
+            'alertas_tilt': modelo['alertas_tilt'],
+            'alertas_vib': modelo['alertas_vib'],
+            'mostrar_tilt': mostrar_tilt,
+            'mostrar_vib': mostrar_vib,
+            'saude': dados_saude_relatorio(contexto['saude'], dispositivo),
+            'tilt_media': f"{tilt['media']:.2f}",
+            'tilt_max': f"{tilt['maximo']:.2f}",
+            'tilt_min': f"{tilt['minimo']:.2f}",
+            'tilt_std': f"{tilt['desvio']:.2f}",
+            'tilt_status': tilt['status'],
+            'tilt_avaliacao': tilt['avaliacao'],
+            'vib_media': f"{vib['media']:.3f}",
+            'vib_max': f"{vib['maximo']:.3f}",
+            'vib_min': f"{vib['minimo']:.3f}",
+            'vib_std': f"{vib['desvio']:.3f}",
+            'vib_status': vib['status'],
+            'vib_avaliacao': vib['avaliacao'],
+            'graficos': graficos_info,
+            'video_data': video and os.path.isfile(video),
+            'video_filename': os.path.basename(video) if video else '',
+            'frames_capturados': frames,
+            'duracao_video': f"{duracao_real:.1f}",
+            'video_src': 'video/gravacao.mp4' if video else '',
+            'video_base64': video_base64,
+            'video_size_mb': f"{video_size_mb:.2f}"
+        }
+
+        # Cria o EPUB
+        book = epub.EpubBook()
+        
+        # Metadados
+        book.set_identifier('riggy-report-' + now)
+        book.set_title('Relatório Riggy - UDP SensaGram')
+        book.set_language('pt-BR')
+        book.add_author('Riggy - UDP SensaGram')
+        book.add_metadata('DC', 'description', 'Relatório de monitoramento de sensores estruturais')
+
+        # Renderiza o template HTML
+        _avisar(progresso, 0.7, 'Montando EPUB')
+        template = Template(EPUB_TEMPLATE)
+        html_content = template.render(**template_data)
+        
+        # Cria o capítulo principal
+        chapter = epub.EpubHtml(title='Relatório de Monitoramento', 
+                              file_name='relatorio.xhtml', 
+                              lang='pt-BR')
+        chapter.content = html_content
+        book.add_item(chapter)
+
+        # Adiciona imagens dos gráficos
+        for grafico in graficos_info:
+            if os.path.exists(grafico['path']):
+                with open(grafico['path'], 'rb') as img_file:
+                    img_data = img_file.read()
+                
+                img_item = epub.EpubItem(
+                    uid=f"img_{grafico['src'].split('/')[-1]}",
+                    file_name=grafico['src'],
+                    media_type="image/png",
+                    content=img_data
+                )
+                book.add_item(img_item)
+
+        # Adiciona o vídeo se não foi convertido para base64
+        if video and os.path.isfile(video) and not video_base64:
+            try:
+                with open(video, 'rb') as video_file:
+                    video_data = video_file.read()
+                
+                video_item = epub.EpubItem(
+                    uid="video_gravacao",
+                    file_name="video/gravacao.mp4",
+                    media_type="video/mp4",
+                    content=video_data
+                )
+                book.add_item(video_item)
+                print(f"✅ Vídeo anexado ao EPUB: {len(video_data)} bytes")
+            except Exception as e:
+                print(f"Erro ao anexar vídeo ao EPUB: {e}")
+
+        # Define a ordem de leitura
+        book.toc = [chapter]
+        book.add_item(epub.EpubNcx())
+        book.add_item(epub.EpubNav())
+
+        # Define a spine (ordem dos capítulos)
+        book.spine = ['nav', chapter]
+
+        # Salva o EPUB
+        _avisar(progresso, 0.9, 'Gravando EPUB')
+        epub.write_epub(epub_filename, book, {})
+
+    print(f"✅ Relatório EPUB gerado: {epub_filename}")
+    if video_base64:
+        print(f"✅ Vídeo embutido como base64 no HTML")
+    elif video and os.path.isfile(video):
+        print(f"✅ Vídeo anexado como arquivo separado")
+    return epub_filename
+
+
+def converter_video_para_h264(input_file, output_file):
+    """Converte vídeo para H.264 usando OpenCV para melhor compatibilidade"""
+    import cv2  # só quando há vídeo (o modo headless nunca grava)
+    from captura_video import CODECS_VIDEO, abrir_gravador
+    cap = cv2.VideoCapture(input_file)
+    out = None
+    try:
+        # Propriedades do vídeo original
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        # Só os codecs H.264 da cadeia: sem eles não há o que ganhar convertendo
+        out, codec = abrir_gravador(output_file, fps, (width, height), CODECS_VIDEO[:-1])
+
+        frame_count = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            out.write(frame)
+            frame_count += 1
+
+        print(f"✅ Vídeo convertido para H.264 ({codec}): {frame_count} frames")
+        return True
+
+    except Exception as e:
+        print(f"Erro na conversão H.264: {e}")
+        return False
+    finally:
+        cap.release()
+        if out is not None:
+            out.release()
+
+
+def video_compativel(video):
+    """Versão H.264 da gravação para o relatório, sem reconverter.
+
+    Gravações novas já saem em H.264 (quando o OpenCV tem o codec) e são usadas
+    como estão. Gravações em outro codec são convertidas uma única vez para
+    `<nome>_h264.mp4`, ao lado do original; se não houver codec H.264, fica o original.
+    """
+    chave = (video, os.path.getmtime(video), os.path.getsize(video))
+    if chave in _videos_compativeis:
+        return _videos_compativeis[chave]
+    from captura_video import codec_do_video, eh_h264
+    resultado = video
+    if not eh_h264(codec_do_video(video)):
+        convertido = f"{os.path.splitext(video)[0]}_h264.mp4"
+        if os.path.isfile(convertido) and os.path.getmtime(convertido) >= chave[1]:
+            resultado = convertido
+        elif converter_video_para_h264(video, convertido):
+            resultado = convertido
+        elif os.path.isfile(convertido):
+            os.remove(convertido)
+    _videos_compativeis[chave] = resultado
+    return resultado
+
+
+# === GERAÇÃO DE RELATÓRIO PDF ===
+def gerar_relatorio_pdf(pdf_filename, contexto, progresso=None):
+    """Gera o relatório PDF (vídeo como anexo) e devolve o caminho; progresso como no EPUB"""
+    sessao, dispositivo, frames, video = (
+        contexto['sessao'], contexto['dispositivo'], contexto['frames'], contexto['video'])
+    estrutura, unidade_vib = contexto['estrutura'], contexto['unidade_vib']
+    limite_tilt, limite_vib = contexto['limite_tilt'], contexto['limite_vib']
+    mostrar_tilt, mostrar_vib = contexto['mostrar_tilt'], contexto['mostrar_vib']
+
+    modelo = modelo_relatorio(contexto)
+    tilt, vib, unidade_display = modelo['tilt'], modelo['vib'], modelo['unidade_display']
+    duracao_real = contexto['duracao']
+
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)  # A4
+
+    cor_laranja = (1, 0.5, 0)
+    cor_preta = (0, 0, 0)
+    cor_cinza = (0.3, 0.3, 0.3)
+    cor_cinza_claro = (0.9, 0.9, 0.9)
+    cor_azul = (0, 0.4, 0.8)
+
+    y_pos = 800
+    desenhou_estatisticas = False
+
+    # Cabeçalho
+    logo_path = os.path.join(os.path.dirname(__file__), 'riggy-logo.jpeg')
+    if os.path.isfile(logo_path):
+        try:
+            logo_rect = fitz.Rect(50, y_pos-60, 110, y_pos)
+            page.insert_image(logo_rect, filename=logo_path)
+        except:
+            pass
+
+    page.insert_text((130, y_pos-20), "RELATÓRIO RIGGY", fontsize=20, color=cor_laranja)
+    page.insert_text((130, y_pos-40), "UDP SensaGram - Monitoramento de Sensores", fontsize=12, color=cor_cinza)
+    page.draw_line(fitz.Point(50, y_pos-70), fitz.Point(545, y_pos-70), color=cor_laranja, width=2)
+    y_pos -= 90
+
+    # === SEÇÃO: INFORMAÇÕES DA NORMA ===
+    norma_info = modelo['norma_info']
+    norma_rect = fitz.Rect(50, y_pos-100, 545, y_pos)
+    page.draw_rect(norma_rect, color=(0.95, 0.95, 1.0), fill=(0.95, 0.95, 1.0))
+    page.draw_rect(norma_rect, color=cor_azul, width=2)
+    page.insert_text((60, y_pos-15), "📋 NORMA TÉCNICA APLICADA", fontsize=12, color=cor_azul)
+    page.insert_text((60, y_pos-35), f"Estrutura Avaliada: {estrutura}", fontsize=11, color=cor_preta)
+    page.insert_text((60, y_pos-50), f"Norma Aplicada: {norma_info['norma']}", fontsize=11, color=cor_preta)
+    page.insert_text((60, y_pos-65), f"Descrição: {norma_info['descricao']}", fontsize=9, color=cor_cinza)
+    
+    # Limites da norma
+    limite_tilt_display = limite_tilt
+    limite_vib_display = limite_vib if unidade_vib == 'g' else limite_vib
+    page.insert_text((60, y_pos-80), f"Limites: Inclinação ≤ {limite_tilt_display:.1f}° | Vibração ≤ {limite_vib_display:.2f} {unidade_display}", fontsize=10, color=cor_preta)
+    y_pos -= 120
+
+    # Informações gerais
+    info_rect = fitz.Rect(50, y_pos-80, 545, y_pos)
+    page.draw_rect(info_rect, color=cor_cinza_claro, fill=cor_cinza_claro)
+    page.draw_rect(info_rect, color=cor_cinza, width=1)
+    page.insert_text((60, y_pos-15), "INFORMAÇÕES GERAIS", fontsize=12, color=cor_laranja)
+    page.insert_text((60, y_pos-35), f"Data e Hora: {datetime.now():%d/%m/%Y %H:%M:%S}", fontsize=11, color=cor_preta)
+    page.insert_text((60, y_pos-50), f"Pontos Coletados: {modelo['pontos']}", fontsize=11, color=cor_preta)
+    page.insert_text((300, y_pos-35), f"Alertas de Inclinação: {modelo['alertas_tilt']}", fontsize=11, color=cor_preta)
+    page.insert_text((300, y_pos-50), f"Alertas de Vibração: {modelo['alertas_vib']}", fontsize=11, color=cor_preta)
+    page.insert_text((60, y_pos-65), f"Duração do Teste: {duracao_real:.1f} segundos", fontsize=11, color=cor_preta)
+    page.insert_text((300, y_pos-65), f"Dispositivo: {dispositivo}", fontsize=11, color=cor_preta)
+    y_pos -= 100
+
+    # === SEÇÃO: SAÚDE DA INGESTÃO ===
+    saude = dados_saude_relatorio(contexto['saude'], dispositivo)
+    saude_rect = fitz.Rect(50, y_pos-95, 545, y_pos)
+    page.draw_rect(saude_rect, color=cor_cinza_claro, fill=cor_cinza_claro)
+    page.draw_rect(saude_rect, color=cor_cinza, width=1)
+    page.insert_text((60, y_pos-15), "📡 SAÚDE DA INGESTÃO", fontsize=12, color=cor_laranja)
+    page.insert_text((60, y_pos-35), f"Pacotes Recebidos: {saude['recebidos']} | Válidos: {saude['decodificados']}", fontsize=10, color=cor_preta)
+    page.insert_text((60, y_pos-50), f"Outros Sensores: {saude['rejeitados_tipo']} | Malformados: {saude['malformados']}", fontsize=10, color=cor_preta)
+    page.insert_text((60, y_pos-65), f"Descartados pelo Kernel: {saude['descartados_kernel']}", fontsize=10, color=cor_preta)
+    page.insert_text((60, y_pos-80), f"Erros de Recepção: {saude['erros_recepcao']} | Não Lidas a Tempo: {saude['perdidas_anel']}", fontsize=10, color=cor_preta)
+    page.insert_text((300, y_pos-35), f"Lacunas: {saude['lacunas']} (~{saude['amostras_perdidas']} amostras)", fontsize=10, color=cor_preta)
+    page.insert_text((300, y_pos-50), f"Maior Lacuna: {saude['maior_lacuna']} s | Fora de Ordem: {saude['fora_de_ordem']}", fontsize=10, color=cor_preta)
+    page.insert_text((300, y_pos-65), f"Jitter Médio: {saude['jitter_medio']} ms | p95: {saude['jitter_p95']} ms", fontsize=10, color=cor_preta)
+    y_pos -= 110
+
+    # Estatísticas de inclinação
+    if mostrar_tilt:
+        desenhou_estatisticas = True
+        tilt_rect = fitz.Rect(50, y_pos-140, 545, y_pos)
+        page.draw_rect(tilt_rect, color=cor_cinza_claro, fill=cor_cinza_claro)
+        page.draw_rect(tilt_rect, color=cor_cinza, width=1)
+        page.insert_text((60, y_pos-15), "📐 ESTATÍSTICAS DE INCLINAÇÃO (°)", fontsize=12, color=cor_laranja)
+        page.insert_text((60, y_pos-35), f"Média: {tilt['media']:.2f}°", fontsize=11, color=cor_preta)
+        page.insert_text((60, y_pos-50), f"Máximo: {tilt['maximo']:.2f}°", fontsize=11, color=cor_preta)
+        page.insert_text((60, y_pos-65), f"Mínimo: {tilt['minimo']:.2f}°", fontsize=11, color=cor_preta)
+        page.insert_text((300, y_pos-35), f"Desvio Padrão: {tilt['desvio']:.2f}°", fontsize=11, color=cor_preta)
+        page.insert_text((300, y_pos-50), f"Limite da Norma: {limite_tilt:.1f}°", fontsize=11, color=cor_preta)
+        
+        # Status de conformidade
+        cor_status = (0, 0.7, 0) if tilt['status'] == 'CONFORME' else (0.8, 0, 0)
+        page.insert_text((300, y_pos-65), f"Status: {tilt['status']}", fontsize=11, color=cor_status)
+        
+        # Avaliação técnica
+        page.insert_text((300, y_pos-80), f"Avaliação: {tilt['avaliacao']}", fontsize=10, color=cor_cinza)
+        y_pos -= 160
+
+    # Estatísticas de vibração
+    if mostrar_vib:
+        desenhou_estatisticas = True
+        vib_rect = fitz.Rect(50, y_pos-140, 545, y_pos)
+        page.draw_rect(vib_rect, color=cor_cinza_claro, fill=cor_cinza_claro)
+        page.draw_rect(vib_rect, color=cor_cinza, width=1)
+        page.insert_text((60, y_pos-15), f"📳 ESTATÍSTICAS DE VIBRAÇÃO ({unidade_display})", fontsize=12, color=cor_laranja)
+        page.insert_text((60, y_pos-35), f"Média: {vib['media']:.3f}{unidade_display}", fontsize=11, color=cor_preta)
+        page.insert_text((60, y_pos-50), f"Máximo: {vib['maximo']:.3f}{unidade_display}", fontsize=11, color=cor_preta)
+        page.insert_text((60, y_pos-65), f"Mínimo: {vib['minimo']:.3f}{unidade_display}", fontsize=11, color=cor_preta)
+        page.insert_text((300, y_pos-35), f"Desvio Padrão: {vib['desvio']:.3f}{unidade_display}", fontsize=11, color=cor_preta)
+        
+        limite_vib_display_norma = limite_vib if unidade_vib == 'g' else limite_vib
+        page.insert_text((300, y_pos-50), f"Limite da Norma: {limite_vib_display_norma:.2f}{unidade_display}", fontsize=11, color=cor_preta)
+        
+        # Status de conformidade (comparação na unidade da norma)
+        cor_status = (0, 0.7, 0) if vib['status'] == 'CONFORME' else (0.8, 0, 0)
+        page.insert_text((300, y_pos-65), f"Status: {vib['status']}", fontsize=11, color=cor_status)
+        
+        # Avaliação técnica
+        page.insert_text((300, y_pos-80), f"Avaliação: {vib['avaliacao']}", fontsize=10, color=cor_cinza)
+        
+        # Nota sobre conversão de unidades
+        if unidade_vib == 'm/s²':
+            page.insert_text((60, y_pos-95), "* Valores convertidos de g para m/s² conforme NBR ISO 2631-1", fontsize=8, color=cor_cinza)
+        y_pos -= 160
+
+    # Se nenhuma estatística foi desenhada, corrige o y_pos
+    if not desenhou_estatisticas:
+        y_pos -= 40
+
+    # Seção de vídeo
+    _avisar(progresso, 0.4, 'Anexando vídeo')
+    if video and os.path.isfile(video):
+        video_rect = fitz.Rect(50, y_pos-100, 545, y_pos)
+        page.draw_rect(video_rect, color=(0.1, 0.1, 0.1), fill=(0.1, 0.1, 0.1))
+        page.draw_rect(video_rect, color=cor_laranja, width=2)
+        page.insert_text((60, y_pos-15), "🎥 GRAVAÇÃO DOS GRÁFICOS", fontsize=12, color=cor_laranja)
+        page.insert_text((60, y_pos-35), f"Arquivo: {video}", fontsize=11, color=(1, 1, 1))
+        page.insert_text((60, y_pos-50), f"Frames Capturados: {frames}", fontsize=11, color=(1, 1, 1))
+        page.insert_text((60, y_pos-65), f"Duração Aproximada: {duracao_real:.1f} segundos", fontsize=11, color=(1, 1, 1))
+        try:
+            with open(video, 'rb') as video_file:
+                video_bytes = video_file.read()
+            doc.embfile_add(video, video_bytes, filename=os.path.basename(video))
+            page.insert_text((400, y_pos-35), "📎 VÍDEO ANEXADO", fontsize=12, color=cor_laranja)
+            page.insert_text((400, y_pos-50), "Clique no ícone de anexo", fontsize=10, color=(0.8, 0.8, 0.8))
+            page.insert_text((400, y_pos-65), "no seu leitor de PDF", fontsize=10, color=(0.8, 0.8, 0.8))
+        except Exception as e:
+            print(f"Erro ao anexar vídeo: {e}")
+            page.insert_text((400, y_pos-35), "❌ ERRO NO ANEXO", fontsize=12, color=(0.8, 0, 0))
+            page.insert_text((400, y_pos-50), "Vídeo salvo separadamente", fontsize=10, color=(0.8, 0.8, 0.8))
+        y_pos -= 30
+
+    # Rodapé
+    page.draw_line(fitz.Point(50, 80), fitz.Point(545, 80), color=cor_laranja, width=1)
+    page.insert_text((50, 60), "Gerado por Riggy - UDP SensaGram", fontsize=10, color=cor_cinza)
+    page.insert_text((50, 45), f"Relatório gerado em {datetime.now():%d/%m/%Y às %H:%M:%S}", fontsize=9, color=cor_cinza)
+    page.insert_text((400, 60), f"Página 1 de 1", fontsize=10, color=cor_cinza)
+
+    # Inserir gráficos completos (por tempo) em nova página
+    _avisar(progresso, 0.6, 'Gerando gráficos')
+    with tempfile.TemporaryDirectory(prefix='riggy_') as temporario:
+        graficos_paths = salvar_graficos_completos(temporario, 'pdf', sessao.tilts, sessao.vibracoes,
+                                                   mostrar_tilt, mostrar_vib, unidade_vib)
+        if graficos_paths:
+            page_graficos = doc.new_page(width=595, height=842)
+            y_graf = 800
+            page_graficos.insert_text((60, y_graf-20), "GRÁFICOS COMPLETOS POR TEMPO", fontsize=16, color=cor_laranja)
+            y_graf -= 40
+            for path in graficos_paths:
+                try:
+                    img = fitz.Pixmap(path)
+                    img_width = 400
+                    img_height = int(img.height * (img_width / img.width))
+                    img_rect = fitz.Rect((595-img_width)//2, y_graf-img_height, (595+img_width)//2, y_graf)
+                    page_graficos.insert_image(img_rect, filename=path)
+                    y_graf -= (img_height + 20)
+                except Exception as e:
+                    print(f"Erro ao inserir gráfico no PDF: {e}")
+
+    _avisar(progresso, 0.9, 'Gravando PDF')
+    doc.save(pdf_filename)
+    doc.close()
+
+    print(f"Relatório PDF gerado: {pdf_filename}")
+    if video and os.path.isfile(video):
+        print(f"Vídeo anexado ao PDF: {video}")
+    return pdf_filename
+
+
+def _avisar(progresso, fracao, etapa):
+    if progresso is not None:
+        progresso(fracao, etapa)
+
+
+def salvar_graficos_completos(diretorio, formato, tilts_all, vibracoes_all, show_tilt, show_vib, unidade_vib):
+    """Salva os gráficos da sessão inteira como PNG em diretorio e devolve os caminhos"""
+    # Figure + canvas Agg, sem pyplot: não mexe no backend da janela nem exige display
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    estilo = ESTILO_GRAFICOS[formato]
+    paths = []
+    
+    if show_tilt and len(tilts_all):
+        fig_tilt = Figure(figsize=estilo['figsize'])
+        FigureCanvasAgg(fig_tilt)
+        ax_tilt = fig_tilt.subplots()
+        ax_tilt.plot(*reduzir_serie(tilts_all, _largura_salva(ax_tilt, estilo)), color='#FF8800', linewidth=2)
+        ax_tilt.set_ylim(0, 100)
+        ax_tilt.set_title('Inclinação (°) por tempo', fontsize=estilo['titulo'], fontweight='bold')
+        ax_tilt.set_ylabel('Grau')
+        ax_tilt.set_xlabel('Tempo (amostras)')
+        if estilo['grade']:
+            ax_tilt.grid(True, alpha=0.3)
+        fig_tilt.tight_layout()
+        tilt_path = os.path.join(diretorio, f"tilt_grafico_{formato}.png")
+        fig_tilt.savefig(tilt_path, **estilo['savefig'])
+        paths.append(tilt_path)
+    
+    if show_vib and len(vibracoes_all):
+        fig_vib = Figure(figsize=estilo['figsize'])
+        FigureCanvasAgg(fig_vib)
+        ax_vib = fig_vib.subplots()
+        
+        # Reduz à largura do eixo (mantém os picos) e converte para a unidade correta se necessário
+        pts, vib_data = reduzir_serie(vibracoes_all, _largura_salva(ax_vib, estilo))
+        unidade_display = 'g'
+        if unidade_vib == 'm/s²':
+            vib_data = g_para_ms2(vib_data)
+            unidade_display = 'm/s²'
+            
+        ax_vib.plot(pts, vib_data, color='#FFB266', linewidth=2)
+        
+        # Ajusta escala baseada na unidade
+        if unidade_vib == 'm/s²':
+            ax_vib.set_ylim(0, 50)
+        else:
+            ax_vib.set_ylim(0, 5)
+            
+        ax_vib.set_title(f'Vibração ({unidade_display}) por tempo', fontsize=estilo['titulo'], fontweight='bold')
+        ax_vib.set_ylabel(unidade_display)
+        ax_vib.set_xlabel('Tempo (amostras)')
+        if estilo['grade']:
+            ax_vib.grid(True, alpha=0.3)
+        fig_vib.tight_layout()
+        vib_path = os.path.join(diretorio, f"vib_grafico_{formato}.png")
+        fig_vib.savefig(vib_path, **estilo['savefig'])
+        paths.append(vib_path)
+    
+    return paths
+
+
+def _largura_salva(ax, estilo):
+    """Largura do eixo em pixels na imagem salva (o dpi do savefig pode diferir do da figura)"""
+    dpi = estilo['savefig'].get('dpi', ax.figure.dpi)
+    return ax.bbox.width * dpi / ax.figure.dpi
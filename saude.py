@@ -0,0 +1,176 @@
+import bisect
+import time
+from collections import deque
+
+# === CONFIGURAÇÕES PADRÃO ===
+LIMITES_JITTER_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)  # bordas do histograma; a última faixa é aberta
+FATOR_LACUNA = 3.0  # intervalo entre timestamps acima de 3x o típico conta como lacuna
+JANELA_TAXAS = 5.0  # s; as taxas são médias sobre essa janela
+INTERVALO_KERNEL = 1.0  # s entre leituras do contador de descartes do kernel
+
+CONTADORES = ('recebidos', 'decodificados', 'rejeitados_tipo', 'malformados', 'ignorados_limite')
+
+
+class FluxoDispositivo:
+    """Qualidade do fluxo de um sensor: jitter de chegada e lacunas pelo timestamp do SensaGram.
+
+    O jitter de cada pacote é |Δchegada - Δtimestamp| (variação do atraso de trânsito,
+    como no RFC 3550). Lacunas são saltos do timestamp maiores que FATOR_LACUNA vezes
+    o intervalo típico, que segue uma média móvel exponencial.
+    """
+
+    def __init__(self):
+        self.histograma_jitter = [0] * (len(LIMITES_JITTER_MS) + 1)
+        self.jitter_ms = 0.0  # estimativa suavizada
+        self.intervalo_ns = None
+        self.lacunas = 0
+        self.amostras_perdidas = 0  # estimadas a partir do tamanho das lacunas
+        self.maior_lacuna_s = 0.0
+        self.fora_de_ordem = 0
+        self._chegada = None
+        self._timestamp = None
+
+    def registrar(self, chegada, timestamp_ns):
+        """chegada: instante de recepção (s); timestamp_ns: campo timestamp do pacote"""
+        if timestamp_ns is None:
+            return
+        if self._timestamp is not None:
+            dt_sensor = timestamp_ns - self._timestamp
+            if dt_sensor <= 0:
+                # Duplicado ou reordenado: não serve de referência para o próximo
+                self.fora_de_ordem += 1
+                return
+            d_ms = abs((chegada - self._chegada) * 1e3 - dt_sensor / 1e6)
+            self.histograma_jitter[bisect.bisect_left(LIMITES_JITTER_MS, d_ms)] += 1
+            self.jitter_ms += (d_ms - self.jitter_ms) / 16
+
+            intervalo = self.intervalo_ns
+            if intervalo is None:
+                self.intervalo_ns = dt_sensor
+            else:
+                if dt_sensor > FATOR_LACUNA * intervalo:
+                    self.lacunas += 1
+                    self.amostras_perdidas += round(dt_sensor / intervalo) - 1
+                    self.maior_lacuna_s = max(self.maior_lacuna_s, dt_sensor / 1e9)
+                # Limitado: uma lacuna isolada não distorce o intervalo típico,
+                # mas uma mudança real de taxa é absorvida em poucas dezenas de amostras
+                self.intervalo_ns = intervalo + (min(dt_sensor, FATOR_LACUNA * intervalo) - intervalo) / 16
+        self._chegada = chegada
+        self._timestamp = timestamp_ns
+
+    def percentil_jitter(self, p):
+        """Borda superior (ms) da faixa do histograma que contém o percentil p; None se aberta"""
+        total = sum(self.histograma_jitter)
+        if not total:
+            return 0.0
+        alvo = total * p / 100
+        acumulado = 0
+        for i, contagem in enumerate(self.histograma_jitter):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return LIMITES_JITTER_MS[i] if i < len(LIMITES_JITTER_MS) else None
+        return None
+
+    def resumo(self):
+        return {
+            'jitter_ms': self.jitter_ms,
+            'jitter_p95_ms': self.percentil_jitter(95),
+            'histograma_jitter': list(self.histograma_jitter),
+            'intervalo_ms': self.intervalo_ns / 1e6 if self.intervalo_ns else None,
+            'lacunas': self.lacunas,
+            'amostras_perdidas': self.amostras_perdidas,
+            'maior_lacuna_s': self.maior_lacuna_s,
+            'fora_de_ordem': self.fora_de_ordem,
+        }
+
+
+class SaudeIngestao:
+    """Contadores da ingestão e taxas móveis: recebidos, decodificados, rejeitados e descartados.
+
+    Os contadores são incrementados pela thread de ingestão; taxas() e resumo() são
+    chamados por quem exibe (interface ou processo de ingestão), no máximo algumas
+    vezes por segundo.
+    """
+
+    def __init__(self):
+        self.recebidos = 0
+        self.decodificados = 0
+        self.rejeitados_tipo = 0  # pacotes de outros sensores (giroscópio, magnetômetro...)
+        self.malformados = 0
+        self.ignorados_limite = 0  # origens além do limite de dispositivos
+        self.ultimo_erro = None
+        self.receptor = None  # fornece descartes_kernel() e erros_recepcao
+        self._descartes_kernel = None
+        self._ultima_leitura_kernel = float('-inf')
+        self._historico = deque()
+
+    def contadores(self):
+        return {nome: getattr(self, nome) for nome in CONTADORES}
+
+    def descartes_kernel(self):
+        """Datagramas descartados pelo kernel por fila cheia; None se o SO não informa"""
+        agora = time.monotonic()
+        receptor = self.receptor
+        if receptor is not None and agora - self._ultima_leitura_kernel >= INTERVALO_KERNEL:
+            self._ultima_leitura_kernel = agora
+            descartes = receptor.descartes_kernel()
+            if descartes is not None:
+                self._descartes_kernel = descartes
+        return self._descartes_kernel
+
+    def taxas(self):
+        """Eventos por segundo de cada contador na última JANELA_TAXAS"""
+        agora = time.monotonic()
+        valores = tuple(getattr(self, nome) for nome in CONTADORES)
+        historico = self._historico
+        historico.append((agora, valores))
+        while len(historico) > 2 and agora - historico[1][0] >= JANELA_TAXAS:
+            historico.popleft()
+        inicio, antigos = historico[0]
+        duracao = agora - inicio
+        if duracao <= 0:
+            return {nome: 0.0 for nome in CONTADORES}
+        return {nome: (novo - antigo) / duracao for nome, novo, antigo in zip(CONTADORES, valores, antigos)}
+
+    def resumo(self, dispositivos=None):
+        """Retrato serializável (vai pela fila de eventos no modo processo)"""
+        receptor = self.receptor
+        resumo = self.contadores()
+        resumo['taxas'] = self.taxas()
+        resumo['descartados_kernel'] = self.descartes_kernel()
+        resumo['erros_recepcao'] = receptor.erros_recepcao if receptor is not None else 0
+        resumo['ultimo_erro'] = self.ultimo_erro
+        if dispositivos is not None:
+            resumo['dispositivos'] = {}
+            for identificador in dispositivos.ids():
+                disp = dispositivos.get(identificador)
+                if disp is not None:
+                    resumo['dispositivos'][identificador] = disp.fluxo.resumo()
+        return resumo
+
+
+def faixas_jitter():
+    """Rótulos das faixas do histograma de jitter, na mesma ordem das contagens"""
+    rotulos = [f"≤ {LIMITES_JITTER_MS[0]} ms"]
+    rotulos += [f"{a}–{b} ms" for a, b in zip(LIMITES_JITTER_MS, LIMITES_JITTER_MS[1:])]
+    rotulos.append(f"> {LIMITES_JITTER_MS[-1]} ms")
+    return rotulos
+
+
+def formatar_saude(resumo, identificador=None):
+    """Texto curto para a interface e os relatórios"""
+    taxas = resumo.get('taxas', {})
+    kernel = resumo.get('descartados_kernel')
+    linhas = [
+        f"Pacotes: {resumo['recebidos']} ({taxas.get('recebidos', 0):.0f}/s) | "
+        f"válidos: {resumo['decodificados']}",
+        f"Outros sensores: {resumo['rejeitados_tipo']} | malformados: {resumo['malformados']} | "
+        f"kernel: {'n/d' if kernel is None else kernel}",
+    ]
+    fluxo = resumo.get('dispositivos', {}).get(identificador)
+    if fluxo:
+        p95 = fluxo['jitter_p95_ms']
+        linhas.append(
+            f"Lacunas: {fluxo['lacunas']} (~{fluxo['amostras_perdidas']} amostras) | "
+            f"jitter: {fluxo['jitter_ms']:.1f} ms (p95 {'>' + str(LIMITES_JITTER_MS[-1]) if p95 is None else p95} ms)")
+    return "\n".join(linhas)
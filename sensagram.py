@@ -0,0 +1,94 @@
+import json
+import math
+
+# Usa orjson quando instalado (várias vezes mais rápido que o json da stdlib)
+try:
+    import orjson
+    _carregar_json = orjson.loads
+    BACKEND_JSON = 'orjson'
+except ImportError:
+    _carregar_json = json.loads
+    BACKEND_JSON = 'json'
+
+# Formato enviado pelo SensaGram:
+# {"type": "android.sensor.accelerometer", "timestamp": 3925657519043709, "values": [0.31, -0.97, 10.04]}
+TIPO_ACELEROMETRO = b'accelerometer'
+_CHAVE_TIPO = b'"type"'
+_CHAVE_VALORES = b'"values"'
+_CHAVE_TIMESTAMP = b'"timestamp"'
+
+
+def decodificar_acelerometro(data):
+    """Extrai (ax, ay, az) de um pacote de acelerômetro; None para outros sensores.
+
+    Levanta ValueError se o pacote estiver malformado.
+    """
+    # Giroscópio, magnetômetro etc. são descartados sem nenhuma decodificação
+    if TIPO_ACELEROMETRO not in data:
+        return None
+    if BACKEND_JSON == 'orjson':
+        # O parser em C do orjson é mais rápido que o recorte manual em Python
+        return _extrair_json(data)
+    try:
+        return _extrair_rapido(data)
+    except ValueError:
+        # Formato inesperado (chaves escapadas, listas aninhadas...): usa o parser completo
+        return _extrair_json(data)
+
+
+def _extrair_rapido(data):
+    """Lê o tipo e values[:3] direto dos bytes, sem montar o dicionário"""
+    inicio = data.index(_CHAVE_TIPO) + len(_CHAVE_TIPO)
+    aspas = data.index(b'"', inicio)
+    if data[inicio:aspas].strip() != b':':
+        raise ValueError("campo 'type' fora do formato esperado")
+    fim = data.index(b'"', aspas + 1)
+    if TIPO_ACELEROMETRO not in data[aspas + 1:fim]:
+        return None
+
+    inicio = data.index(_CHAVE_VALORES) + len(_CHAVE_VALORES)
+    colchete = data.index(b'[', inicio)
+    if data[inicio:colchete].strip() != b':':
+        raise ValueError("campo 'values' fora do formato esperado")
+    fim = data.index(b']', colchete)
+    partes = data[colchete + 1:fim].split(b',', 3)
+    if len(partes) < 3:
+        raise ValueError("pacote com menos de 3 valores")
+    # float() de bytes já recusa null, true e texto; _numero recusa nan/inf
+    return _numero(float(partes[0])), _numero(float(partes[1])), _numero(float(partes[2]))
+
+
+def _extrair_json(data):
+    """Caminho completo: decodifica o JSON inteiro"""
+    try:
+        obj = _carregar_json(data)
+        if 'accelerometer' not in obj.get('type', ''):
+            return None
+        ax, ay, az = obj.get('values')[:3]
+    except (TypeError, AttributeError, KeyError) as e:
+        raise ValueError(f"pacote malformado: {e}") from e
+    return _numero(ax), _numero(ay), _numero(az)
+
+
+def _numero(valor):
+    """Componente do acelerômetro como float; bool, null, texto e nan/inf são pacote malformado"""
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor):
+        raise ValueError(f"valor não numérico no pacote: {valor!r}")
+    return float(valor)
+
+
+def extrair_timestamp(data):
+    """Campo timestamp (ns do relógio do aparelho) lido direto dos bytes; None se ausente ou inválido"""
+    inicio = data.find(_CHAVE_TIMESTAMP)
+    if inicio < 0:
+        return None
+    inicio = data.find(b':', inicio + len(_CHAVE_TIMESTAMP)) + 1
+    if not inicio:
+        return None
+    fim = data.find(b',', inicio)
+    if fim < 0:
+        fim = data.find(b'}', inicio)
+    try:
+        return int(data[inicio:fim])
+    except ValueError:
+        return None
@@ -0,0 +1,277 @@
+"""Modo headless do Riggy: recepção, filtro, alertas, persistência e relatórios agendados.
+
+Não importa Tk, matplotlib.pyplot, pygame nem OpenCV: roda num servidor ou numa placa
+embarcada. Os alertas saem no console (e no diário da sessão); os relatórios PDF/EPUB
+de cada dispositivo são gerados numa thread à parte a cada --relatorio-intervalo
+segundos e no encerramento. SIGINT/SIGTERM encerram a recepção normalmente.
+
+Uso: python main.py --headless [--norma NOME | --limite-tilt G --limite-vib V] [--relatorio-intervalo S]
+     python servico.py [mesmas opções]
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+from armazenamento import SessaoEmDisco, nome_diretorio
+from diario import DiarioSessao, aplicar_estado, ler_diario, reconstruir_estado, resumir_diario, sessao_interrompida
+from dispositivos import Dispositivos
+from gravacao_pacotes import GravadorPacotes, ReprodutorPacotes
+from ingestao import ALERTA_TILT, PipelineIngestao
+from normas import estruturas_normas, unidade_vibracao
+from processamento import LP_ALPHA
+from receptor_udp import LOTE_MAXIMO, RCVBUF_PADRAO, TAMANHO_DATAGRAMA, ReceptorUDP
+from saude import formatar_saude
+
+# === CONFIGURAÇÕES PADRÃO ===
+PORTA_PADRAO = 5000
+TIMEOUT = 0.5  # espera máxima do seletor entre verificações de encerramento e agenda
+WINDOW_SIZE = 20  # janelas dos alertas e amostras de calibração, como na interface
+FORMATOS_RELATORIO = ('pdf', 'epub')
+
+
+def ler_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--norma', choices=list(estruturas_normas), default='Personalizada',
+                        help='limites e histerese da norma (padrão: Personalizada)')
+    parser.add_argument('--limite-tilt', type=float, help='substitui o limite de inclinação da norma (°)')
+    parser.add_argument('--limite-vib', type=float, help='substitui o limite de vibração da norma (g ou m/s²)')
+    parser.add_argument('--monitorar', default='tilt,vib', help='alertas ativos: tilt, vib ou tilt,vib')
+    parser.add_argument('--sessoes', metavar='DIRETORIO', default='sessoes')
+    parser.add_argument('--retomar', action='store_true',
+                        help='retoma a recepção mais recente se ela foi interrompida')
+    parser.add_argument('--relatorios', metavar='DIRETORIO', default='relatorios')
+    parser.add_argument('--relatorio-intervalo', type=float, default=0,
+                        help='s entre relatórios de cada dispositivo (0: só no encerramento)')
+    parser.add_argument('--formatos', default='pdf', help='pdf, epub ou pdf,epub (vazio: sem relatórios)')
+    parser.add_argument('--duracao', type=float, help='encerra após S segundos (padrão: até SIGINT/SIGTERM)')
+    parser.add_argument('--intervalo-saude', type=float, default=60,
+                        help='s entre resumos de saúde no console (0 desliga)')
+    parser.add_argument('--gravar-pacotes', action='store_true')
+    parser.add_argument('--reproduzir', metavar='ARQUIVO', help='usa uma gravação .rpk no lugar da rede')
+    parser.add_argument('--velocidade', type=float, default=1.0)
+    args = parser.parse_args(argv)
+    formatos = [f for f in args.formatos.split(',') if f]
+    invalidos = set(formatos) - set(FORMATOS_RELATORIO)
+    if invalidos:
+        parser.error(f"formato de relatório desconhecido: {', '.join(sorted(invalidos))}")
+    args.formatos = formatos
+    return args
+
+
+def configuracao_da_norma(args):
+    """Estrutura e configuração de alertas a partir dos argumentos (mesmas chaves da interface)"""
+    norma = estruturas_normas[args.norma]
+    monitorar = args.monitorar.split(',')
+    return args.norma, {
+        'tilt': norma['tilt'] if args.limite_tilt is None else args.limite_tilt,
+        'vib': norma['vib'] if args.limite_vib is None else args.limite_vib,
+        'histerese_tilt': norma['histerese_tilt'],
+        'histerese_vib': norma['histerese_vib'],
+        'monitorar_tilt': 'tilt' in monitorar,
+        'monitorar_vib': 'vib' in monitorar,
+        'unidade_vib': unidade_vibracao(args.norma),
+    }
+
+
+class GeradorRelatorios:
+    """Thread que gera os relatórios pedidos, um de cada vez, sem parar a recepção.
+
+    Cada dispositivo tem no máximo um pedido na fila: se a geração não acompanha o
+    intervalo, o pedido antigo é trocado pelo retrato mais novo em vez de acumular.
+    relatorio.py (PyMuPDF, ebooklib, jinja2, matplotlib) só é importado nesta thread:
+    a recepção sobe sem essas bibliotecas.
+    """
+
+    def __init__(self, diretorio, formatos):
+        self.diretorio = diretorio
+        self.formatos = formatos
+        self._pendentes = {}
+        self._encerrando = False
+        self._condicao = threading.Condition()
+        self._thread = threading.Thread(target=self._executar, name='riggy-relatorios', daemon=True)
+        self._thread.start()
+
+    def pedir(self, identificador, **dados):
+        """dados: argumentos de relatorio.contexto_relatorio(), capturados por quem pede"""
+        with self._condicao:
+            self._pendentes[identificador] = dados
+            self._condicao.notify()
+
+    def encerrar(self):
+        """Gera os relatórios ainda na fila e encerra a thread"""
+        with self._condicao:
+            self._encerrando = True
+            self._condicao.notify()
+        self._thread.join()
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while not self._pendentes and not self._encerrando:
+                    self._condicao.wait()
+                if not self._pendentes:
+                    return
+                identificador = next(iter(self._pendentes))
+                dados = self._pendentes.pop(identificador)
+            import relatorio
+            os.makedirs(self.diretorio, exist_ok=True)
+            contexto = relatorio.contexto_relatorio(dispositivo=identificador, **dados)
+            base = os.path.join(self.diretorio, f"relatorio_{nome_diretorio(identificador)}_{datetime.now():%Y%m%d_%H%M%S}")
+            for formato in self.formatos:
+                gerar = relatorio.gerar_relatorio_pdf if formato == 'pdf' else relatorio.gerar_relatorio_epub
+                try:
+                    gerar(f"{base}.{formato}", contexto)
+                except Exception as e:
+                    print(f"Erro ao gerar relatório {formato.upper()} de {identificador}: {e}")
+
+
+class Servico:
+    """Uma recepção headless: mesmo pipeline, sessões em disco e diário da interface"""
+
+    def __init__(self, args):
+        self.args = args
+        self.estrutura, self.configuracao = configuracao_da_norma(args)
+        self.dispositivos = Dispositivos(WINDOW_SIZE, WINDOW_SIZE, WINDOW_SIZE)
+        self.pipeline = PipelineIngestao(self.dispositivos, alpha=LP_ALPHA, ao_alertar=self.ao_alertar)
+        self.diario = None
+        self.inicio = datetime.now()
+        self.receptor = None
+        self.relatorios = GeradorRelatorios(args.relatorios, args.formatos) if args.formatos else None
+        self._parar = threading.Event()
+
+    def ao_alertar(self, disp, tipo, instante, valor):
+        if self.diario is not None and disp is not None:
+            self.diario.registrar('alerta', id=disp.id, alerta=tipo, instante=instante.timestamp(), valor=valor)
+        unidade = '°' if tipo == ALERTA_TILT else f" {self.configuracao['unidade_vib']}"
+        print(f"⚠️ {instante:%H:%M:%S} {disp.id if disp else '?'}: alerta de {tipo} (média {valor:.2f}{unidade})")
+
+    def iniciar_persistencia(self):
+        """Abre o diário e as sessões em disco; com --retomar continua a recepção interrompida"""
+        retomar = sessao_interrompida(self.args.sessoes) if self.args.retomar else None
+        resumo = resumir_diario(ler_diario(retomar)) if retomar else None
+        if resumo and resumo['inicio'] is None:
+            retomar, resumo = None, None
+        diretorio = retomar or os.path.join(self.args.sessoes, f"{self.inicio:%Y%m%d_%H%M%S}")
+        conhecidos = set(resumo['dispositivos']) if resumo else set()
+        diario = DiarioSessao(diretorio)
+
+        def criar_sessao(identificador):
+            if identificador not in conhecidos:
+                diario.registrar('dispositivo', id=identificador)
+            return SessaoEmDisco(os.path.join(diretorio, nome_diretorio(identificador)))
+
+        self.dispositivos.fabrica_sessao = criar_sessao
+        if resumo:
+            # A recepção retomada mantém a norma e os limites com que começou
+            self.estrutura, self.configuracao = resumo['estrutura'], dict(resumo['configuracao'])
+            self.inicio = datetime.fromtimestamp(resumo['inicio']['gravacao_inicio'])
+            diario.registrar('retomada', instante=time.time())
+            for identificador in resumo['dispositivos']:
+                disp = self.dispositivos.registrar(identificador)
+                if disp is not None:
+                    aplicar_estado(disp, reconstruir_estado(
+                        disp.sessao, resumo['alertas'].get(identificador, []), self.configuracao,
+                        WINDOW_SIZE, WINDOW_SIZE, LP_ALPHA))
+            print(f"✅ Sessão retomada de {diretorio}")
+        else:
+            diario.registrar('inicio', estrutura=self.estrutura, configuracao=self.configuracao,
+                             gravacao_inicio=self.inicio.timestamp())
+            print(f"Persistindo a sessão em {diretorio}")
+        self.pipeline.configurar(**self.configuracao)
+        self.diario = diario
+
+    def pedir_relatorios(self):
+        """Retrato de cada dispositivo com amostras para a thread de relatórios"""
+        if self.relatorios is None:
+            return
+        saude = self.pipeline.resumo_saude()
+        duracao = (datetime.now() - self.inicio).total_seconds()
+        for identificador in self.dispositivos.ids():
+            disp = self.dispositivos.get(identificador)
+            if not len(disp.sessao):
+                continue
+            self.relatorios.pedir(
+                identificador, sessao=disp.sessao, alerts=list(disp.alerts), estrutura=self.estrutura,
+                limite_tilt=self.configuracao['tilt'], limite_vib=self.configuracao['vib'],
+                unidade_vib=self.configuracao['unidade_vib'], mostrar_tilt=self.configuracao['monitorar_tilt'],
+                mostrar_vib=self.configuracao['monitorar_vib'], saude=saude, duracao=duracao)
+
+    def parar(self, *_):
+        """Também é o tratador de SIGINT/SIGTERM: só sinaliza, o laço principal encerra"""
+        self._parar.set()
+        receptor = self.receptor
+        if receptor is not None:
+            receptor.despertar()
+
+    def executar(self):
+        args = self.args
+        self.iniciar_persistencia()
+        if args.reproduzir:
+            self.receptor = ReprodutorPacotes(args.reproduzir, args.velocidade, lote_maximo=LOTE_MAXIMO)
+        else:
+            self.receptor = ReceptorUDP(args.porta, rcvbuf=RCVBUF_PADRAO, tamanho_datagrama=TAMANHO_DATAGRAMA,
+                                        lote_maximo=LOTE_MAXIMO)
+            print(f"Recebendo na porta UDP {args.porta}")
+        self.pipeline.saude.receptor = self.receptor
+        if args.gravar_pacotes:
+            self.pipeline.gravador = GravadorPacotes(f"pacotes_{datetime.now():%Y%m%d_%H%M%S}.rpk")
+
+        agora = time.monotonic()
+        fim = agora + args.duracao if args.duracao else None
+        proximo_relatorio = agora + args.relatorio_intervalo if args.relatorio_intervalo else None
+        proxima_saude = agora + args.intervalo_saude if args.intervalo_saude else None
+        try:
+            while not self._parar.is_set():
+                for pacote in self.receptor.receber_lote(TIMEOUT):
+                    self.pipeline.processar_datagrama(*pacote)
+                self.pipeline.processar_pendentes()
+                self.dispositivos.sincronizar_sessoes_se_devido()
+                if getattr(self.receptor, 'terminado', False):
+                    print(f"✅ Reprodução concluída: {args.reproduzir}")
+                    break
+                agora = time.monotonic()
+                if fim is not None and agora >= fim:
+                    break
+                if proxima_saude is not None and agora >= proxima_saude:
+                    proxima_saude = agora + args.intervalo_saude
+                    print(formatar_saude(self.pipeline.resumo_saude()))
+                if proximo_relatorio is not None and agora >= proximo_relatorio:
+                    proximo_relatorio = agora + args.relatorio_intervalo
+                    self.pedir_relatorios()
+        finally:
+            self.encerrar()
+
+    def encerrar(self):
+        # Último retrato de saúde e dos relatórios com o receptor ainda aberto
+        print(formatar_saude(self.pipeline.resumo_saude()))
+        gravador = self.pipeline.gravador
+        if gravador is not None:
+            self.pipeline.gravador = None
+            gravador.fechar()
+            print(f"✅ {gravador.pacotes} pacotes gravados em {gravador.caminho}")
+        self.dispositivos.sincronizar_sessoes()
+        self.pedir_relatorios()
+        self.pipeline.saude.receptor = None
+        self.receptor.fechar()
+        if self.relatorios is not None:
+            self.relatorios.encerrar()
+        self.dispositivos.fechar_sessoes()
+        self.diario.fechar()
+        print("✅ Recepção encerrada")
+
+
+def main(argv=None):
+    servico = Servico(ler_argumentos(argv))
+    signal.signal(signal.SIGINT, servico.parar)
+    signal.signal(signal.SIGTERM, servico.parar)
+    servico.executar()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import queue
+import threading
+
+# Trabalhos longos (relatórios) fora da thread da interface. Cada trabalho é uma função
+# que recebe `progresso(fracao, etapa)`; chamá-la publica o andamento e, se o trabalho foi
+# cancelado, levanta TrabalhoCancelado ali mesmo (o cancelamento vale na próxima etapa).
+# Os trabalhos terminados vão para uma fila que a interface drena no próprio laço.
+
+# === CONFIGURAÇÕES PADRÃO ===
+TRABALHADORES = 1
+
+
+class TrabalhoCancelado(Exception):
+    pass
+
+
+class Trabalho:
+    """Um trabalho enviado: andamento, estado e resultado, lidos pela interface"""
+
+    def __init__(self, nome, funcao):
+        self.nome = nome
+        self.funcao = funcao
+        self.fracao = 0.0
+        self.etapa = 'Na fila'
+        self.estado = 'na fila'  # na fila, executando, concluido, cancelado, erro
+        self.resultado = None
+        self.erro = None
+        self._cancelado = threading.Event()
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    @property
+    def terminado(self):
+        return self.estado in ('concluido', 'cancelado', 'erro')
+
+    def progresso(self, fracao, etapa=None):
+        """Chamado pela função do trabalho a cada etapa"""
+        if self._cancelado.is_set():
+            raise TrabalhoCancelado(self.nome)
+        self.fracao = fracao
+        if etapa is not None:
+            self.etapa = etapa
+
+    def executar(self):
+        self.estado = 'executando'
+        try:
+            self.progresso(0.0, 'Iniciando')
+            self.resultado = self.funcao(self.progresso)
+            self.fracao = 1.0
+            self.estado = 'concluido'
+        except TrabalhoCancelado:
+            self.estado = 'cancelado'
+        except Exception as e:
+            self.erro = e
+            self.estado = 'erro'
+
+
+class FilaTrabalhos:
+    """Executa os trabalhos em threads próprias; os terminados saem por `concluidos`"""
+
+    def __init__(self, trabalhadores=TRABALHADORES):
+        self._pendentes = queue.Queue()
+        self.concluidos = queue.Queue()
+        for i in range(trabalhadores):
+            threading.Thread(target=self._executar, name=f'riggy-trabalhos-{i}', daemon=True).start()
+
+    def enviar(self, nome, funcao):
+        """Enfileira funcao(progresso) e devolve o Trabalho para acompanhar ou cancelar"""
+        trabalho = Trabalho(nome, funcao)
+        self._pendentes.put(trabalho)
+        return trabalho
+
+    def terminados(self):
+        """Trabalhos terminados desde a última chamada (para o laço da interface)"""
+        prontos = []
+        while True:
+            try:
+                prontos.append(self.concluidos.get_nowait())
+            except queue.Empty:
+                return prontos
+
+    def _executar(self):
+        while True:
+            trabalho = self._pendentes.get()
+            trabalho.executar()
+            self.concluidos.put(trabalho)
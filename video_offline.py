@@ -0,0 +1,165 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from ingestao_processo import sem_reimportar_main
+
+# Vídeo da sessão renderizado depois da recepção, a partir das amostras guardadas, no
+# lugar de copiar o canvas ao vivo: a recepção não paga nada pela gravação, e resolução
+# e taxa de quadros deixam de depender da tela. Cada quadro repete o gráfico ao vivo
+# (mesma janela móvel e mesma suavização causal) no instante correspondente da sessão.
+# Os quadros são desenhados em ordem, num buffer reaproveitado, e codificados num único
+# arquivo. Um pool dividindo os quadros em fatias não compensa: com blitting desenhar custa
+# menos que codificar e que passar o quadro (~2,7 MB) entre processos, e cada fatia teria
+# de reaquecer o filtro, saindo diferente do vídeo sequencial. Em segundo plano a renderização
+# roda num processo filho: o tema do matplotlib e o Agg não dividem estado nem o GIL com a janela.
+
+# === CONFIGURAÇÕES PADRÃO ===
+FPS_VIDEO = 30
+TAMANHO_VIDEO = (1280, 720)  # largura, altura
+DPI_VIDEO = 100
+CORES_PADRAO = {'titulo': '#FF8800', 'texto': '#FFFFFF', 'fundo': '#232323', 'borda': '#181818'}
+
+
+class _SessaoParcial:
+    """As primeiras `n` amostras de colunas já carregadas, no formato que GraficoAoVivo lê"""
+
+    def __init__(self, tempo, tilts, vibracoes):
+        self._colunas = (tempo, tilts, vibracoes)
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def tempo(self):
+        return self._colunas[0][:self.n]
+
+    @property
+    def tilts(self):
+        return self._colunas[1][:self.n]
+
+    @property
+    def vibracoes(self):
+        return self._colunas[2][:self.n]
+
+
+def fim_dos_quadros(tempo, fps):
+    """Para cada quadro do vídeo, quantas amostras já tinham chegado no instante dele"""
+    if len(tempo) == 0:
+        return np.empty(0, dtype=np.int64)
+    quadros = int((float(tempo[-1]) - float(tempo[0])) * fps) + 1
+    instantes = float(tempo[0]) + np.arange(quadros) / fps
+    return np.searchsorted(tempo, instantes, side='right')
+
+
+class _Renderizador:
+    """Figura fora da tela com o gráfico ao vivo; desenha os quadros do vídeo em BGR"""
+
+    def __init__(self, opcoes):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        from grafico_ao_vivo import GraficoAoVivo
+
+        self.opcoes = opcoes
+        largura, altura = opcoes['tamanho']
+        cores = opcoes['cores']
+        fig = Figure(figsize=(largura / DPI_VIDEO, altura / DPI_VIDEO), dpi=DPI_VIDEO)
+        self.canvas = FigureCanvasAgg(fig)
+        self.grafico = GraficoAoVivo(fig, fig.subplots(2, 1), self.canvas, opcoes['janela'],
+                                     cores['titulo'], cores['texto'], cores['fundo'])
+
+    def quadros(self, colunas, fins):
+        """Gera os quadros (altura x largura x 3) nos instantes dados por `fins`.
+
+        O mesmo buffer é reaproveitado: cada quadro vale até o próximo ser pedido.
+        """
+        import cv2
+        largura, altura = self.opcoes['tamanho']
+        saida = np.empty((altura, largura, 3), dtype=np.uint8)
+        sessao = _SessaoParcial(*colunas)
+        for fim in fins:
+            sessao.n = int(fim)
+            # Sem amostras novas o buffer ainda tem o quadro anterior, que é repetido
+            self.grafico.desenhar(self.opcoes['mostrar_tilt'], self.opcoes['mostrar_vib'],
+                                  self.opcoes['unidade_vib'], sessao)
+            cv2.cvtColor(np.asarray(self.canvas.buffer_rgba()), cv2.COLOR_RGBA2BGR, dst=saida)
+            yield saida
+
+
+def renderizar_video(arquivo, tempo, tilts, vibracoes, mostrar_tilt=True, mostrar_vib=True, unidade_vib='g',
+                     janela=20, fps=FPS_VIDEO, tamanho=TAMANHO_VIDEO, cores=None):
+    """Renderiza o vídeo da sessão (colunas tempo em s, inclinação, vibração em g).
+
+    Devolve o número de quadros gravados (0 se a sessão tem menos de duas amostras).
+    """
+    from matplotlib import rc_context
+
+    from captura_video import abrir_gravador
+
+    colunas = tuple(np.ascontiguousarray(c, dtype=np.float64) for c in (tempo, tilts, vibracoes))
+    if len(colunas[0]) < 2:
+        return 0
+    fins = fim_dos_quadros(colunas[0], fps)
+    opcoes = {'mostrar_tilt': mostrar_tilt, 'mostrar_vib': mostrar_vib, 'unidade_vib': unidade_vib,
+              'janela': janela, 'fps': fps, 'tamanho': tuple(tamanho), 'cores': dict(cores or CORES_PADRAO)}
+    cores = opcoes['cores']
+    # Mesmo tema escuro que main.py aplica ao gráfico ao vivo; a montagem dos eixos
+    # acontece no primeiro quadro, então o tema vale durante toda a renderização
+    tema = {
+        'axes.facecolor': cores['fundo'], 'figure.facecolor': cores['fundo'],
+        'axes.labelcolor': cores['texto'], 'xtick.color': cores['texto'], 'ytick.color': cores['texto'],
+        'axes.edgecolor': cores['borda'], 'text.color': cores['texto'],
+    }
+    writer, _ = abrir_gravador(arquivo, fps, tuple(tamanho))
+    try:
+        with rc_context(tema):
+            for quadro in _Renderizador(opcoes).quadros(colunas, fins):
+                writer.write(quadro)
+    finally:
+        writer.release()
+    return len(fins)
+
+
+def _renderizar_no_processo(conexao, args, kwargs):
+    """Alvo do processo filho: devolve (True, quadros) ou (False, exceção) pela conexão"""
+    try:
+        resultado = (True, renderizar_video(*args, **kwargs))
+    except Exception as e:
+        resultado = (False, e)
+    conexao.send(resultado)
+    conexao.close()
+
+
+def renderizar_em_segundo_plano(*args, **kwargs):
+    """Roda renderizar_video num processo filho; devolve um Future com o número de quadros"""
+    futuro = Future()
+    # spawn: o filho não herda a interface nem as threads do Tk
+    contexto = multiprocessing.get_context('spawn')
+    receber, enviar = contexto.Pipe(duplex=False)
+    processo = contexto.Process(target=_renderizar_no_processo, args=(enviar, args, kwargs),
+                                name='riggy-video', daemon=True)
+    with sem_reimportar_main():
+        processo.start()
+    enviar.close()
+
+    def aguardar():
+        try:
+            sucesso, valor = receber.recv()
+        except EOFError:
+            # O filho morreu sem responder (falta de memória, encerrado pelo SO...)
+            sucesso, valor = False, None
+        receber.close()
+        processo.join()
+        if sucesso:
+            futuro.set_result(valor)
+        elif valor is None:
+            futuro.set_exception(RuntimeError(f"o processo do vídeo terminou com código {processo.exitcode}"))
+        else:
+            futuro.set_exception(valor)
+
+    threading.Thread(target=aguardar, name='riggy-video', daemon=True).start()
+    return futuro